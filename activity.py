@@ -0,0 +1,197 @@
+"""
+class that puts enemies and moving platforms far from the player to sleep: their physics bodies are
+taken out of the Pymunk space and they aren't updated, steered or synced with their bodies anymore. patrols only go back and
+forth between their boundaries at a fixed speed, so when a sleeping sprite comes back into range it
+is moved straight to where its patrol would have taken it. the cost of a logic step then depends on
+what is near the player instead of on how many sprites the level has.
+"""
+import math
+from constants import *
+
+
+def edge_offsets(sprite):
+    """
+    distances from a sprite's center to the edges of its hit box, which is what track_moving_sprites
+    compares to the boundaries. they don't change while the sprite moves, so they can be worked out once
+    :param sprite: an Arcade Sprite
+    :return: (left, right, bottom, top) distances in pixels
+    """
+    return (sprite.center_x - sprite.left, sprite.right - sprite.center_x,
+            sprite.center_y - sprite.bottom, sprite.top - sprite.center_y)
+
+
+def patrol_position(center, change, offset_low, offset_high, boundary_low, boundary_high, steps):
+    """
+    work out where a patrolling sprite is along one axis after some logic steps, without simulating
+    them. the sprite bounces between its boundaries (track_moving_sprites turns it around once its
+    edge passes a boundary)
+    :param center: center of the sprite on the axis
+    :param change: movement per logic step on the axis
+    :param offset_low: distance from the center to the left (or bottom) edge of the sprite's hit box
+    :param offset_high: distance from the center to the right (or top) edge of the sprite's hit box
+    :param boundary_low: boundary_left (or boundary_bottom) of the sprite, in tiles. None or 0 if it has none
+    :param boundary_high: boundary_right (or boundary_top) of the sprite, in tiles. None or 0 if it has none
+    :param steps: number of logic steps to skip
+    :return: (center, change) after the steps
+    """
+    if not change or steps <= 0:
+        return center, change
+    # the range the sprite's center can move in
+    low = boundary_low * SPRITE_SCALING + offset_low if boundary_low else None
+    high = boundary_high * SPRITE_SCALING - offset_high if boundary_high else None
+    distance = abs(change) * steps
+
+    if low is not None and high is not None:
+        span = high - low
+        if span <= 0:
+            return center, change
+        # unfold the back and forth into a straight line that repeats every 2 * span
+        offset = min(max(center - low, 0), span)
+        phase = ((offset if change > 0 else 2 * span - offset) + distance) % (2 * span)
+        if phase < span:
+            return low + phase, abs(change)
+        return low + 2 * span - phase, -abs(change)
+
+    # with at most one boundary the sprite turns around once, at most
+    center += math.copysign(distance, change)
+    if change > 0 and high is not None and center > high:
+        return 2 * high - center, -change
+    if change < 0 and low is not None and center < low:
+        return 2 * low - center, -change
+    return center, change
+
+
+class ActivityRegion:
+    """
+    the patrolling sprites near the player (active), and the ones asleep. sleeping sprites are
+    sorted into a grid of cells by where they fell asleep, so only the cells around the player are
+    checked for sprites to wake
+    """
+
+    def __init__(self, physics_engine, sprite_lists, cell_width=CHUNK_WIDTH, cell_height=CHUNK_HEIGHT):
+        """
+        :param physics_engine: the level's PymunkPhysicsEngine (the sprites must already be added to it)
+        :param sprite_lists: SpriteLists of patrolling sprites (enemies, moving platforms)
+        :param cell_width: width of a grid cell in pixels
+        :param cell_height: height of a grid cell in pixels
+        """
+        self.physics_engine = physics_engine
+        self.sprite_lists = sprite_lists
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.active = []  # sprites that are updated and simulated
+        self.sleeping = {}  # (column, row): list of (sprite, physics object, game time it fell asleep)
+        self.changes = 0  # counts changes to the active sprites, so other code can tell when to refresh
+        self.reset()
+
+    def reset(self):
+        """
+        wake every sprite where it is, without moving it (after the level was rewound)
+        :return: n/a
+        """
+        space = self.physics_engine.space
+        for entries in self.sleeping.values():
+            for sprite, physics_object, _ in entries:
+                space.add(physics_object.body, physics_object.shape)
+                self.physics_engine.non_static_sprite_list.append(sprite)
+        self.sleeping = {}
+        self.active = [sprite for sprite_list in self.sprite_lists for sprite in sprite_list]
+        self.changes += 1
+
+    def remove(self, sprite):
+        """
+        stop tracking a sprite that was taken out of the level (ex: an enemy killed by dashing)
+        :param sprite: an active sprite
+        :return: n/a
+        """
+        if sprite in self.active:
+            self.active.remove(sprite)
+            self.changes += 1
+
+    def cell(self, x, y):
+        """
+        :param x: x position in pixels
+        :param y: y position in pixels
+        :return: (column, row) of the grid cell the position is in
+        """
+        return math.floor(x / self.cell_width), math.floor(y / self.cell_height)
+
+    @staticmethod
+    def distance_outside(sprite, x, y):
+        """
+        how far a sprite is outside of the region the player can see
+        :param sprite: an Arcade Sprite
+        :param x: x of the player
+        :param y: y of the player
+        :return: distance in pixels (0 or less if the sprite is in range)
+        """
+        return max(abs(sprite.center_x - x) - ACTIVITY_RANGE_X, abs(sprite.center_y - y) - ACTIVITY_RANGE_Y)
+
+    def update(self, x, y, game_time):
+        """
+        put sprites that went out of range to sleep, and wake the ones that came back into range
+        :param x: x of the player
+        :param y: y of the player
+        :param game_time: seconds of game logic simulated so far
+        :return: n/a
+        """
+        space = self.physics_engine.space
+
+        # sprites only fall asleep a bit further out than they wake up, so a sprite at the edge
+        # of the range isn't put to sleep and woken up every other step
+        still_active = []
+        for sprite in self.active:
+            if self.distance_outside(sprite, x, y) <= ACTIVITY_HYSTERESIS:
+                still_active.append(sprite)
+                continue
+            physics_object = self.physics_engine.sprites[sprite]
+            space.remove(physics_object.body, physics_object.shape)
+            # resync_sprites goes through non_static_sprite_list, and a sleeping body doesn't move
+            self.physics_engine.non_static_sprite_list.remove(sprite)
+            entry = (sprite, physics_object, game_time)
+            self.sleeping.setdefault(self.cell(sprite.center_x, sprite.center_y), []).append(entry)
+        if len(still_active) != len(self.active):
+            self.active = still_active
+            self.changes += 1
+
+        if not self.sleeping:
+            return
+        first_column, first_row = self.cell(x - ACTIVITY_RANGE_X, y - ACTIVITY_RANGE_Y)
+        last_column, last_row = self.cell(x + ACTIVITY_RANGE_X, y + ACTIVITY_RANGE_Y)
+        for column in range(first_column, last_column + 1):
+            for row in range(first_row, last_row + 1):
+                entries = self.sleeping.get((column, row))
+                if not entries:
+                    continue
+                still_sleeping = []
+                for entry in entries:
+                    sprite, physics_object, slept_at = entry
+                    if self.distance_outside(sprite, x, y) > 0:
+                        still_sleeping.append(entry)
+                        continue
+                    self.wake(sprite, physics_object, game_time - slept_at)
+                if still_sleeping:
+                    self.sleeping[(column, row)] = still_sleeping
+                else:
+                    del self.sleeping[(column, row)]
+
+    def wake(self, sprite, physics_object, elapsed):
+        """
+        move a sleeping sprite to where its patrol would be now, and put it back into the simulation
+        :param sprite: the sleeping sprite
+        :param physics_object: the sprite's physics object
+        :param elapsed: seconds the sprite slept
+        :return: n/a
+        """
+        steps = elapsed / LOGIC_TIMESTEP
+        left, right, bottom, top = edge_offsets(sprite)
+        center_x, sprite.change_x = patrol_position(sprite.center_x, sprite.change_x, left, right,
+                                                    sprite.boundary_left, sprite.boundary_right, steps)
+        center_y, sprite.change_y = patrol_position(sprite.center_y, sprite.change_y, bottom, top,
+                                                    sprite.boundary_bottom, sprite.boundary_top, steps)
+        sprite.position = (center_x, center_y)
+        physics_object.body.position = (center_x, center_y)
+        self.physics_engine.space.add(physics_object.body, physics_object.shape)
+        self.physics_engine.non_static_sprite_list.append(sprite)
+        self.active.append(sprite)
+        self.changes += 1
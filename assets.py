@@ -0,0 +1,171 @@
+"""
+class that loads textures and sounds for the whole game, so each file is read and decoded only once
+per run no matter how many views or sprites use it. assets are reference counted: an asset nobody
+holds anymore stays cached (in case it's wanted again soon, ex: restarting the game) until too many
+unused assets pile up, then the least recently used ones are evicted.
+"""
+from collections import OrderedDict
+import arcade as ar
+from PIL import Image, ImageOps
+from constants import *
+from atlas import load_atlas
+
+
+class AssetManager:
+    """
+    reference counted cache of textures and sounds. every asset that is acquired (texture(),
+    texture_pair(), sound()) should be released again (release_all()) by whatever acquired it
+    """
+
+    def __init__(self, max_unused=ASSET_CACHE_MAX_UNUSED):
+        """
+        :param max_unused: number of assets nobody holds that are kept cached before evicting
+        """
+        self.assets = {}  # (kind, path): loaded asset
+        self.references = {}  # (kind, path): number of holders
+        self.unused = OrderedDict()  # (kind, path) of assets with no holders, least recently used first
+        self.max_unused = max_unused
+        self.loads = 0  # number of files decoded, for checking that nothing is loaded twice
+
+    def acquire(self, asset_key, loader, holder=None):
+        """
+        get an asset, loading it if it isn't cached
+        :param asset_key: (kind, path) of the asset
+        :param loader: function that loads the asset
+        :param holder: list that the asset key is added to, to release it later with release_all()
+        :return: the asset
+        """
+        asset = self.assets.get(asset_key)
+        if asset is None:
+            asset = self.assets[asset_key] = loader()
+            self.loads += 1
+        self.references[asset_key] = self.references.get(asset_key, 0) + 1
+        self.unused.pop(asset_key, None)
+        if holder is not None:
+            holder.append(asset_key)
+        return asset
+
+    def release(self, asset_key):
+        """
+        let go of an asset. once nothing holds it, it may be evicted
+        :param asset_key: (kind, path) of the asset
+        :return: n/a
+        """
+        count = self.references.get(asset_key, 0) - 1
+        if count > 0:
+            self.references[asset_key] = count
+            return
+        self.references.pop(asset_key, None)
+        if asset_key in self.assets:
+            self.unused[asset_key] = True
+            self.evict(self.max_unused)
+
+    def release_all(self, holder):
+        """
+        let go of every asset in a holder list, and empty the list
+        :param holder: list of asset keys filled in by acquire()
+        :return: n/a
+        """
+        for asset_key in holder:
+            self.release(asset_key)
+        holder.clear()
+
+    def evict(self, keep=0):
+        """
+        drop the least recently used assets that nothing holds
+        :param keep: number of unused assets to keep cached
+        :return: n/a
+        """
+        while len(self.unused) > keep:
+            asset_key, _ = self.unused.popitem(last=False)
+            del self.assets[asset_key]
+
+    def texture(self, path, hit_box_algorithm="Simple", holder=None):
+        """
+        get a texture
+        :param path: image file
+        :param hit_box_algorithm: Arcade hit box algorithm ("None", "Simple" or "Detailed")
+        :param holder: list to add the asset key to, for release_all()
+        :return: an Arcade Texture
+        """
+        return self.acquire(("texture", path),
+                            lambda: ar.Texture(path, load_image(path), hit_box_algorithm=hit_box_algorithm),
+                            holder)
+
+    def texture_pair(self, path, hit_box_algorithm="Simple", holder=None):
+        """
+        get a texture and its mirror image (for sprites that face left and right), same as
+        ar.load_texture_pair but decoding the file once
+        :param path: image file
+        :param hit_box_algorithm: Arcade hit box algorithm ("None", "Simple" or "Detailed")
+        :param holder: list to add the asset key to, for release_all()
+        :return: [texture facing right, texture facing left]
+        """
+        def load_pair():
+            image = load_image(path)
+            return [ar.Texture(path, image, hit_box_algorithm=hit_box_algorithm),
+                    ar.Texture(f"{path}-flipped", ImageOps.mirror(image), hit_box_algorithm=hit_box_algorithm)]
+        return self.acquire(("texture pair", path), load_pair, holder)
+
+    def atlas(self, name, paths, holder=None):
+        """
+        get texture pairs for a set of images packed into one atlas (see atlas.py)
+        :param name: name of the atlas
+        :param paths: image files in the atlas
+        :param holder: list to add the asset key to, for release_all()
+        :return: {path: [texture facing right, texture facing left]}
+        """
+        return self.acquire(("atlas", name), lambda: load_atlas(name, paths), holder)
+
+    def sound(self, path, streaming=False, holder=None):
+        """
+        get a sound
+        :param path: sound file
+        :param streaming: stream the sound from disk while it plays (for music). streamed sounds
+                          are never cached since each one can only be played once at a time
+        :param holder: list to add the asset key to, for release_all()
+        :return: an Arcade Sound
+        """
+        if streaming:
+            return ar.Sound(path, streaming=True)
+        return self.acquire(("sound", path), lambda: ar.load_sound(path), holder)
+
+    def preload(self, textures=(), sounds=()):
+        """
+        load assets ahead of time, so nothing has to be decoded when they're first used
+        :param textures: image files
+        :param sounds: sound files
+        :return: n/a
+        """
+        holder = []
+        for path in textures:
+            self.texture(path, holder=holder)
+        for path in sounds:
+            self.sound(path, holder=holder)
+        self.release_all(holder)
+
+
+def load_image(path):
+    """
+    read and decode an image file
+    :param path: image file
+    :return: RGBA PIL image
+    """
+    with Image.open(path) as image:
+        return image.convert("RGBA")
+
+
+class NullSound:
+    """
+    stands in for an Arcade Sound when there is no audio device. playing it does nothing
+    """
+
+    def play(self, volume=1.0, pan=0.0, loop=False):
+        return None
+
+    def stop(self, player=None):
+        pass
+
+
+# the asset manager shared by every view and sprite
+assets = AssetManager()
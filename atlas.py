@@ -0,0 +1,115 @@
+"""
+functions that pack many small images (ex: every frame of the player's animations, facing both
+ways) into one texture atlas image. the atlas image and its table of frame regions and hit boxes
+are saved in the cache folder, so later runs decode one image instead of every frame file and
+don't have to work out any hit boxes.
+"""
+import json
+import os
+import arcade as ar
+from PIL import Image, ImageOps
+from constants import *
+
+# bump when the format of the saved atlas table changes
+ATLAS_VERSION = 1
+
+
+def source_stamps(paths):
+    """
+    get what the atlas was built from, to know when it has to be built again
+    :param paths: image files
+    :return: {path: [modified time, size]}
+    """
+    return {path: [os.path.getmtime(path), os.path.getsize(path)] for path in paths}
+
+
+def pack(sizes, max_width=ATLAS_MAX_WIDTH, padding=ATLAS_PADDING):
+    """
+    place rectangles in rows (tallest first), left to right
+    :param sizes: list of (width, height)
+    :param max_width: widest a row can get
+    :param padding: empty pixels around each rectangle, so filtering doesn't bleed between frames
+    :return: (list of (x, y) for each size, atlas width, atlas height)
+    """
+    order = sorted(range(len(sizes)), key=lambda i: sizes[i][1], reverse=True)
+    positions = [None] * len(sizes)
+    x = y = row_height = width = 0
+    for i in order:
+        w, h = sizes[i]
+        if x and x + w + padding > max_width:
+            y += row_height
+            x = row_height = 0
+        positions[i] = (x + padding, y + padding)
+        x += w + padding
+        row_height = max(row_height, h + padding)
+        width = max(width, x)
+    return positions, width + padding, y + row_height + padding
+
+
+def build_atlas(paths):
+    """
+    pack images and their mirror images into one atlas image
+    :param paths: image files
+    :return: (atlas PIL image, table of {path: {"regions": [[x, y, w, h] facing right, [x, y, w, h] facing
+              left], "hit_box": hit box points facing right}})
+    """
+    images = []
+    for path in paths:
+        with Image.open(path) as image:
+            image = image.convert("RGBA")
+        images += [image, ImageOps.mirror(image)]
+
+    positions, width, height = pack([image.size for image in images])
+    atlas = Image.new("RGBA", (width, height), (0, 0, 0, 0))
+    frames = {}
+    for i, path in enumerate(paths):
+        regions = []
+        for image, (x, y) in zip(images[i * 2:i * 2 + 2], positions[i * 2:i * 2 + 2]):
+            atlas.paste(image, (x, y))
+            regions.append([x, y, image.width, image.height])
+        hit_box = ar.calculate_hit_box_points_simple(images[i * 2])
+        frames[path] = {"regions": regions, "hit_box": [list(point) for point in hit_box]}
+    return atlas, frames
+
+
+def load_atlas(name, paths):
+    """
+    get texture pairs for a set of images from a cached atlas, building the atlas if it's missing
+    or any of the images changed
+    :param name: name of the atlas (its file name in the cache folder)
+    :param paths: image files
+    :return: {path: [texture facing right, texture facing left]}
+    """
+    image_path = os.path.join(CACHE_DIRECTORY, f"{name}.png")
+    table_path = os.path.join(CACHE_DIRECTORY, f"{name}.json")
+    stamps = source_stamps(paths)
+
+    table = None
+    if os.path.exists(image_path) and os.path.exists(table_path):
+        with open(table_path) as file:
+            table = json.load(file)
+        if table.get("version") != ATLAS_VERSION or table.get("sources") != stamps:
+            table = None
+
+    if table is None:
+        atlas, frames = build_atlas(paths)
+        table = {"version": ATLAS_VERSION, "sources": stamps, "frames": frames}
+        os.makedirs(CACHE_DIRECTORY, exist_ok=True)
+        atlas.save(image_path)
+        with open(table_path, "w") as file:
+            json.dump(table, file)
+    else:
+        with Image.open(image_path) as image:
+            atlas = image.convert("RGBA")
+
+    textures = {}
+    for path, frame in table["frames"].items():
+        hit_box = tuple(tuple(point) for point in frame["hit_box"])
+        mirrored_hit_box = tuple((-x, y) for x, y in hit_box)
+        pair = []
+        for (x, y, w, h), suffix, points in zip(frame["regions"], ("", "-flipped"), (hit_box, mirrored_hit_box)):
+            texture = ar.Texture(f"{path}{suffix}", atlas.crop((x, y, x + w, y + h)))
+            texture._hit_box_points = points  # already worked out when the atlas was built
+            pair.append(texture)
+        textures[path] = pair
+    return textures
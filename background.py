@@ -0,0 +1,123 @@
+"""
+classes for the background behind a level: one or more repeating image layers that scroll slower
+than the map (parallax). only enough copies of each image to cover the screen are drawn, so the
+cost doesn't grow with the size of the map.
+
+a map picks its background with custom map properties in Tiled (lists are comma separated, one
+entry per layer from back to front, and a single entry applies to every layer):
+    background: image files (default: GAME_BACKGROUND_TEXTURE)
+    background_parallax: how fast each layer scrolls compared to the map, 0 (fixed to the screen)
+                         to 1 (moves with the map)
+    background_scale: size of each layer's image
+    background_repeat: "x", "y" or "xy", the directions each layer's image repeats in
+"""
+import math
+import arcade as ar
+from constants import *
+from assets import assets
+
+
+class BackgroundLayer:
+    """
+    an image repeated across the screen, scrolling at a fraction of the map's speed
+    """
+
+    def __init__(self, texture, parallax=BACKGROUND_DEFAULT_PARALLAX, scale=1.0, repeat="xy"):
+        """
+        :param texture: an Arcade Texture
+        :param parallax: how fast the layer scrolls compared to the map (0 to 1)
+        :param scale: size of the image
+        :param repeat: directions the image repeats in ("x", "y" or "xy")
+        """
+        self.parallax = parallax
+        self.repeat_x = "x" in repeat
+        self.repeat_y = "y" in repeat
+        self.tile_width = texture.width * scale
+        self.tile_height = texture.height * scale
+        # one more copy than fits on the screen, for when the screen is between copies
+        self.columns = math.ceil(SCREEN_WIDTH / self.tile_width) + 1 if self.repeat_x else 1
+        self.rows = math.ceil(SCREEN_HEIGHT / self.tile_height) + 1 if self.repeat_y else 1
+
+        self.sprite_list = ar.SpriteList()
+        for _ in range(self.columns * self.rows):
+            sprite = ar.Sprite(scale=scale)
+            sprite.texture = texture
+            self.sprite_list.append(sprite)
+        self.camera_moves = None  # camera.moves when the copies were last placed
+
+    def place(self, camera):
+        """
+        move the copies of the image to cover the screen
+        :param camera: the Camera
+        :return: n/a
+        """
+        # the layer's (0, 0) moves along with the view by (1 - parallax) of every pixel it scrolls
+        origin_x = camera.view_left * (1 - self.parallax)
+        origin_y = camera.view_bottom * (1 - self.parallax)
+        first_column = math.floor((camera.view_left - origin_x) / self.tile_width) if self.repeat_x else 0
+        first_row = math.floor((camera.view_bottom - origin_y) / self.tile_height) if self.repeat_y else 0
+        for i, sprite in enumerate(self.sprite_list):
+            sprite.left = origin_x + (first_column + i % self.columns) * self.tile_width
+            sprite.bottom = origin_y + (first_row + i // self.columns) * self.tile_height
+
+    def draw(self, camera):
+        """
+        draw the layer behind whatever the camera sees
+        :param camera: the Camera
+        :return: n/a
+        """
+        if camera.moves != self.camera_moves:
+            self.camera_moves = camera.moves
+            self.place(camera)
+        self.sprite_list.draw()
+
+
+class Background:
+    """
+    the layers behind a level, drawn back to front
+    """
+
+    def __init__(self, layers):
+        """
+        :param layers: list of BackgroundLayers, back to front
+        """
+        self.layers = layers
+
+    def draw(self, camera):
+        """
+        :param camera: the Camera
+        :return: n/a
+        """
+        for layer in self.layers:
+            layer.draw(camera)
+
+
+def property_list(properties, name, default, count=None):
+    """
+    read a comma separated map property
+    :param properties: the map's properties
+    :param name: name of the property
+    :param default: value used when the map doesn't have the property
+    :param count: number of values wanted. a single value is repeated to fill the list
+    :return: list of strings
+    """
+    values = [value.strip() for value in str(properties.get(name, default)).split(",") if value.strip()]
+    if count is not None and len(values) == 1:
+        values *= count
+    return values
+
+
+def load_background(properties, holder=None):
+    """
+    make the background of a map from its properties
+    :param properties: the map's properties
+    :param holder: list to add the images' asset keys to, for assets.release_all()
+    :return: a Background
+    """
+    paths = property_list(properties, "background", GAME_BACKGROUND_TEXTURE)
+    parallaxes = property_list(properties, "background_parallax", BACKGROUND_DEFAULT_PARALLAX, len(paths))
+    scales = property_list(properties, "background_scale", BACKGROUND_DEFAULT_SCALE, len(paths))
+    repeats = property_list(properties, "background_repeat", "xy", len(paths))
+    layers = [BackgroundLayer(assets.texture(path, holder=holder), float(parallax), float(scale), repeat)
+              for path, parallax, scale, repeat in zip(paths, parallaxes, scales, repeats)]
+    return Background(layers)
@@ -0,0 +1,277 @@
+"""
+benchmark for running levels: plays scripted inputs through each level without a window and reports
+how long frames take (the whole update, and the physics step on its own) and how much memory Python
+allocates during a frame. results are saved as JSON and compared against a baseline, the same way as
+benchmark_levels.py, so runs on different commits can be compared.
+
+every level is played with each built-in script (walking, jumping, rolling and dashing to the
+right). swimming and cannon launches depend on where the water and cannons are in each map, so they
+are benchmarked with input recordings instead: record one with F5 while playing, and copy the .csr
+file into benchmarks/scripts/. every recording there is played as its own script.
+
+benchmark every level with every script, drawing too:
+    python benchmark_frames.py --draw
+benchmark level 4 for 3600 frames and save the results as the new baseline:
+    python benchmark_frames.py --levels 4 --frames 3600 --save-baseline
+"""
+import argparse
+import glob
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+import numpy
+from headless import HeadlessGame
+from arcade import key
+from constants import *
+from profiler import FrameProfiler
+from replay import InputReplay
+from benchmark_levels import compare_results, save_results, load_results, report_regressions
+
+# results that are compared against the baseline (ms, KB for allocations, memory blocks for controls_blocks)
+COMPARED_RESULTS = ("update_p50", "update_p99", "physics_p50", "physics_p99", "allocated_p50", "controls_blocks")
+
+# smallest change of each result that can count as a regression (tiny changes are mostly noise)
+MIN_DIFFERENCES = {name: BENCHMARK_MIN_DIFFERENCE * 1000 for name in COMPARED_RESULTS}
+MIN_DIFFERENCES["allocated_p50"] = 1
+MIN_DIFFERENCES["controls_blocks"] = 0.5
+
+# how each result is printed (scale, unit)
+UNITS = {name: (1, "ms") for name in COMPARED_RESULTS}
+UNITS["allocated_p50"] = (1, "KB")
+UNITS["controls_blocks"] = (1, " blocks")
+
+
+def hold(*keys):
+    """
+    script that holds keys down for the whole run
+    :param keys: the keys
+    :return: list of (frame, key, pressed)
+    """
+    return [(0, key_held, True) for key_held in keys]
+
+
+def tap(key_tapped, every, length, frames):
+    """
+    script that presses a key again and again
+    :param key_tapped: the key
+    :param every: frames between presses
+    :param length: frames the key is held down each time
+    :param frames: number of frames the script runs for
+    :return: list of (frame, key, pressed)
+    """
+    script = []
+    for frame in range(every, frames, every):
+        script += [(frame, key_tapped, True), (frame + length, key_tapped, False)]
+    return script
+
+
+# built-in scripts (name: function of the number of frames that makes the script)
+SCRIPTS = {
+    "walk": lambda frames: hold(key.RIGHT),
+    "jump": lambda frames: hold(key.RIGHT) + tap(key.UP, 45, 10, frames),
+    "roll": lambda frames: hold(key.DOWN, key.RIGHT),
+    "dash": lambda frames: hold(key.RIGHT) + tap(key.SPACE, 90, 5, frames),
+}
+
+
+def levels_in_maps():
+    """
+    get every level that can be loaded by number (maps/map<level>.tmx)
+    :return: list of levels, in order
+    """
+    levels = [os.path.basename(path)[len("map"):-len(".tmx")] for path in glob.glob("maps/map*.tmx")]
+    levels = [int(level) if level.isdigit() else level for level in levels]
+    return sorted(levels, key=lambda level: (isinstance(level, str), str(level).zfill(4)))
+
+
+def percentile(values, fraction):
+    """
+    :param values: list of numbers
+    :param fraction: 0.5 for the median, 0.99 for the 99th percentile
+    :return: the percentile
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def start_game(level, seed, window, replay=None):
+    """
+    load a level, ready to be benchmarked
+    :param level: the level number
+    :param seed: seed for the random number generators (ex: the player's walking colors)
+    :param window: hidden Arcade Window to draw into, or None
+    :param replay: InputReplay that drives the game, or None
+    :return: a HeadlessGame
+    """
+    random.seed(seed)
+    numpy.random.seed(seed)
+    if replay is None:
+        headless_game = HeadlessGame(level, window=window)
+    else:
+        headless_game = HeadlessGame(replay.level, replay.spawn_id, window=window)
+        headless_game.game.input_replay = replay
+    # wait for the levels behind the doors to be compiled, so the background thread doesn't slow the run
+    for future in list(headless_game.game.level_cache.loading.values()):
+        future.result()
+    return headless_game
+
+
+def run_frames(headless_game, script, frames, measure_allocations=False):
+    """
+    play a script and time every frame
+    :param headless_game: a HeadlessGame
+    :param script: list of (frame, key, pressed), or None if the game is driven by a replay
+    :param frames: number of frames to run
+    :param measure_allocations: measure the memory allocated in each frame instead (this makes frames
+                                slower, so the times of this run shouldn't be used)
+    :return: (frame times in ms, physics step times in ms, KB allocated in each frame, memory blocks the
+             controls left allocated in each frame (empty if the profiler doesn't count them))
+    """
+    game = headless_game.game
+    game.profiler = FrameProfiler(window=frames)
+    game.profiler.toggle()
+    events = {}
+    for frame, key_pressed, pressed in script or ():
+        events.setdefault(frame, []).append((key_pressed, pressed))
+
+    update_times = []
+    allocated = []
+    if measure_allocations:
+        tracemalloc.start()
+    for frame in range(frames):
+        if game.input_replay is not None and game.input_replay.finished:
+            break
+        for key_pressed, pressed in events.get(frame, ()):
+            if pressed:
+                headless_game.press(key_pressed)
+            else:
+                headless_game.release(key_pressed)
+        if measure_allocations:
+            before, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        headless_game.advance()
+        update_times.append((time.perf_counter() - start) * 1000)
+        if measure_allocations:
+            _, peak = tracemalloc.get_traced_memory()
+            allocated.append((peak - before) / 1024)
+    if measure_allocations:
+        tracemalloc.stop()
+    return (update_times, list(game.profiler.frame_times.get("physics step", ())), allocated,
+            list(game.profiler.allocations.get("handle_control_actions", ())))
+
+
+def benchmark(level, script, frames, seed, window, warmup, replay_path=None):
+    """
+    benchmark one script on one level
+    :param level: the level number (ignored for recordings, which have their own level)
+    :param script: list of (frame, key, pressed), or None for a recording
+    :param frames: number of frames to run
+    :param seed: seed for the random number generators
+    :param window: hidden Arcade Window to draw into, or None
+    :param warmup: number of frames at the start left out of the results
+    :param replay_path: recording to play instead of a script
+    :return: dict of results
+    """
+    replay = InputReplay(replay_path) if replay_path else None
+    update_times, physics_times, _, controls_blocks = run_frames(start_game(level, seed, window, replay),
+                                                                 script, frames)
+    replay = InputReplay(replay_path) if replay_path else None
+    _, _, allocated, _ = run_frames(start_game(level, seed, window, replay), script, frames,
+                                    measure_allocations=True)
+
+    update_times = update_times[warmup:] or update_times
+    physics_times = physics_times[warmup:] or physics_times or [0]
+    allocated = allocated[warmup:] or allocated
+    # the controls shouldn't keep anything allocated, so this should stay at 0
+    controls_blocks = controls_blocks[warmup:] or controls_blocks or [0]
+    return {"frames": len(update_times),
+            "update_p50": percentile(update_times, 0.5),
+            "update_p95": percentile(update_times, 0.95),
+            "update_p99": percentile(update_times, 0.99),
+            "update_max": max(update_times),
+            "update_mean": statistics.mean(update_times),
+            "physics_p50": percentile(physics_times, 0.5),
+            "physics_p99": percentile(physics_times, 0.99),
+            "allocated_p50": percentile(allocated, 0.5),
+            "allocated_max": max(allocated),
+            "controls_blocks": statistics.mean(controls_blocks)}
+
+
+def git_commit():
+    """
+    :return: the commit being benchmarked, or None if it can't be found
+    """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark playing Color Seeker levels without a window")
+    parser.add_argument("--levels", nargs="*", default=None,
+                        help="level numbers to play (default: every maps/map<level>.tmx)")
+    parser.add_argument("--scripts", nargs="*", default=list(SCRIPTS), help="built-in scripts to play")
+    parser.add_argument("--frames", type=int, default=1200, help="frames to run each script for")
+    parser.add_argument("--warmup", type=int, default=60, help="frames at the start left out of the results")
+    parser.add_argument("--seed", type=int, default=0, help="seed for the random number generators")
+    parser.add_argument("--draw", action="store_true", help="also draw every frame into a hidden window")
+    parser.add_argument("--baseline", default=os.path.join(BENCHMARK_DIRECTORY, "frames_baseline.json"),
+                        help="results to compare against")
+    parser.add_argument("--tolerance", type=float, default=BENCHMARK_TOLERANCE,
+                        help="fraction a result may grow by before it is a regression")
+    parser.add_argument("--save-baseline", action="store_true", help="save the results as the new baseline")
+    args = parser.parse_args()
+
+    window = None
+    if args.draw:
+        import arcade as ar
+        window = ar.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE, visible=False)
+
+    levels = [int(level) if level.isdigit() else level for level in args.levels] if args.levels \
+        else levels_in_maps()
+    runs = [(f"{level}:{name}", level, SCRIPTS[name](args.frames), None)
+            for level in levels for name in args.scripts]
+    runs += [(f"recording:{os.path.basename(path)}", None, None, path)
+             for path in sorted(glob.glob(os.path.join(BENCHMARK_DIRECTORY, "scripts", "*.csr")))]
+
+    results = {}
+    print(f"{'run':<28}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}{'physics':>9}{'alloc':>10}  (ms, KB)")
+    for name, level, script, replay_path in runs:
+        result = benchmark(level, script, args.frames, args.seed, window, args.warmup, replay_path)
+        results[name] = result
+        print(f"{name:<28}{result['update_p50']:>8.2f}{result['update_p95']:>8.2f}{result['update_p99']:>8.2f}"
+              f"{result['update_max']:>8.2f}{result['physics_p50']:>9.2f}{result['allocated_p50']:>10.1f}")
+
+    report = {"commit": git_commit(), "seed": args.seed, "frames": args.frames, "draw": args.draw,
+              "results": results}
+    output = os.path.join(BENCHMARK_DIRECTORY, f"frames-{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json")
+    save_results(report, output)
+    print(f"saved results to {output}")
+
+    baseline = load_results(args.baseline)
+    if args.save_baseline:
+        save_results(report, args.baseline)
+        print(f"saved baseline to {args.baseline}")
+    elif baseline is None:
+        print(f"no baseline at {args.baseline} (save one with --save-baseline)")
+    else:
+        if baseline["draw"] != args.draw or baseline["frames"] != args.frames:
+            print(f"warning: the baseline was run with draw={baseline['draw']}, frames={baseline['frames']}")
+        regressions = compare_results(results, baseline["results"], args.tolerance, COMPARED_RESULTS,
+                                      MIN_DIFFERENCES)
+        report_regressions(regressions, UNITS)
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.baseline} (commit {baseline['commit']})")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+"""
+benchmark for loading levels: compiles every map in maps/ a number of times without a window and
+reports how long each part of a load takes (parsing the .tmx, process_layer for each layer, working
+out hit boxes, merging walls, building sprites, adding everything to the physics engine), the
+memory a compiled level takes and the number of physics shapes it makes. results are saved as JSON
+and compared against a baseline, so a map edit (or code change) that makes loads slower shows up.
+
+the first load of each map is a warm-up (textures are decoded and cached by Arcade on it), and is
+reported on its own as the cold load time. the other loads are reported as medians.
+
+no baseline is shipped with the game, since times depend on the machine: save one with
+--save-baseline on a reference commit first, on the machine the comparisons will run on, and commit
+it (benchmarks/*_baseline.json is kept in git). until then every run reports "no baseline".
+
+benchmark every map 5 times and compare against the saved baseline:
+    python benchmark_levels.py --repeat 5
+benchmark some maps and save the results as the new baseline:
+    python benchmark_levels.py maps/map4.tmx maps/map12.tmx --save-baseline
+"""
+import argparse
+import glob
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+import headless  # sets up pyglet to never open a window, before arcade is imported
+import arcade as ar
+from constants import *
+from hit_boxes import HitBoxCache
+from level_cache import LEVEL_LAYERS, CompiledLevel
+from wall_geometry import merged_wall_pieces
+from level_physics import level_physics_steps
+
+# results that are compared against the baseline (seconds, or bytes for memory)
+COMPARED_RESULTS = ("parse", "process_layer", "hit_boxes", "wall_merge", "build_sprites", "physics", "total",
+                    "memory")
+
+# smallest change of each result that can count as a regression (tiny times are mostly noise)
+MIN_DIFFERENCES = {name: BENCHMARK_MIN_DIFFERENCE for name in COMPARED_RESULTS if name != "memory"}
+
+# how each result is printed (scale, unit)
+UNITS = {name: (1000, "ms") for name in COMPARED_RESULTS}
+UNITS["memory"] = (1e-6, "MB")
+
+
+class TimedHitBoxCache(HitBoxCache):
+    """
+    hit box cache that starts empty (so every hit box is worked out) and adds up the time spent in it
+    """
+
+    def __init__(self):
+        super().__init__(path=None)
+        self.seconds = 0
+
+    def points(self, texture, hit_box_algorithm, hit_box_detail=4.5):
+        start = time.perf_counter()
+        points = super().points(texture, hit_box_algorithm, hit_box_detail)
+        self.seconds += time.perf_counter() - start
+        return points
+
+
+def benchmark_map(path, trace_memory=False):
+    """
+    load a map once, timing each part of the load
+    :param path: path to the .tmx file
+    :param trace_memory: measure the memory used by the compiled level (this makes the load slower,
+                         so the times of this load shouldn't be used)
+    :return: dict of results
+    """
+    hit_box_cache = TimedHitBoxCache()
+    if trace_memory:
+        tracemalloc.start()
+    load_start = time.perf_counter()
+
+    start = time.perf_counter()
+    tile_map = ar.tilemap.read_tmx(path)
+    parse = time.perf_counter() - start
+
+    compiled = CompiledLevel(os.path.basename(path), tile_map, os.path.getmtime(path), hit_box_cache)
+    layers = {}
+    for layer_name in LEVEL_LAYERS:
+        hit_boxes_before = hit_box_cache.seconds
+        start = time.perf_counter()
+        compiled.compile_layer(layer_name)
+        elapsed = time.perf_counter() - start
+        hit_boxes = hit_box_cache.seconds - hit_boxes_before
+        layers[layer_name] = {"process_layer": elapsed - hit_boxes,
+                              "hit_boxes": hit_boxes,
+                              "tiles": len(compiled.layers[layer_name])}
+
+    start = time.perf_counter()
+    compiled.wall_pieces = merged_wall_pieces([tile.to_sprite() for tile in compiled.layers['Foreground']])
+    wall_merge = time.perf_counter() - start
+
+    memory = 0
+    if trace_memory:
+        memory, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+    start = time.perf_counter()
+    sprite_lists = {layer_name: compiled.build_layer(layer_name) for layer_name in LEVEL_LAYERS}
+    build_sprites = time.perf_counter() - start
+
+    start = time.perf_counter()
+    physics_engine = ar.PymunkPhysicsEngine(damping=DEFAULT_DAMPING, gravity=(0, -GRAVITY))
+    # the same steps as a level load in the game, run straight through
+    for _ in level_physics_steps(physics_engine, compiled.wall_pieces, sprite_lists):
+        pass
+    physics = time.perf_counter() - start
+
+    return {"parse": parse,
+            "process_layer": sum(layer["process_layer"] for layer in layers.values()),
+            "hit_boxes": hit_box_cache.seconds,
+            "wall_merge": wall_merge,
+            "build_sprites": build_sprites,
+            "physics": physics,
+            "total": time.perf_counter() - load_start,
+            "memory": memory,
+            "shapes": len(physics_engine.space.shapes),
+            "bodies": len(physics_engine.space.bodies),
+            "layers": layers}
+
+
+def median_results(runs):
+    """
+    combine the results of several runs into their medians
+    :param runs: list of result dicts (nested dicts are combined too)
+    :return: dict of medians
+    """
+    combined = {}
+    for name, value in runs[0].items():
+        if isinstance(value, dict):
+            combined[name] = median_results([run[name] for run in runs])
+        else:
+            combined[name] = statistics.median(run[name] for run in runs)
+    return combined
+
+
+def compare_results(results, baseline, tolerance=BENCHMARK_TOLERANCE, names=COMPARED_RESULTS,
+                    min_differences=MIN_DIFFERENCES):
+    """
+    find results that got worse than the baseline by more than the tolerance
+    :param results: {name: result dict} of this run
+    :param baseline: {name: result dict} of the baseline run
+    :param tolerance: fraction a result may grow by before it counts as a regression (0.2 is 20%)
+    :param names: names of the results to compare
+    :param min_differences: {result name: smallest change that can count as a regression}
+    :return: list of (name, result name, baseline value, value)
+    """
+    regressions = []
+    for name, result in results.items():
+        baseline_result = baseline.get(name)
+        if baseline_result is None:
+            continue
+        for result_name in names:
+            old = baseline_result.get(result_name)
+            new = result.get(result_name)
+            if old is None or new is None:
+                continue
+            if new - old < min_differences.get(result_name, 0):
+                continue
+            if new > old * (1 + tolerance):
+                regressions.append((name, result_name, old, new))
+    return regressions
+
+
+def save_results(results, path):
+    """
+    save benchmark results as JSON
+    :param results: the results
+    :param path: file to save to
+    :return: n/a
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w") as file:
+        json.dump(results, file, indent=2, sort_keys=True)
+
+
+def load_results(path):
+    """
+    :param path: file saved by save_results
+    :return: the results, or None if the file doesn't exist
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        return json.load(file)
+
+
+def report_regressions(regressions, units=UNITS):
+    """
+    print regressions found by compare_results
+    :param regressions: list of (name, result name, baseline value, value)
+    :param units: {result name: (scale, unit)} to print the results in
+    :return: n/a
+    """
+    for name, result_name, old, new in regressions:
+        scale, unit = units.get(result_name, (1, ""))
+        print(f"REGRESSION {name} {result_name}: {old * scale:.2f}{unit} -> {new * scale:.2f}{unit}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="benchmark loading Color Seeker levels without a window")
+    parser.add_argument("maps", nargs="*", help="map files to load (default: every map in maps/)")
+    parser.add_argument("--repeat", type=int, default=5, help="number of timed loads of each map")
+    parser.add_argument("--baseline", default=os.path.join(BENCHMARK_DIRECTORY, "levels_baseline.json"),
+                        help="results to compare against")
+    parser.add_argument("--tolerance", type=float, default=BENCHMARK_TOLERANCE,
+                        help="fraction a result may grow by before it is a regression")
+    parser.add_argument("--save-baseline", action="store_true", help="save the results as the new baseline")
+    args = parser.parse_args()
+
+    paths = args.maps or sorted(glob.glob("maps/*.tmx"))
+    results = {}
+    print(f"{'map':<18}{'cold':>9}{'total':>9}{'parse':>9}{'layers':>9}{'hitbox':>9}{'walls':>9}"
+          f"{'sprites':>9}{'physics':>9}{'memory':>10}{'shapes':>8}")
+    for path in paths:
+        name = os.path.basename(path)
+        cold = benchmark_map(path)["total"]
+        result = median_results([benchmark_map(path) for _ in range(args.repeat)])
+        result["cold"] = cold
+        result["memory"] = benchmark_map(path, trace_memory=True)["memory"]
+        results[name] = result
+        print(f"{name:<18}" + "".join(f"{result[key] * 1000:>7.1f}ms" for key in
+                                      ("cold", "total", "parse", "process_layer", "hit_boxes", "wall_merge",
+                                       "build_sprites", "physics"))
+              + f"{result['memory'] / 1e6:>8.2f}MB{result['shapes']:>8.0f}")
+
+    output = os.path.join(BENCHMARK_DIRECTORY, f"levels-{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.json")
+    save_results(results, output)
+    print(f"saved results to {output}")
+
+    baseline = load_results(args.baseline)
+    if args.save_baseline:
+        save_results(results, args.baseline)
+        print(f"saved baseline to {args.baseline}")
+    elif baseline is None:
+        print(f"no baseline at {args.baseline} (save one with --save-baseline)")
+    else:
+        regressions = compare_results(results, baseline, args.tolerance)
+        report_regressions(regressions)
+        if regressions:
+            sys.exit(1)
+        print(f"no regressions against {args.baseline}")
+
+
+if __name__ == '__main__':
+    main()
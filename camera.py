@@ -0,0 +1,130 @@
+"""
+class that moves the view around the map: follows the player with a dead zone (the player can move
+around the middle of the screen without the view moving), eases towards where it should be, stays
+inside the map and jumps straight to the player after a teleport. the viewport is only changed when
+the view actually moves, and the part of the map on screen (the frustum) is available to anything
+that wants to skip work for things that can't be seen.
+"""
+import math
+import arcade as ar
+from constants import *
+
+
+class Camera:
+    """
+    the view of the map
+    """
+
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT, headless=False):
+        """
+        :param width: width of the view in pixels
+        :param height: height of the view in pixels
+        :param headless: never change the window's viewport (there is no window, see headless.py)
+        """
+        self.width = width
+        self.height = height
+        self.headless = headless
+        self.map_width = width
+        self.map_height = height
+
+        self.target_left = 0.0  # where the view is heading
+        self.target_bottom = 0.0
+        self.left = 0.0  # where the view is, on its way to the target
+        self.bottom = 0.0
+        self.view_left = 0  # whole-pixel view given to the window
+        self.view_bottom = 0
+        self.moves = 0  # counts view changes, so other code can tell when the frustum changed
+
+    def set_bounds(self, map_width, map_height):
+        """
+        set the size of the map the view has to stay in
+        :param map_width: width of the map in pixels
+        :param map_height: height of the map in pixels
+        :return: n/a
+        """
+        self.map_width = map_width
+        self.map_height = map_height
+
+    def clamp(self, left, bottom):
+        """
+        keep a view position inside the map
+        :param left: left of the view
+        :param bottom: bottom of the view
+        :return: (left, bottom) inside the map
+        """
+        left = max(0, min(left, self.map_width - self.width))
+        bottom = max(0, min(bottom, self.map_height - self.height))
+        return left, bottom
+
+    def follow(self, target, delta_time):
+        """
+        move the view towards a sprite. the view only needs to move when the sprite leaves the
+        dead zone (VIEWPORT_*_MARGIN pixels in from the edges of the screen)
+        :param target: the sprite to follow
+        :param delta_time: time since the last frame
+        :return: n/a
+        """
+        left = self.target_left
+        bottom = self.target_bottom
+        if target.left < left + VIEWPORT_LEFT_MARGIN:
+            left = target.left - VIEWPORT_LEFT_MARGIN
+        elif target.right > left + self.width - VIEWPORT_RIGHT_MARGIN:
+            left = target.right - self.width + VIEWPORT_RIGHT_MARGIN
+        if target.top > bottom + self.height - VIEWPORT_MARGIN_TOP:
+            bottom = target.top - self.height + VIEWPORT_MARGIN_TOP
+        elif target.bottom < bottom + VIEWPORT_MARGIN_BOTTOM:
+            bottom = target.bottom - VIEWPORT_MARGIN_BOTTOM
+        self.target_left, self.target_bottom = self.clamp(left, bottom)
+
+        # ease towards the target the same amount per second no matter the frame rate
+        blend = 1 - math.exp(-CAMERA_FOLLOW_SPEED * delta_time)
+        self.left += (self.target_left - self.left) * blend
+        self.bottom += (self.target_bottom - self.bottom) * blend
+
+    def snap_to(self, x, y):
+        """
+        jump straight to a point (after the player teleported: level loaded, respawned, went
+        through a door), without easing
+        :param x: x of the point
+        :param y: y of the point
+        :return: n/a
+        """
+        self.target_left, self.target_bottom = self.clamp(x - VIEWPORT_RIGHT_MARGIN, y - VIEWPORT_MARGIN_BOTTOM)
+        self.left = self.target_left
+        self.bottom = self.target_bottom
+
+    def apply(self, force=False):
+        """
+        give the window's viewport the view, if it moved by at least a whole pixel
+        :param force: set the viewport even if the view didn't move (ex: another view changed it)
+        :return: True if the viewport changed
+        """
+        view_left = int(round(self.left))
+        view_bottom = int(round(self.bottom))
+        if view_left == self.view_left and view_bottom == self.view_bottom and not force:
+            return False
+        self.view_left = view_left
+        self.view_bottom = view_bottom
+        self.moves += 1
+        if not self.headless:
+            ar.set_viewport(view_left, view_left + self.width, view_bottom, view_bottom + self.height)
+        return True
+
+    def frustum(self, margin=0):
+        """
+        get the part of the map that is on screen
+        :param margin: pixels to add around each side (ex: to include things just off screen)
+        :return: (left, right, bottom, top)
+        """
+        return (self.view_left - margin, self.view_left + self.width + margin,
+                self.view_bottom - margin, self.view_bottom + self.height + margin)
+
+    def is_visible(self, sprite, margin=0):
+        """
+        check if any part of a sprite is on screen
+        :param sprite: an Arcade Sprite
+        :param margin: pixels to add around each side of the screen
+        :return: True if the sprite is (at least partly) on screen
+        """
+        left, right, bottom, top = self.frustum(margin)
+        return sprite.right >= left and sprite.left <= right and sprite.top >= bottom and sprite.bottom <= top
@@ -0,0 +1,124 @@
+"""
+class that splits a layer of sprites that don't move into screen-sized chunks, so only the chunks
+the camera can see are drawn. the cost of drawing a layer then depends on how much of it is on
+screen instead of on the size of the map.
+layers can also be baked: each chunk is drawn once into an offscreen framebuffer and read back
+into a single texture, so drawing the layer is one quad per chunk on screen instead of every sprite.
+"""
+import itertools
+import math
+import arcade as ar
+from PIL import Image
+from constants import *
+
+# numbers baked textures, since SpriteLists tell textures apart by name
+_bake_count = itertools.count()
+
+
+class ChunkedLayer:
+    """
+    the sprites of a layer sorted into a grid of SpriteLists. the sprites stay in their original
+    SpriteList too (for physics and collisions), and changes to them (color, alpha, being removed)
+    show up in their chunk as well
+    """
+
+    def __init__(self, sprite_list, chunk_width=CHUNK_WIDTH, chunk_height=CHUNK_HEIGHT, bake=False):
+        """
+        :param sprite_list: the layer's SpriteList
+        :param chunk_width: width of a chunk in pixels
+        :param chunk_height: height of a chunk in pixels
+        :param bake: draw the layer from baked chunk textures (only for layers whose sprites never
+                     change once loaded)
+        """
+        self.chunk_width = chunk_width
+        self.chunk_height = chunk_height
+        self.chunks = {}  # (column, row): SpriteList of the sprites whose center is in that chunk
+        self.overhang = 0  # furthest any sprite reaches out of its chunk
+        for sprite in sprite_list:
+            column = math.floor(sprite.center_x / chunk_width)
+            row = math.floor(sprite.center_y / chunk_height)
+            chunk = self.chunks.get((column, row))
+            if chunk is None:
+                chunk = self.chunks[(column, row)] = ar.SpriteList()
+            chunk.append(sprite)
+            self.overhang = max(self.overhang, sprite.width / 2, sprite.height / 2)
+        self.visible = []  # chunks drawn last time
+        self.camera_moves = None  # camera.moves when visible was worked out
+
+        self.bake_enabled = bake and BAKE_STATIC_LAYERS
+        self.baked = None  # (column, row): SpriteList with the chunk's baked sprite, made on first draw
+
+    def visible_chunks(self, camera):
+        """
+        get the chunks that are (at least partly) on screen
+        :param camera: the Camera
+        :return: list of SpriteLists
+        """
+        # the visible chunks only change when the camera moves
+        if camera.moves != self.camera_moves:
+            self.camera_moves = camera.moves
+            # baked chunks already hold everything that reaches into them
+            chunks, overhang = (self.baked, 0) if self.baked is not None else (self.chunks, self.overhang)
+            left, right, bottom, top = camera.frustum(overhang)
+            self.visible = [chunk
+                            for column in range(math.floor(left / self.chunk_width),
+                                                math.floor(right / self.chunk_width) + 1)
+                            for row in range(math.floor(bottom / self.chunk_height),
+                                             math.floor(top / self.chunk_height) + 1)
+                            for chunk in (chunks.get((column, row)),) if chunk]
+        return self.visible
+
+    def bake(self, camera):
+        """
+        draw every chunk into an offscreen framebuffer and read it back into a texture. sprites
+        reaching in from neighboring chunks are drawn into the chunk too, so nothing gets cut off
+        :param camera: the Camera (its viewport is put back afterwards)
+        :return: n/a
+        """
+        ctx = ar.get_window().ctx
+        width = self.chunk_width
+        height = self.chunk_height
+        framebuffer = ctx.framebuffer(color_attachments=[ctx.texture((width, height), components=4)])
+
+        # every chunk with sprites, and the chunks around them that sprites can reach into
+        keys = {(column + dx, row + dy) for column, row in self.chunks for dx in (-1, 0, 1) for dy in (-1, 0, 1)}
+        self.baked = {}
+        bake_number = next(_bake_count)
+        for column, row in keys:
+            left = column * width
+            bottom = row * height
+            ar.set_viewport(left, left + width, bottom, bottom + height)
+            with framebuffer.activate():
+                framebuffer.clear((0, 0, 0, 0))
+                drawn = False
+                for dx in (-1, 0, 1):
+                    for dy in (-1, 0, 1):
+                        chunk = self.chunks.get((column + dx, row + dy))
+                        if chunk:
+                            chunk.draw()
+                            drawn = True
+                if not drawn:
+                    continue
+                data = framebuffer.read(components=4)
+            image = Image.frombytes("RGBA", (width, height), bytes(data)).transpose(Image.FLIP_TOP_BOTTOM)
+            if not image.getbbox():
+                continue  # nothing in this chunk reached into its area
+            sprite = ar.Sprite(center_x=left + width / 2, center_y=bottom + height / 2)
+            sprite.texture = ar.Texture(f"baked-chunk-{bake_number}-{column}-{row}", image, hit_box_algorithm="None")
+            baked_chunk = ar.SpriteList()
+            baked_chunk.append(sprite)
+            self.baked[(column, row)] = baked_chunk
+
+        self.camera_moves = None
+        camera.apply(force=True)
+
+    def draw(self, camera):
+        """
+        draw the chunks that are on screen
+        :param camera: the Camera
+        :return: n/a
+        """
+        if self.bake_enabled and self.baked is None:
+            self.bake(camera)
+        for chunk in self.visible_chunks(camera):
+            chunk.draw()
@@ -0,0 +1,165 @@
+"""
+class that keeps track of what the player is touching, using Pymunk collision handlers instead of
+polygon checks every frame. Pymunk only calls the handlers when a contact begins or ends, so when
+nothing is touching the player this costs nothing.
+"""
+
+# collision types the player can interact with. water, doors and orbs are sensors: they report
+# contacts but never physically push the player
+PLAYER_INTERACTIONS = ("enemy", "door", "orb", "water", "cannon")
+
+
+def collision_type_id(physics_engine, collision_type):
+    """
+    get the Pymunk collision type number for a collision type name, registering the name if it is new
+    (same bookkeeping PymunkPhysicsEngine.add_sprite does)
+    :param physics_engine: Arcade's PymunkPhysicsEngine
+    :param collision_type: name of the collision type (ex: "wall")
+    :return: collision type number
+    """
+    if collision_type not in physics_engine.collision_types:
+        physics_engine.collision_types.append(collision_type)
+    return physics_engine.collision_types.index(collision_type)
+
+
+class CollisionEvents:
+    """
+    tracks the sprites the player is touching for each kind of interactive object, and routes
+    begin/separate events to gameplay callbacks
+    """
+
+    def __init__(self, physics_engine, player):
+        """
+        register player-vs-everything collision handlers on a physics engine
+        :param physics_engine: Arcade's PymunkPhysicsEngine
+        :param player: the player sprite (already added to the physics engine)
+        """
+        self.physics_engine = physics_engine
+        self.player = player
+        self.touching = {kind: [] for kind in PLAYER_INTERACTIONS}  # sprites touched, oldest contact first
+        self.callbacks = {}  # kind: (begin callback, separate callback)
+        self.pending = []  # (kind, callback index, sprite) waiting for dispatch()
+        self.removed = []  # (kind, sprite) contacts ended by a shape leaving the space, checked in dispatch()
+        self.shape_sprites = {}  # Pymunk shape: sprite it belongs to
+
+        player_type = collision_type_id(physics_engine, "player")
+        for kind in PLAYER_INTERACTIONS:
+            handler = physics_engine.space.add_collision_handler(player_type,
+                                                                 collision_type_id(physics_engine, kind))
+            handler.begin = self.make_begin_handler(kind)
+            handler.separate = self.make_separate_handler(kind)
+
+    def add_sensors(self, sprite_list):
+        """
+        turn the physics shapes of sprites already added to the physics engine into sensors
+        :param sprite_list: an Arcade SpriteList
+        :return: n/a
+        """
+        for sprite in sprite_list:
+            shape = self.physics_engine.get_physics_object(sprite).shape
+            shape.sensor = True
+            self.shape_sprites[shape] = sprite
+
+    def on(self, kind, begin=None, separate=None):
+        """
+        set the gameplay callbacks for a kind of object. callbacks are called with the touched sprite
+        from dispatch(), never from inside the physics step
+        :param kind: one of PLAYER_INTERACTIONS
+        :param begin: called when the player starts touching a sprite
+        :param separate: called when the player stops touching a sprite
+        :return: n/a
+        """
+        self.callbacks[kind] = (begin, separate)
+
+    def sprite_for_shape(self, shape):
+        """
+        find the sprite a Pymunk shape belongs to
+        :param shape: a Pymunk shape
+        :return: the sprite
+        """
+        sprite = self.shape_sprites.get(shape)
+        if sprite is None:
+            sprite = self.physics_engine.get_sprite_for_shape(shape)
+            self.shape_sprites[shape] = sprite
+        return sprite
+
+    def make_begin_handler(self, kind):
+        """
+        make the Pymunk "begin" handler for player-vs-kind contacts
+        :param kind: one of PLAYER_INTERACTIONS
+        :return: handler function
+        """
+        touching = self.touching[kind]
+
+        def begin(arbiter, space, data):
+            # shapes come in the order of the handler's collision types: (player, kind)
+            sprite = self.sprite_for_shape(arbiter.shapes[1])
+            # a sprite that is still being touched (ex: the player's shape was swapped for a new pose
+            # inside it) doesn't begin again
+            if sprite is not None and sprite not in touching:
+                touching.append(sprite)
+                self.pending.append((kind, 0, sprite))
+            return True
+        return begin
+
+    def make_separate_handler(self, kind):
+        """
+        make the Pymunk "separate" handler for player-vs-kind contacts
+        :param kind: one of PLAYER_INTERACTIONS
+        :return: handler function
+        """
+        touching = self.touching[kind]
+
+        def separate(arbiter, space, data):
+            sprite = self.sprite_for_shape(arbiter.shapes[1])
+            if sprite not in touching:
+                return
+            if arbiter.is_removal:
+                # one of the shapes left the space. when it's the player's shape being swapped for
+                # another pose the player is still touching the sprite, so wait for dispatch() to check
+                self.removed.append((kind, sprite))
+            else:
+                touching.remove(sprite)
+                self.pending.append((kind, 1, sprite))
+        return separate
+
+    def still_touching(self, sprite):
+        """
+        check if the player's current shape overlaps a sprite's shape
+        :param sprite: a sprite in the physics engine
+        :return: True if they overlap
+        """
+        if sprite not in self.physics_engine.sprites or self.player not in self.physics_engine.sprites:
+            return False
+        player_shape = self.physics_engine.get_physics_object(self.player).shape
+        return bool(player_shape.shapes_collide(self.physics_engine.get_physics_object(sprite).shape).points)
+
+    def first(self, kind):
+        """
+        get the sprite of a kind the player has been touching the longest
+        :param kind: one of PLAYER_INTERACTIONS
+        :return: a sprite, or None if the player isn't touching anything of that kind
+        """
+        touching = self.touching[kind]
+        if touching:
+            return touching[0]
+        return None
+
+    def dispatch(self):
+        """
+        call the gameplay callbacks for every contact that began or ended since the last dispatch
+        :return: n/a
+        """
+        # contacts ended by a shape being removed only end if the shapes no longer overlap
+        removed, self.removed = self.removed, []
+        for kind, sprite in removed:
+            touching = self.touching[kind]
+            if sprite in touching and not self.still_touching(sprite):
+                touching.remove(sprite)
+                self.pending.append((kind, 1, sprite))
+
+        pending, self.pending = self.pending, []
+        for kind, index, sprite in pending:
+            callbacks = self.callbacks.get(kind)
+            if callbacks and callbacks[index]:
+                callbacks[index](sprite)
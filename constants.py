@@ -1,7 +1,7 @@
 """
 list of all constants used across all game python scripts
 """
-from numpy import array as np
+from numpy import array as _array
 
 STARTING_LEVEL = 4
 
@@ -10,7 +10,7 @@ SCREEN_HEIGHT = 720
 SCREEN_WIDTH = 1280
 
 # a 1 pixel-wide circle to be enlarged by multiplying it by a desired number size
-CIRCLE = np([(1, 0), (0.966, 0.259), (0.866, 0.5), (0.707, 0.707), (0.5, 0.866), (0.259, 0.966),
+CIRCLE = _array([(1, 0), (0.966, 0.259), (0.866, 0.5), (0.707, 0.707), (0.5, 0.866), (0.259, 0.966),
                    (0, 1), (-0.259, 0.966), (-0.5, 0.866), (-0.707, 0.707), (-0.866, 0.5), (-0.966, 0.259),
                    (-1,0), (-0.966, -0.259), (-0.866, -0.5), (-0.707, -0.707), (-0.5, -0.866), (-0.259, -0.966),
                    (0,-1), (0.259, -0.966), (0.5, -0.866), (0.707, -0.707), (0.866, -0.5), (0.966, -0.259)
@@ -24,6 +24,91 @@ WHITE = [255,255,255,255]
 # frame rate of game (60)
 FRAME_RATE = 1/60
 
+# the game logic runs in fixed steps of this length no matter how fast frames are drawn.
+# speeds in the maps (change_x, change_y) are in pixels per step
+LOGIC_TIMESTEP = FRAME_RATE
+
+# physics steps per logic step (2 runs physics at 120 Hz)
+PHYSICS_STEPS_PER_LOGIC_STEP = 2
+
+# most logic steps run in a single frame when catching up after a slow frame
+MAX_LOGIC_STEPS_PER_FRAME = 5
+
+# sprites that moved further than this in one logic step (teleported) are not interpolated
+INTERPOLATION_SNAP_DISTANCE = 128
+
+# logic steps between the player state checksums stored in input recordings
+REPLAY_CHECKSUM_INTERVAL = 60
+
+# folder input recordings are saved to
+REPLAY_DIRECTORY = "replays"
+
+# seconds a message (ex: "saved recording to ...") stays on the HUD
+HUD_MESSAGE_TIME = 3
+
+# number of frames the profiler's rolling min/avg/p99 are taken over
+PROFILER_WINDOW = 300
+
+# frames between refreshes of the profiler overlay
+PROFILER_REPORT_INTERVAL = 30
+
+# most recent profiled sections kept for a Chrome trace (about a minute of frames)
+PROFILER_MAX_TRACE_EVENTS = 100000
+
+# folder profiler traces are saved to
+PROFILE_DIRECTORY = "profiles"
+
+# count the memory blocks each profiled section leaves allocated (debug builds only, python -O turns it off)
+PROFILER_COUNT_ALLOCATIONS = __debug__
+
+# folder benchmark results (and the baselines they are compared against) are saved to
+BENCHMARK_DIRECTORY = "benchmarks"
+
+# fraction a benchmark result may grow by over its baseline before it counts as a regression
+BENCHMARK_TOLERANCE = 0.2
+
+# smallest slowdown (in seconds) that can count as a regression, smaller ones are noise
+BENCHMARK_MIN_DIFFERENCE = 0.002
+
+# width of the profiler overlay in pixels
+PROFILER_OVERLAY_WIDTH = 560
+
+# number of loaded textures/sounds that nothing uses anymore kept cached before evicting them
+ASSET_CACHE_MAX_UNUSED = 64
+
+# image and sound files used by the views (loaded ahead of time at startup)
+TITLE_SCREEN_TEXTURE = "backgrounds/color_seeker_titlescreen.png"
+GAME_BACKGROUND_TEXTURE = "backgrounds/background1.jpg"
+ORB_TOUCHED_SOUND = "sounds/orb_get.ogg"
+ORB_OFF_SOUND = "sounds/orb_off.ogg"
+JUMP_SOUND = "sounds/jump1.wav"
+FOOTSTEP_SOUND = "sounds/footstep.wav"
+DASH_SOUND = "sounds/dash_whoosh.ogg"
+BG_MUSIC = "music/gamesong2.ogg"
+
+# folder for files worked out from the game's assets (texture atlases), rebuilt when missing
+CACHE_DIRECTORY = "cache"
+
+# file the hit boxes of tile images are saved to, next to the maps
+HIT_BOX_CACHE_PATH = "maps/hit_boxes.json"
+
+# background threads compiling the levels reachable through the current level's doors (0 to turn off)
+LEVEL_PRELOAD_WORKERS = 1
+
+# seconds of level loading done per logic step while the screen wipe covers the screen (about 20 steps)
+LEVEL_LOAD_BUDGET = 0.008
+
+# number of sprites (or wall pieces) added to the physics engine between checks of LEVEL_LOAD_BUDGET
+LEVEL_LOAD_SLICE = 64
+
+# widest a texture atlas gets, and the empty pixels kept around each frame in it
+ATLAS_MAX_WIDTH = 2048
+ATLAS_PADDING = 2
+
+# fonts the HUD text is rendered with (the first one found is used)
+HUD_FONTS = ("calibri.ttf", "arial.ttf", "Arial.ttf", "DejaVuSans.ttf")
+MONOSPACE_FONTS = ("cour.ttf", "Courier New.ttf", "DejaVuSansMono.ttf")
+
 # screen window title (working title is used
 SCREEN_TITLE = "Color seeker!"
 
@@ -89,6 +174,13 @@ ENEMY_FRICTION = 0.9
 # friction of tiles that are deemed to be walls
 WALL_FRICTION = 0.8
 
+# Foreground tiles are merged into larger collision shapes. gaps between tile hit boxes up to
+# twice this many pixels are closed when merging
+WALL_MERGE_SNAP = 1
+
+# how far (in pixels) a merged wall outline may be simplified when splitting it into convex pieces
+WALL_MERGE_TOLERANCE = 1.0
+
 # friction of cannon block
 CANNON_FRICTION = 0.2
 
@@ -117,6 +209,9 @@ PLAYER_MAX_HORIZONTAL_SPEED_ROLLING = 700
 PLAYER_MAX_HORIZONTAL_SPEED_IN_WATER = 250
 PLAYER_MAX_VERTICAL_SPEED_IN_WATER = 250
 
+# friction of the player's swimming shape (Arcade's default friction)
+PLAYER_SWIM_FRICTION = 0.2
+
 PLAYER_HEAVY_WATER_DAMPENING = 6000
 
 # close enough to not-moving to have the animation go to idle.
@@ -159,3 +254,27 @@ VIEWPORT_MARGIN_TOP = 200
 VIEWPORT_MARGIN_BOTTOM = 200
 VIEWPORT_RIGHT_MARGIN = 700
 VIEWPORT_LEFT_MARGIN = 300
+
+# size of the chunks layers that never move are split into for drawing (one screen)
+CHUNK_WIDTH = SCREEN_WIDTH
+CHUNK_HEIGHT = SCREEN_HEIGHT
+
+# pre-render layers that never change into one texture per chunk when a level loads
+BAKE_STATIC_LAYERS = True
+
+# how fast the background scrolls compared to the map, unless the map sets background_parallax
+BACKGROUND_DEFAULT_PARALLAX = 0.5
+
+# size of the background image, unless the map sets background_scale (fits the image to one screen tall)
+BACKGROUND_DEFAULT_SCALE = 0.36
+
+# how far from the player (in pixels, on each axis) enemies and moving platforms stay awake. a
+# screen plus a margin, so sprites are always awake before they can be seen
+ACTIVITY_RANGE_X = SCREEN_WIDTH + 400
+ACTIVITY_RANGE_Y = SCREEN_HEIGHT + 400
+
+# how much further out than ACTIVITY_RANGE_* a sprite has to be before it falls asleep
+ACTIVITY_HYSTERESIS = 200
+
+# how quickly the view catches up to the player (higher is snappier, about 1/x seconds to settle)
+CAMERA_FOLLOW_SPEED = 12
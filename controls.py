@@ -3,6 +3,7 @@ class that holds all of the controls for the game (key presses, clicks, etc)
 """
 import views
 from constants import *
+from player_physics import *
 from arcade import key
 from arcade import window_commands as ar
 from arcade import sound
@@ -33,7 +34,8 @@ class Controls():
             ar.close_window()
 
         # pause game (do this here to immediately pause without interrupting game)
-        if key_pressed == key.P:
+        # (there is no pause screen to show when running headless)
+        if key_pressed == key.P and not self.headless:
             pause_view = views.PauseView(game_view=self)
             self.window.show_view(pause_view)
 
@@ -71,6 +73,16 @@ class Controls():
         elif key_pressed == key.K and self.k_pressed:
             self.k_pressed = False
 
+        # show/hide the frame profiler, and save what it recorded as a Chrome trace
+        if key_pressed == key.J:
+            self.profiler.toggle()
+        if key_pressed == key.F12:
+            self.save_profile()
+
+        # start/stop recording input for replays (see replay.py)
+        if key_pressed == key.F5:
+            self.toggle_recording()
+
     def handle_key_release(self, key_pressed: int, modifier: int):
         """
         handle key being released
@@ -129,29 +141,25 @@ class Controls():
         handle movement when the player is in water
         :return:
         """
-        player_velocity = self.get_object_velocity(self.player)
-        x_vel = player_velocity[0]
-        y_vel = player_velocity[1]
+        player_physics = self.player_physics
+        x_vel = player_physics.velocity_x
+        y_vel = player_physics.velocity_y
 
         if y_vel >= -PLAYER_MAX_VERTICAL_SPEED_IN_WATER:
             if self.down_pressed and not self.up_pressed:
-                impulse = (0, -PLAYER_MOVE_FORCE_IN_WATER)
-                self.physics_engine.apply_impulse(self.player, impulse)
+                player_physics.apply_impulse(SWIM_DOWN_IMPULSE)
 
         if y_vel <= PLAYER_MAX_VERTICAL_SPEED_IN_WATER:
             if self.up_pressed and not self.down_pressed:
-                impulse = (0, PLAYER_MOVE_FORCE_IN_WATER)
-                self.physics_engine.apply_impulse(self.player, impulse)
+                player_physics.apply_impulse(SWIM_UP_IMPULSE)
 
         if x_vel <= PLAYER_MAX_HORIZONTAL_SPEED_IN_WATER:
             if self.right_pressed and not self.left_pressed:
-                impulse = (PLAYER_MOVE_FORCE_IN_WATER, 0)
-                self.physics_engine.apply_impulse(self.player, impulse)
+                player_physics.apply_impulse(SWIM_RIGHT_IMPULSE)
 
         if x_vel >= -PLAYER_MAX_HORIZONTAL_SPEED_IN_WATER:
             if self.left_pressed and not self.right_pressed:
-                impulse = (-PLAYER_MOVE_FORCE_IN_WATER, 0)
-                self.physics_engine.apply_impulse(self.player, impulse)
+                player_physics.apply_impulse(SWIM_LEFT_IMPULSE)
             # sound.play_sound(self.jump_sound, volume=0.4)
 
     def handle_water_physics(self):
@@ -164,53 +172,44 @@ class Controls():
         self.player.jumping = False
         self.player.crouching = False
 
-        player_velocity = self.get_object_velocity(self.player)
-        x_vel = player_velocity[0]
-        y_vel = player_velocity[1]
+        player_physics = self.player_physics
+        x_vel = player_physics.velocity_x
+        y_vel = player_physics.velocity_y
 
         #apply heavy dampening if the player velocity is very fast
         if y_vel < -PLAYER_MAX_VERTICAL_SPEED_IN_WATER:
-            water_dampening = (0, PLAYER_HEAVY_WATER_DAMPENING)
-            self.physics_engine.apply_force(self.player, water_dampening)
+            player_physics.apply_force(HEAVY_WATER_DAMPENING_UP)
         if x_vel > PLAYER_MAX_VERTICAL_SPEED_IN_WATER:
-            water_dampening = (-PLAYER_HEAVY_WATER_DAMPENING, 0)
-            self.physics_engine.apply_force(self.player, water_dampening)
+            player_physics.apply_force(HEAVY_WATER_DAMPENING_LEFT)
         elif x_vel < -PLAYER_MAX_VERTICAL_SPEED_IN_WATER:
-            water_dampening = (PLAYER_HEAVY_WATER_DAMPENING, 0)
-            self.physics_engine.apply_force(self.player, water_dampening)
+            player_physics.apply_force(HEAVY_WATER_DAMPENING_RIGHT)
 
         # apply counterforce on the x plane
         if x_vel >= WATER_DEAD_ZONE:
-            water_counterforce = (-WATER_DAMPENING_FORCE, 0)
-            self.physics_engine.apply_force(self.player, water_counterforce)
+            player_physics.apply_force(WATER_COUNTERFORCE_LEFT)
         elif x_vel <= -WATER_DEAD_ZONE:
-            water_counterforce = (WATER_DAMPENING_FORCE, 0)
-            self.physics_engine.apply_force(self.player, water_counterforce)
+            player_physics.apply_force(WATER_COUNTERFORCE_RIGHT)
 
         # apply counterforce on the y plane
         if y_vel >= WATER_DEAD_ZONE:
-            water_counterforce = (0, -WATER_DAMPENING_FORCE)
-            self.physics_engine.apply_force(self.player, water_counterforce)
+            player_physics.apply_force(WATER_COUNTERFORCE_DOWN)
         elif y_vel <= -WATER_DEAD_ZONE:
-            water_counterforce = (0, WATER_DAMPENING_FORCE)
-            self.physics_engine.apply_force(self.player, water_counterforce)
+            player_physics.apply_force(WATER_COUNTERFORCE_UP)
 
     def handle_key_combos(self):
         """
         handle what to do when a combination of keys are pressed (ex: spacebar + left keys)
         :return: n/a
         """
-        is_on_ground = self.physics_engine.is_on_ground(self.player)
+        is_on_ground = self.player_physics.on_ground
         # do cool action attributed to pressing the spacebar+left or right keys
         if self.right_pressed and self.down_pressed and not self.left_pressed and not self.player.jumping:
             self.crouching = True
-            impulse = (BALL_DASH_IMPULSE, 0)
-            self.physics_engine.apply_impulse(self.player, impulse)
+            self.player_physics.apply_impulse(DASH_RIGHT_IMPULSE)
 
         if self.left_pressed and self.down_pressed and not self.right_pressed and not self.player.jumping:
             self.crouching = True
-            impulse = (-BALL_DASH_IMPULSE, 0)
-            self.physics_engine.apply_impulse(self.player, impulse)
+            self.player_physics.apply_impulse(DASH_LEFT_IMPULSE)
 
     def handle_control_actions(self):
         """
@@ -227,38 +226,37 @@ class Controls():
             self.player.health = 0
 
         # mute music
-        if self.m_pressed:
+        if self.m_pressed and self.bg_music:
             self.bg_music.stop()
             self.playing_music = False
 
 
         if not self.player.in_water:
-            is_on_ground = self.physics_engine.is_on_ground(self.player)
+            # the player's velocity and ground contact are read once per step (see player_physics.py)
+            player_physics = self.player_physics
+            is_on_ground = player_physics.on_ground
             if not self.screen_wipe_rect:
                 # sliding and moving at the same time!
 
                 # do cool action attributed to pressing the down+left or right keys
                 if self.right_pressed and self.space_bar_pressed and not self.left_pressed\
                         and self.player.ball_dash_released and not self.player.crouching and is_on_ground:
-                    impulse = (BALL_DASH_IMPULSE, 0)
-                    self.physics_engine.apply_impulse(self.player, impulse)
+                    player_physics.apply_impulse(DASH_RIGHT_IMPULSE)
                     self.player.ball_dashing = True # this toggles the animation
 
                 elif self.left_pressed and self.space_bar_pressed and not self.right_pressed \
                         and self.player.ball_dash_released and not self.player.crouching and is_on_ground:
-                    impulse = (-BALL_DASH_IMPULSE, 0)
-                    self.physics_engine.apply_impulse(self.player, impulse)
+                    player_physics.apply_impulse(DASH_LEFT_IMPULSE)
                     self.player.ball_dashing = True # this toggles the animation
 
                 if self.down_pressed:  # (self.down_pressed and self.right_pressed) or (self.down_pressed and self.left_pressed):
-                    if self.physics_engine.is_on_ground(self.player) and not self.player.jumping and \
+                    if is_on_ground and not self.player.jumping and \
                             not self.player.in_water and not self.player.ball_dashing:
                         self.player.crouching = True
 
                 # jump up
-                player_velocities = self.get_object_velocity(self.player)
-                player_velocity_x = player_velocities[0]
-                player_velocity_y = player_velocities[1]
+                player_velocity_x = player_physics.velocity_x
+                player_velocity_y = player_physics.velocity_y
                 if self.up_pressed:
                     # don't jump when crouching
                     if not self.player.crouching:
@@ -266,45 +264,40 @@ class Controls():
                         self.player.current_y_velocity = player_velocity_y
                         if is_on_ground:
                             self.player.jumped_max_height = False
-                            self.physics_engine.set_velocity(self.player, (player_velocity_x, 0))
-                            impulse = (0, PLAYER_JUMP_IMPULSE)
-                            self.physics_engine.apply_impulse(self.player, impulse)
-                            sound.play_sound(self.jump_sound, volume=0.4)
+                            player_physics.set_velocity(player_velocity_x, 0)
+                            player_physics.apply_impulse(JUMP_IMPULSE)
+                            self.jump_sound.play(volume=0.4)
                         if not is_on_ground and round(player_velocity_y) == 0:
                             self.player.jumped_max_height = True
                         # if player has hi-jump enabled, increase the max jump velocity (quick and dirty solution...)
                         elif not self.player.jumped_max_height and self.player.hi_jump and player_velocity_y < \
                                 (PLAYER_MAX_JUMP_VELOCITY + 300):
-                            impulse = (0, PLAYER_JUMP_IMPULSE_IN_AIR)
-                            self.physics_engine.apply_impulse(self.player, impulse)
+                            player_physics.apply_impulse(JUMP_IMPULSE_IN_AIR)
                         elif not self.player.jumped_max_height and player_velocity_y < PLAYER_MAX_JUMP_VELOCITY:
                             # apply a smaller force while in the air to make a more realistic jump effect
                             # also allows for finer degree of control to jumping
-                            impulse = (0, PLAYER_JUMP_IMPULSE_IN_AIR)
-                            self.physics_engine.apply_impulse(self.player, impulse)
+                            player_physics.apply_impulse(JUMP_IMPULSE_IN_AIR)
                         else:
                             self.player.jumped_max_height = True
 
                 # Update player forces based on keys pressed
                 if self.left_pressed and not (self.right_pressed or self.down_pressed):
-                    # Create a force to the left. Apply it.
+                    # Apply a force to the left.
                     if is_on_ground:
-                        force = (-PLAYER_MOVE_FORCE_ON_GROUND, 0)
-                    elif self:
-                        force = (-PLAYER_MOVE_FORCE_IN_AIR, 0)
-                    self.physics_engine.apply_force(self.player, force)
+                        player_physics.apply_force(MOVE_LEFT_FORCE_ON_GROUND)
+                    else:
+                        player_physics.apply_force(MOVE_LEFT_FORCE_IN_AIR)
                     # Set friction to zero for the player while moving
-                    self.physics_engine.set_friction(self.player, 0)
+                    player_physics.set_friction(0)
 
                 elif self.right_pressed and not (self.left_pressed or self.down_pressed):
-                    # Create a force to the right. Apply it.
+                    # Apply a force to the right.
                     if is_on_ground:
-                        force = (PLAYER_MOVE_FORCE_ON_GROUND, 0)
+                        player_physics.apply_force(MOVE_RIGHT_FORCE_ON_GROUND)
                     else:
-                        force = (PLAYER_MOVE_FORCE_IN_AIR, 0)
-                    self.physics_engine.apply_force(self.player, force)
+                        player_physics.apply_force(MOVE_RIGHT_FORCE_IN_AIR)
                     # Set friction to zero for the player while moving
-                    self.physics_engine.set_friction(self.player, 0)
+                    player_physics.set_friction(0)
                 else:
                     # Player's feet are not moving. Therefore up the friction so we stop.
-                    self.physics_engine.set_friction(self.player, 1.0)
\ No newline at end of file
+                    player_physics.set_friction(1.0)
\ No newline at end of file
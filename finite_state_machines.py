@@ -1,7 +1,11 @@
 """
 list of all finite state machine classes
 """
+import math
 import fsm
+import pymunk
+import arcade as ar
+from constants import *
 
 class HiddenPlatformHandler(fsm.FiniteStateMachineMixin):
     state_machine = {
@@ -13,3 +17,104 @@ class HiddenPlatformHandler(fsm.FiniteStateMachineMixin):
             pass
 
     state = 'off'
+
+
+class PlayerPoseHandler(fsm.FiniteStateMachineMixin):
+    """
+    the player's pose: standing, rolled up in a ball (crouching) or swimming. every pose has its own
+    physics shape, mass moment and speed limits. the shapes are all built once and swapped on the
+    player's one Pymunk body, so changing pose never recreates the body and the player keeps its
+    exact velocity.
+    """
+    state_machine = {
+        'standing': ('ball', 'swimming'),
+        'ball': ('standing', 'swimming'),
+        'swimming': ('standing', 'ball'),
+    }
+
+    state = 'standing'
+
+    def __init__(self, player, physics_engine, standing_points, ball_points, swimming_points):
+        """
+        build the shapes of every pose on the body the player was added to the physics engine with,
+        and start out standing
+        :param player: the PlayerCharacter
+        :param physics_engine: Arcade's PymunkPhysicsEngine
+        :param standing_points: hit box of the standing pose
+        :param ball_points: hit box of the ball pose
+        :param swimming_points: hit box of the swimming pose
+        """
+        self.player = player
+        self.physics_engine = physics_engine
+        physics_object = physics_engine.get_physics_object(player)
+        body = physics_object.body
+        collision_type = physics_object.shape.collision_type
+
+        # pose: (hit box, friction, moment, max horizontal speed, max vertical speed)
+        poses = {
+            'standing': (standing_points, PLAYER_FRICTION, ar.PymunkPhysicsEngine.MOMENT_INF,
+                         PLAYER_MAX_HORIZONTAL_SPEED, PLAYER_MAX_VERTICAL_SPEED),
+            'ball': (ball_points, 0, None,
+                     PLAYER_MAX_HORIZONTAL_SPEED_ROLLING, PLAYER_MAX_VERTICAL_SPEED),
+            # swimming keeps the standing limits, so the player leaving the water (or falling into it) is
+            # capped the same way. the slower swimming speeds are kept by the water controls
+            'swimming': (swimming_points, PLAYER_SWIM_FRICTION, ar.PymunkPhysicsEngine.MOMENT_INF,
+                         PLAYER_MAX_HORIZONTAL_SPEED, PLAYER_MAX_VERTICAL_SPEED),
+        }
+        self.shapes = {}
+        self.moments = {}
+        self.speed_limits = {}
+        self.bottoms = {}  # lowest point of each pose's shape, relative to the body
+        for pose, (points, friction, moment, max_horizontal, max_vertical) in poses.items():
+            scaled_points = [(x * player.scale, y * player.scale) for x, y in points]
+            shape = pymunk.Poly(body, scaled_points)
+            shape.collision_type = collision_type
+            shape.friction = friction
+            self.shapes[pose] = shape
+            self.moments[pose] = moment if moment is not None else \
+                pymunk.moment_for_poly(body.mass, scaled_points)
+            self.speed_limits[pose] = (max_horizontal, max_vertical)
+            self.bottoms[pose] = min(y for x, y in scaled_points)
+
+        # replace the shape add_sprite made (from whatever hit box the player had) with the standing one
+        physics_engine.space.remove(physics_object.shape)
+        physics_object.shape = self.shapes['standing']
+        physics_engine.space.add(physics_object.shape)
+        body.moment = self.moments['standing']
+        self.state = 'standing'
+        body.velocity_func = self.update_velocity
+
+    def update_velocity(self, body, gravity, damping, dt):
+        """
+        Pymunk velocity function of the player's body: normal gravity and damping, then the speed
+        limits of the current pose. a vertical speed over the pose's max vertical speed is cut down to
+        its max horizontal speed, the same as Arcade's velocity callback did (the game is tuned to it)
+        """
+        pymunk.Body.update_velocity(body, gravity, damping, dt)
+        max_horizontal, max_vertical = self.speed_limits[self.state]
+        velocity_x, velocity_y = body.velocity
+        if max_horizontal is not None and abs(velocity_x) > max_horizontal:
+            velocity_x = math.copysign(max_horizontal, velocity_x)
+        if max_vertical is not None and abs(velocity_y) > max_vertical:
+            velocity_y = math.copysign(max_horizontal, velocity_y)
+        body.velocity = velocity_x, velocity_y
+
+    def on_change_state(self, previous_state, next_state, **kwargs):
+        """
+        swap the body's shape for the new pose's shape
+        """
+        physics_object = self.physics_engine.get_physics_object(self.player)
+        body = physics_object.body
+        space = self.physics_engine.space
+
+        space.remove(physics_object.shape)
+        if previous_state == 'ball':
+            # stop rolling, and lift the body so a taller shape doesn't start out inside the floor
+            body.angle = 0
+            body.angular_velocity = 0
+            lift = self.bottoms['ball'] - self.bottoms[next_state]
+            if lift > 0:
+                body.position = body.position.x, body.position.y + lift
+        body.moment = self.moments[next_state]
+        physics_object.shape = self.shapes[next_state]
+        space.add(physics_object.shape)
@@ -0,0 +1,136 @@
+"""
+headless mode: run the game logic (maps, physics, controls, damage, cannons, doors and orbs) with no
+window, no OpenGL context and no audio device, driven by scripted key presses.
+used for regression and balance testing on machines without a screen, and for benchmarking.
+
+run a level for a number of frames holding the right arrow key:
+    python headless.py --level 4 --frames 5000 --hold RIGHT
+"""
+import argparse
+import time
+import pyglet
+
+# never create a hidden OpenGL window when arcade is imported
+pyglet.options["shadow_window"] = False
+
+from arcade import key
+from constants import *
+
+
+class HeadlessWindow:
+    """
+    the parts of an Arcade Window that the game's views use, without opening a window
+    """
+
+    def __init__(self, width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+        self.width = width
+        self.height = height
+        self.current_view = None
+        self.ctx = None
+
+    def show_view(self, new_view):
+        self.current_view = new_view
+
+    def close(self):
+        pass
+
+
+class HeadlessGame:
+    """
+    a GameView running without a window. key presses are fed in by a script, and every call to
+    advance() runs one logic step per frame, as fast as the machine allows.
+    """
+
+    def __init__(self, level=STARTING_LEVEL, spawn_id=0, window=None):
+        """
+        :param level: the level number to load
+        :param spawn_id: the spawn point to start at (0 for the level's default spawn)
+        :param window: a (hidden) Arcade Window to also draw every frame into, or None to not draw
+        """
+        # imported here so the pyglet options above are set before arcade is imported
+        from main import GameView
+
+        self.drawing = window is not None
+        self.window = window or HeadlessWindow()
+        self.game = GameView(window=self.window, headless=True)
+        if self.drawing:
+            self.game.camera.headless = False  # drawing needs the viewport to follow the player
+        self.game.spawn_id = spawn_id
+        self.game.setup(level)
+        self.window.show_view(self.game)
+        self.frame = 0
+
+    def press(self, key_pressed):
+        """
+        press a key (ex: arcade.key.RIGHT), same as the player pressing it on the keyboard
+        :param key_pressed: the key
+        :return: n/a
+        """
+        self.game.on_key_press(key_pressed, 0)
+
+    def release(self, key_pressed):
+        """
+        release a key
+        :param key_pressed: the key
+        :return: n/a
+        """
+        self.game.on_key_release(key_pressed, 0)
+
+    def advance(self, frames=1):
+        """
+        run the game for a number of frames, each exactly one logic step long
+        :param frames: number of frames to run
+        :return: n/a
+        """
+        for _ in range(frames):
+            self.game.on_update(LOGIC_TIMESTEP)
+            if self.drawing:
+                self.game.on_draw()
+                self.window.ctx.finish()  # wait for the GPU, so its time counts towards the frame
+            else:
+                self.game.profiler.end_frame()  # there is no on_draw to end the frame
+            self.frame += 1
+
+    def run_script(self, script, frames):
+        """
+        run the game while pressing and releasing keys at given frames
+        :param script: iterable of (frame, key, pressed) where pressed is True for a key press and
+                       False for a key release
+        :param frames: total number of frames to run
+        :return: n/a
+        """
+        events = {}
+        for frame, key_pressed, pressed in script:
+            events.setdefault(frame, []).append((key_pressed, pressed))
+        for _ in range(frames):
+            for key_pressed, pressed in events.get(self.frame, ()):
+                if pressed:
+                    self.press(key_pressed)
+                else:
+                    self.release(key_pressed)
+            self.advance()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="run Color Seeker without a window")
+    parser.add_argument("--level", type=int, default=STARTING_LEVEL, help="level number to load")
+    parser.add_argument("--frames", type=int, default=3600, help="number of frames to simulate")
+    parser.add_argument("--hold", nargs="*", default=[],
+                        help="keys held down for the whole run (arcade.key names, ex: RIGHT SPACE)")
+    args = parser.parse_args()
+
+    headless_game = HeadlessGame(args.level)
+    script = [(0, getattr(key, name.upper()), True) for name in args.hold]
+
+    start = time.perf_counter()
+    headless_game.run_script(script, args.frames)
+    elapsed = time.perf_counter() - start
+
+    player = headless_game.game.player
+    print(f"level {headless_game.game.level}: {args.frames} frames in {elapsed:.2f}s "
+          f"({args.frames / elapsed:.0f} frames/s)")
+    print(f"player at ({player.center_x:.1f}, {player.center_y:.1f}), health {player.health}")
+
+
+if __name__ == '__main__':
+    main()
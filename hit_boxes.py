@@ -0,0 +1,72 @@
+"""
+class that remembers the hit box worked out for each tile image, and saves them next to the maps.
+working out a "Detailed" hit box traces the outline of the image's pixels, which is one of the
+slowest parts of loading a level, so it's done once per image and kept between runs.
+"""
+import json
+import os
+import threading
+import zlib
+import arcade as ar
+from constants import *
+
+
+class HitBoxCache:
+    """
+    hit box points of texture images, keyed by the image's pixels and the algorithm used. points are
+    relative to the center of the unscaled image, so the same entry works at any scale. levels compiled
+    in the background (see LevelCache.preload) share the cache, so it is locked while in use
+    """
+
+    def __init__(self, path=HIT_BOX_CACHE_PATH):
+        """
+        :param path: file the cache is saved to and loaded from
+        """
+        self.path = path
+        self.hit_boxes = {}  # key: tuple of points
+        self.changed = False
+        self.lock = threading.Lock()
+        if path and os.path.exists(path):
+            with open(path) as file:
+                self.hit_boxes = {key: tuple(tuple(point) for point in points)
+                                  for key, points in json.load(file).items()}
+
+    def points(self, texture, hit_box_algorithm, hit_box_detail=4.5):
+        """
+        get the hit box of a texture, working it out only if this image hasn't been seen before
+        :param texture: an Arcade Texture with its image loaded
+        :param hit_box_algorithm: "None", "Simple" or "Detailed"
+        :param hit_box_detail: how closely a "Detailed" hit box follows the image (lower is closer)
+        :return: tuple of (x, y) points
+        """
+        image = texture.image
+        key = f"{zlib.crc32(image.tobytes()):08x}-{image.width}x{image.height}-{hit_box_algorithm}-{hit_box_detail}"
+        with self.lock:
+            points = self.hit_boxes.get(key)
+        if points is None:
+            if hit_box_algorithm == "Detailed":
+                points = ar.calculate_hit_box_points_detailed(image, hit_box_detail)
+            elif hit_box_algorithm == "Simple":
+                points = ar.calculate_hit_box_points_simple(image)
+            else:
+                half_width = image.width / 2
+                half_height = image.height / 2
+                points = ((-half_width, -half_height), (half_width, -half_height),
+                          (half_width, half_height), (-half_width, half_height))
+            points = tuple(tuple(point) for point in points)
+            with self.lock:
+                self.hit_boxes[key] = points
+                self.changed = True
+        return points
+
+    def save(self):
+        """
+        write the cache to disk, if anything was added since it was loaded
+        :return: n/a
+        """
+        with self.lock:
+            if not self.changed or not self.path:
+                return
+            with open(self.path, "w") as file:
+                json.dump(self.hit_boxes, file)
+            self.changed = False
@@ -0,0 +1,177 @@
+"""
+classes for drawing the HUD (heads up display) text. each label's text is rendered to a texture once
+and only rendered again when the value shown changes, so a HUD that isn't changing costs about as
+much as drawing a few sprites. every label has a SpriteList of its own, so when a label's text changes
+only that label's image is uploaded again, not the images of every other label.
+"""
+import arcade as ar
+from PIL import Image, ImageDraw, ImageFont
+from constants import *
+
+_fonts = {}  # (font names, pixel size): loaded PIL font
+
+
+def get_font(font_names, size):
+    """
+    load the first font that can be found out of a list of font names
+    :param font_names: font file names to try, in order (ex: ("arial.ttf", "DejaVuSans.ttf"))
+    :param size: font size in pixels
+    :return: a PIL font
+    """
+    font = _fonts.get((font_names, size))
+    if font is None:
+        for font_name in font_names:
+            try:
+                font = ImageFont.truetype(font_name, size)
+                break
+            except OSError:
+                continue
+        else:
+            font = ImageFont.load_default()
+        _fonts[(font_names, size)] = font
+    return font
+
+
+def render_text(text, font_size, color, font_names=HUD_FONTS):
+    """
+    render a line of text to an image
+    :param text: the text
+    :param font_size: size of the text in points (same as ar.draw_text)
+    :param color: RGB or RGBA color of the text
+    :param font_names: font file names to try, in order
+    :return: PIL image, just big enough for the text
+    """
+    font = get_font(font_names, int(font_size * 4 / 3))  # points to pixels
+    _, _, right, bottom = font.getbbox(text or " ")
+    image = Image.new("RGBA", (max(1, right), max(1, bottom)), (0, 0, 0, 0))
+    ImageDraw.Draw(image).text((0, 0), text, font=font, fill=tuple(color))
+    return image
+
+
+class HudLabel(ar.Sprite):
+    """
+    a line of text at a fixed spot on the screen, showing a value through a format string
+    (ex: "HP: {:.2f}")
+    """
+
+    def __init__(self, name, text_format, offset_x, offset_y, font_size=18, color=ar.color.WHITE,
+                 font_names=HUD_FONTS):
+        """
+        :param name: name of the label, unique within its Hud
+        :param text_format: format string the value is shown with
+        :param offset_x: x of the left of the text, relative to the left of the screen
+        :param offset_y: y of the bottom of the text, relative to the bottom of the screen
+        :param font_size: size of the text in points
+        :param color: color of the text
+        :param font_names: font file names to try, in order
+        """
+        super().__init__()
+        self.name = name
+        self.text_format = text_format
+        self.offset_x = offset_x
+        self.offset_y = offset_y
+        self.font_size = font_size
+        self.text_color = color
+        self.font_names = font_names
+        self.value = None
+        self.text = None
+        self.sprite_list = None  # SpriteList holding only this label, made when its text changes
+
+    def set_value(self, value):
+        """
+        show a new value. the text is only rendered again if it is different from what's shown
+        :param value: the value to show
+        :return: True if the text changed
+        """
+        if value == self.value and self.text is not None:
+            return False
+        self.value = value
+        text = self.text_format.format(value)
+        if text == self.text:
+            return False
+        self.text = text
+        self.texture = ar.Texture(f"hud-{self.name}",
+                                  render_text(text, self.font_size, self.text_color, self.font_names))
+        self.width = self.texture.width
+        self.height = self.texture.height
+        # a SpriteList only uploads a texture name once, so the label moves to a new SpriteList to show
+        # the new image. the label is the only sprite in it, so only this label's image is uploaded
+        if self.sprite_list is not None:
+            self.sprite_list.remove(self)
+        self.sprite_list = ar.SpriteList()
+        self.sprite_list.append(self)
+        return True
+
+    def move_to(self, view_left, view_bottom):
+        """
+        place the label relative to the viewport
+        :param view_left: left of the viewport
+        :param view_bottom: bottom of the viewport
+        :return: n/a
+        """
+        self.left = view_left + self.offset_x
+        self.bottom = view_bottom + self.offset_y
+
+
+class Hud:
+    """
+    a set of labels anchored to the viewport
+    """
+
+    def __init__(self):
+        self.labels = {}  # name: HudLabel
+        self.shown = {}  # name: HudLabel of the labels that are shown, in the order they were shown
+        self.view = None  # (view_left, view_bottom) the labels were last placed at
+
+    def add_label(self, name, text_format, offset_x, offset_y, font_size=18, color=ar.color.WHITE,
+                  font_names=HUD_FONTS):
+        """
+        add a label (hidden until it's given a value with set())
+        :param name: name to refer to the label by
+        :param text_format: format string the value is shown with (ex: "HP: {:.2f}")
+        :param offset_x: x of the left of the text, relative to the left of the screen
+        :param offset_y: y of the bottom of the text, relative to the bottom of the screen
+        :param font_size: size of the text in points
+        :param color: color of the text
+        :param font_names: font file names to try, in order
+        :return: the HudLabel
+        """
+        label = HudLabel(name, text_format, offset_x, offset_y, font_size, color, font_names)
+        self.labels[name] = label
+        return label
+
+    def set(self, name, value):
+        """
+        show a value on a label
+        :param name: name of the label
+        :param value: the value to show
+        :return: n/a
+        """
+        label = self.labels[name]
+        changed = label.set_value(value)
+        self.shown[name] = label
+        # the label's size changes with its text, so it has to be placed again
+        if changed and self.view:
+            label.move_to(*self.view)
+
+    def hide(self, name):
+        """
+        stop showing a label
+        :param name: name of the label
+        :return: n/a
+        """
+        self.shown.pop(name, None)
+
+    def draw(self, view_left, view_bottom):
+        """
+        draw every shown label
+        :param view_left: left of the viewport
+        :param view_bottom: bottom of the viewport
+        :return: n/a
+        """
+        if self.view != (view_left, view_bottom):
+            self.view = (view_left, view_bottom)
+            for label in self.labels.values():
+                label.move_to(view_left, view_bottom)
+        for label in self.shown.values():
+            label.sprite_list.draw()
@@ -0,0 +1,50 @@
+"""
+class that smooths out drawing of moving sprites when the game logic runs at a fixed rate.
+sprites are drawn part of the way between their positions at the last two logic steps, then put
+back to their real (simulated) positions once drawing is done.
+"""
+from constants import INTERPOLATION_SNAP_DISTANCE
+
+
+class SpriteInterpolator:
+    """
+    remembers where sprites were before a logic step and blends towards where they are now
+    """
+
+    def __init__(self):
+        self.previous = []  # (sprite, x, y) before the last logic step
+        self.drawn = []  # (sprite, x, y) real positions of sprites moved by apply()
+
+    def store(self, sprite_lists):
+        """
+        remember the current position of every sprite. call this right before each logic step
+        :param sprite_lists: the SpriteLists to interpolate
+        :return: n/a
+        """
+        self.previous = [(sprite, sprite.center_x, sprite.center_y)
+                         for sprite_list in sprite_lists for sprite in sprite_list]
+
+    def apply(self, alpha):
+        """
+        move sprites to their interpolated positions for drawing
+        :param alpha: 0 draws sprites where they were before the last step, 1 where they are now
+        :return: n/a
+        """
+        self.drawn = []
+        for sprite, previous_x, previous_y in self.previous:
+            x = sprite.center_x
+            y = sprite.center_y
+            # don't blend across a teleport (respawning, level change, cannon reset)
+            if abs(x - previous_x) > INTERPOLATION_SNAP_DISTANCE or abs(y - previous_y) > INTERPOLATION_SNAP_DISTANCE:
+                continue
+            self.drawn.append((sprite, x, y))
+            sprite.position = (previous_x + (x - previous_x) * alpha, previous_y + (y - previous_y) * alpha)
+
+    def restore(self):
+        """
+        put sprites moved by apply() back to their real positions. call this once drawing is done
+        :return: n/a
+        """
+        for sprite, x, y in self.drawn:
+            sprite.position = (x, y)
+        self.drawn = []
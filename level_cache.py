@@ -0,0 +1,234 @@
+"""
+compiled level cache. parsing a .tmx map and running process_layer on every layer is slow, so the
+first load of a map is "compiled" into plain tile records (texture, position, hit box, properties)
+and every later load of the same map (respawns, doors back and forth) is rebuilt from those records.
+levels the player can reach next (through the doors of the current level) are compiled ahead of time
+on a background thread, so going through a door only has to build sprites from the compiled records.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import arcade as ar
+from constants import *
+from hit_boxes import HitBoxCache
+from wall_geometry import merged_wall_pieces
+
+# every layer the game reads from a map, with the arguments it is processed with
+# (layer name: (scaling, use_spatial_hash, hit_box_algorithm))
+LEVEL_LAYERS = {
+    'Color Orbs': (SPRITE_SCALING, True, "Simple"),
+    'Player Spawn': (SPRITE_SCALING, True, "Simple"),
+    'Foreground': (TILE_SCALING, False, "Detailed"),
+    'Enemies': (SPRITE_SCALING, True, "Simple"),
+    'Foreground Objects': (TILE_SCALING, True, "Simple"),
+    'Middleground': (TILE_SCALING, True, "Simple"),
+    'Moving Platforms': (TILE_SCALING, True, "Simple"),
+    'Cannons': (TILE_SCALING, True, "Simple"),
+    'Heavy Blocks': (TILE_SCALING, True, "Simple"),
+    'Water': (TILE_SCALING, True, "Simple"),
+    'Doors': (TILE_SCALING, True, "Simple"),
+    'Hidden Platforms': (TILE_SCALING, True, "Simple"),
+}
+
+
+def level_path(level):
+    """
+    get the path of a level's .tmx file
+    :param level: the level number
+    :return: path to the map file
+    """
+    return f"maps/map{level}.tmx"
+
+
+class CompiledTile:
+    """
+    everything needed to recreate one sprite of a processed layer without touching the .tmx file again
+    """
+    __slots__ = ("texture", "scale", "position", "angle", "color", "alpha", "points", "properties",
+                 "change_x", "change_y", "boundary_left", "boundary_right", "boundary_top", "boundary_bottom")
+
+    def __init__(self, sprite):
+        self.texture = sprite.texture
+        self.scale = sprite.scale
+        self.position = (sprite.center_x, sprite.center_y)
+        self.angle = sprite.angle
+        self.color = tuple(sprite.color)
+        self.alpha = sprite.alpha
+        self.points = tuple(tuple(point) for point in sprite.get_hit_box())
+        self.properties = dict(sprite.properties)
+        self.change_x = sprite.change_x
+        self.change_y = sprite.change_y
+        self.boundary_left = sprite.boundary_left
+        self.boundary_right = sprite.boundary_right
+        self.boundary_top = sprite.boundary_top
+        self.boundary_bottom = sprite.boundary_bottom
+
+    def to_sprite(self):
+        """
+        create a fresh sprite from this record (hit box is reused, not recalculated)
+        :return: an Arcade Sprite
+        """
+        sprite = ar.Sprite(scale=self.scale)
+        sprite.texture = self.texture
+        sprite.set_hit_box(self.points)
+        sprite.center_x, sprite.center_y = self.position
+        sprite.angle = self.angle
+        sprite.color = self.color
+        sprite.alpha = self.alpha
+        sprite.properties = dict(self.properties)
+        sprite.change_x = self.change_x
+        sprite.change_y = self.change_y
+        sprite.boundary_left = self.boundary_left
+        sprite.boundary_right = self.boundary_right
+        sprite.boundary_top = self.boundary_top
+        sprite.boundary_bottom = self.boundary_bottom
+        return sprite
+
+
+class CompiledLevel:
+    """
+    compact in-memory form of a whole .tmx map: its size, properties and the tile records of every layer
+    """
+
+    def __init__(self, level, tile_map, mtime, hit_box_cache=None):
+        self.level = level
+        self.mtime = mtime
+        self.tile_map = tile_map  # kept around for anything that still needs the raw map
+        self.width = tile_map.map_size.width
+        self.height = tile_map.map_size.height
+        self.properties = dict(tile_map.properties or {})
+        self.layers = {}
+        self.wall_pieces = None  # merged Foreground collision shapes, filled in when compiled
+        self.hit_box_cache = hit_box_cache or HitBoxCache(path=None)
+
+    def compile_layer(self, layer_name):
+        """
+        run process_layer once on a layer and store its sprites as tile records.
+        hit boxes come from the hit box cache instead of being worked out by process_layer
+        :param layer_name: name of the layer in the map
+        :return: n/a
+        """
+        scaling, use_spatial_hash, hit_box_algorithm = LEVEL_LAYERS[layer_name]
+        sprite_list = ar.tilemap.process_layer(self.tile_map,
+                                               layer_name=layer_name,
+                                               scaling=scaling,
+                                               use_spatial_hash=use_spatial_hash,
+                                               hit_box_algorithm="None")
+        for sprite in sprite_list:
+            # tiles with a collision shape drawn in Tiled keep that shape
+            if tuple(map(tuple, sprite.get_hit_box())) == tuple(map(tuple, sprite.texture.hit_box_points)):
+                sprite.set_hit_box(self.hit_box_cache.points(sprite.texture, hit_box_algorithm))
+        self.layers[layer_name] = [CompiledTile(sprite) for sprite in sprite_list]
+
+    def build_layer(self, layer_name):
+        """
+        build a new SpriteList for a layer from its tile records
+        :param layer_name: name of the layer in the map
+        :return: an Arcade SpriteList (empty if the map does not have the layer)
+        """
+        use_spatial_hash = LEVEL_LAYERS[layer_name][1]
+        sprite_list = ar.SpriteList(use_spatial_hash=use_spatial_hash)
+        for tile in self.layers.get(layer_name, ()):
+            sprite_list.append(tile.to_sprite())
+        return sprite_list
+
+
+class LevelCache:
+    """
+    keeps one CompiledLevel per map. entries are keyed by the map file's modification time, so a
+    map that is re-saved in Tiled while the game is running gets recompiled on its next load.
+    levels can be compiled ahead of time in the background with preload()
+    """
+
+    def __init__(self, hit_box_cache_path=HIT_BOX_CACHE_PATH, preload_workers=LEVEL_PRELOAD_WORKERS):
+        """
+        :param hit_box_cache_path: file tile hit boxes are saved to (None to not save them)
+        :param preload_workers: number of background threads compiling levels (0 to not preload)
+        """
+        self.levels = {}
+        self.loading = {}  # level: Future of the level being compiled in the background
+        self.lock = threading.Lock()  # guards levels and loading
+        self.hit_box_cache = HitBoxCache(hit_box_cache_path)
+        self.executor = None
+        if preload_workers:
+            self.executor = ThreadPoolExecutor(max_workers=preload_workers, thread_name_prefix="level-preload")
+
+    def get(self, level):
+        """
+        get the compiled form of a level, compiling it if it is not cached (or is out of date).
+        if the level is being compiled in the background, wait for it instead of compiling it twice
+        :param level: the level number
+        :return: a CompiledLevel
+        """
+        path = level_path(level)
+        mtime = os.path.getmtime(path)
+        with self.lock:
+            compiled = self.levels.get(level)
+            future = self.loading.get(level)
+        if (compiled is None or compiled.mtime != mtime) and future is not None:
+            compiled = future.result()
+        if compiled is None or compiled.mtime != mtime:
+            compiled = self.compile(level, path, mtime)
+            with self.lock:
+                self.levels[level] = compiled
+        return compiled
+
+    def preload(self, levels):
+        """
+        start compiling levels in the background, skipping the ones already compiled or compiling
+        :param levels: level numbers (ex: the goto_level of every door in the current level)
+        :return: n/a
+        """
+        if self.executor is None:
+            return
+        for level in levels:
+            path = level_path(level)
+            if not os.path.exists(path):
+                continue
+            mtime = os.path.getmtime(path)
+            with self.lock:
+                compiled = self.levels.get(level)
+                if (compiled is not None and compiled.mtime == mtime) or level in self.loading:
+                    continue
+                self.loading[level] = self.executor.submit(self.compile_in_background, level, path, mtime)
+
+    def compile_in_background(self, level, path, mtime):
+        """
+        compile a level on a preload thread and cache it
+        :param level: the level number
+        :param path: path to the .tmx file
+        :param mtime: modification time of the file when it was read
+        :return: a CompiledLevel
+        """
+        try:
+            compiled = self.compile(level, path, mtime)
+            with self.lock:
+                self.levels[level] = compiled
+            return compiled
+        finally:
+            with self.lock:
+                self.loading.pop(level, None)
+
+    def compile(self, level, path, mtime):
+        """
+        parse a .tmx map and compile every layer the game uses
+        :param level: the level number
+        :param path: path to the .tmx file
+        :param mtime: modification time of the file when it was read
+        :return: a CompiledLevel
+        """
+        compiled = CompiledLevel(level, ar.tilemap.read_tmx(path), mtime, self.hit_box_cache)
+        for layer_name in LEVEL_LAYERS:
+            compiled.compile_layer(layer_name)
+        # walls are merged from loose sprites (not a SpriteList) so this also works off the main thread
+        compiled.wall_pieces = merged_wall_pieces([tile.to_sprite() for tile in compiled.layers.get('Foreground', ())])
+        self.hit_box_cache.save()
+        return compiled
+
+    def clear(self):
+        """
+        forget every compiled level (levels still compiling in the background are cached when done)
+        :return: n/a
+        """
+        with self.lock:
+            self.levels = {}
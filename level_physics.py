@@ -0,0 +1,70 @@
+"""
+adds a level's walls and sprites to the physics engine, a slice at a time. used by
+GameView.level_load_steps and by the level loading benchmark, so the benchmark times the same work
+a level load does.
+"""
+import arcade as ar
+from constants import *
+from wall_geometry import add_wall_pieces
+
+
+def add_sprites_in_slices(physics_engine, sprite_list, **kwargs):
+    """
+    add a list of sprites to the physics engine LEVEL_LOAD_SLICE at a time
+    :param physics_engine: Arcade's PymunkPhysicsEngine
+    :param sprite_list: an Arcade SpriteList
+    :param kwargs: arguments for PymunkPhysicsEngine.add_sprite
+    :return: generator
+    """
+    sprites = list(sprite_list)
+    for start in range(0, len(sprites), LEVEL_LOAD_SLICE):
+        for sprite in sprites[start:start + LEVEL_LOAD_SLICE]:
+            physics_engine.add_sprite(sprite, **kwargs)
+        yield
+
+
+# layers that are only touched by the player, added as sensors (layer name, collision type name)
+SENSOR_LAYERS = (('Water', "water"), ('Doors', "door"), ('Color Orbs', "orb"))
+
+
+def level_physics_steps(physics_engine, wall_pieces, layers):
+    """
+    add a level's walls, enemies, moving platforms, cannons and sensor layers to the physics engine.
+    this is a generator that stops after every LEVEL_LOAD_SLICE wall pieces or sprites
+    (see GameView.level_load_steps). the SENSOR_LAYERS sprites are only added; making their shapes
+    sensors is up to CollisionEvents.add_sensors
+    :param physics_engine: Arcade's PymunkPhysicsEngine
+    :param wall_pieces: the level's merged wall pieces (see wall_geometry.merged_wall_pieces)
+    :param layers: {layer name: SpriteList} with the 'Enemies', 'Moving Platforms', 'Cannons' and
+                   SENSOR_LAYERS layers of the level
+    :return: generator, which returns the Pymunk shapes of the walls
+    """
+    # walls are merged into a few large shapes instead of one shape per tile
+    wall_shapes = []
+    for start in range(0, len(wall_pieces), LEVEL_LOAD_SLICE):
+        wall_shapes += add_wall_pieces(physics_engine,
+                                       wall_pieces[start:start + LEVEL_LOAD_SLICE],
+                                       friction=WALL_FRICTION,
+                                       collision_type="wall")
+        yield
+
+    yield from add_sprites_in_slices(physics_engine, layers['Enemies'],
+                                     mass=ENEMY_MASS,
+                                     body_type=ar.PymunkPhysicsEngine.KINEMATIC,
+                                     collision_type="enemy")
+
+    yield from add_sprites_in_slices(physics_engine, layers['Moving Platforms'],
+                                     friction=WALL_FRICTION,
+                                     body_type=ar.PymunkPhysicsEngine.KINEMATIC,
+                                     collision_type="wall")
+
+    yield from add_sprites_in_slices(physics_engine, layers['Cannons'],
+                                     friction=WALL_FRICTION,
+                                     collision_type="cannon",
+                                     body_type=ar.PymunkPhysicsEngine.DYNAMIC)
+
+    for layer_name, collision_type in SENSOR_LAYERS:
+        yield from add_sprites_in_slices(physics_engine, layers[layer_name],
+                                         collision_type=collision_type,
+                                         body_type=ar.PymunkPhysicsEngine.STATIC)
+    return wall_shapes
@@ -0,0 +1,118 @@
+"""
+class that holds the starting state of a level's dynamic objects, so that dying can rewind the
+level in place instead of rebuilding the whole map and physics world
+"""
+import arcade as ar
+from constants import *
+
+
+class LevelSnapshot:
+    """
+    snapshot of everything that can move or change while a level is played (player, enemies,
+    moving platforms, cannons, hidden platforms, key colors). static walls are not stored since
+    they never change, which is what makes restoring cost O(dynamic objects) instead of O(tiles).
+    """
+
+    def __init__(self, game):
+        """
+        take the snapshot. should be called right after a level has finished loading
+        :param game: the GameView that just loaded a level
+        """
+        self.level = game.level
+        self.spawn_id = game.spawn_id
+        self.physics_engine = game.physics_engine
+        self.key_colors = dict(game.key_colors)
+        self.enemies = [self.sprite_state(enemy) for enemy in game.enemies_list]
+        self.moving_platforms = [self.sprite_state(platform) for platform in game.moving_platforms_list]
+        self.cannons = [self.sprite_state(cannon) for cannon in game.cannons_list]
+
+    @staticmethod
+    def sprite_state(sprite):
+        """
+        store the parts of a sprite that change during play
+        :param sprite: an Arcade Sprite
+        :return: (sprite, position, angle, color, change_x, change_y)
+        """
+        return (sprite, (sprite.center_x, sprite.center_y), sprite.angle, tuple(sprite.color),
+                sprite.change_x, sprite.change_y)
+
+    def matches(self, game):
+        """
+        check if this snapshot can be used to restart the level the game is about to load
+        :param game: the GameView
+        :return: True if the same level and spawn point are being reloaded in the same physics world
+        """
+        return game.level == self.level and game.spawn_id == self.spawn_id and \
+            game.physics_engine is self.physics_engine
+
+    def restore(self, game):
+        """
+        rewind the level back to the state it was in when the snapshot was taken
+        :param game: the GameView
+        :return: n/a
+        """
+        physics_engine = self.physics_engine
+
+        # the player goes back to the spawnpoint, standing still
+        game.player.color = DEFAULT_COLOR
+        game.player.change_pose("standing")
+        physics_engine.set_position(game.player, game.player.spawnpoint)
+        physics_engine.set_velocity(game.player, (0, 0))
+
+        # enemies killed by dashing are put back into the level
+        for enemy, position, angle, color, change_x, change_y in self.enemies:
+            if game.enemies_list not in enemy.sprite_lists:
+                game.enemies_list.append(enemy)
+            self.restore_sprite(enemy, position, angle, color, change_x, change_y)
+            if enemy in physics_engine.sprites:
+                physics_engine.set_position(enemy, position)
+            else:
+                physics_engine.add_sprite(enemy,
+                                          mass=ENEMY_MASS,
+                                          body_type=ar.PymunkPhysicsEngine.KINEMATIC,
+                                          collision_type="enemy")
+
+        for platform, position, angle, color, change_x, change_y in self.moving_platforms:
+            self.restore_sprite(platform, position, angle, color, change_x, change_y)
+            physics_engine.set_position(platform, position)
+
+        # cannons may have been launched off the map (and removed from the physics engine), so
+        # recreate their bodies to also reset their rotation and velocity
+        for cannon, position, angle, color, change_x, change_y in self.cannons:
+            if cannon in physics_engine.sprites:
+                physics_engine.remove_sprite(cannon)
+            self.restore_sprite(cannon, position, angle, color, change_x, change_y)
+            physics_engine.add_sprite(cannon,
+                                      friction=WALL_FRICTION,
+                                      collision_type="cannon",
+                                      body_type=ar.PymunkPhysicsEngine.DYNAMIC)
+        game.current_cannon = None
+        game.cannon_timed = None
+
+        # hide the hidden platforms again
+        if game.hidden_platform_list:
+            for platform in game.hidden_platform_list:
+                physics_engine.remove_sprite(platform)
+            game.hidden_platform_list = None
+        game.key_colors = dict(self.key_colors)
+
+        # everything was put back where it started, so sleeping sprites wake up without moving
+        game.activity.reset()
+
+    @staticmethod
+    def restore_sprite(sprite, position, angle, color, change_x, change_y):
+        """
+        put a sprite back to its stored state
+        :param sprite: an Arcade Sprite
+        :param position: (x, y) center position
+        :param angle: angle in degrees
+        :param color: color of the sprite
+        :param change_x: x movement per frame
+        :param change_y: y movement per frame
+        :return: n/a
+        """
+        sprite.center_x, sprite.center_y = position
+        sprite.angle = angle
+        sprite.color = color
+        sprite.change_x = change_x
+        sprite.change_y = change_y
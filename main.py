@@ -3,13 +3,46 @@ Main game driver (run this file to play game!)
 """
 # all classes and constants from views.py and constants.py are
 # going to be used in this file, so we import all of them!
+import os
 import time
 import views
 import fsm
+from datetime import datetime
 from constants import *
 from player import *
 from transition import Transition
 from controls import Controls
+from level_cache import LevelCache
+from level_snapshot import LevelSnapshot
+from collisions import CollisionEvents
+from interpolation import SpriteInterpolator
+from replay import InputRecorder
+from profiler import FrameProfiler
+from hud import Hud
+from camera import Camera
+from chunks import ChunkedLayer
+from activity import ActivityRegion
+from player_physics import PlayerPhysicsState, BUOYANCY
+from patrol import PatrolSystem
+from background import load_background
+from assets import assets, NullSound
+from wall_geometry import merged_wall_pieces
+from level_physics import level_physics_steps, SENSOR_LAYERS
+
+
+# debug info shown with K (label name: text format)
+DEBUG_LABELS = {
+    "map width": "Map width: {:.2f}",
+    "crouching": "Is crouching: {}",
+    "x velocity": "Player X vel: {:.2f}",
+    "y velocity": "Player Y vel: {:.2f}",
+    "jumping": "Player Jumping?: {}",
+    "x position": "Player X pos?: {:.1f}",
+    "y position": "Player Y pos?: {:.1f}",
+    "on ground": "Player on ground?: {}",
+    "height": "Player height: {}",
+    "width": "Player width: {}",
+}
 
 
 def convert_hex_to_color(hex_string):
@@ -34,11 +67,14 @@ class GameView(ar.View):
     Player moves and jumps across platforms and avoids dangerous enemies
     """
 
-    def __init__(self):
+    def __init__(self, window=None, headless=False):
         """
         Initialize the game
+        :param window: the window the game is shown in (defaults to the current Arcade window)
+        :param headless: run without drawing, viewport changes or audio (see headless.py)
         """
-        super().__init__()
+        super().__init__(window)
+        self.headless = headless
 
         self.set_update_rate = None
 
@@ -46,20 +82,27 @@ class GameView(ar.View):
         self.player_list = None
         self.enemies_list = None
         self.wall_list = None  # list of walls that an object can collide with
+        self.wall_shapes = []  # merged physics shapes of the walls (the wall sprites are only drawn)
         self.midground_list = None
         self.scenery_list = None
         self.moving_platforms_list = None
         self.cannons_list = None
         self.heavy_blocks_list = None
         self.doors_list = None
+        self.layer_chunks = {}  # ChunkedLayer of each layer that never moves, by name
+        self.hidden_platform_chunks = None
+        self.activity = None  # ActivityRegion that puts enemies and moving platforms far away to sleep
+        self.patrols = None  # PatrolSystem that steers the awake enemies and moving platforms
 
         self.all_sprites = ar.SpriteList()  # the list of sprites on the screen
         self.keys_list = None
         self.hidden_platform_list = None
         self.water_list = None
-        self.background = None
+        self.background = None  # the parallax Background of the current level
+        self.background_assets = []  # images of the current level's background
         self.screen_wipe_rect = None
         self.update_level = False  # flag raised when the blue screen wipe is occurring to load new level
+        self.level_load = None  # level_load_steps generator of the level being loaded behind the wipe
         self.key_colors = {}
 
         self.cannon_timer = 0
@@ -69,12 +112,15 @@ class GameView(ar.View):
         self.score = 0  # the player score
         self.player = None  # the player object
         self.physics_engine = None  # the physics engine object
+        self.player_physics = None  # PlayerPhysicsState, the player's velocity and ground contact this step
         self.level = None  # the name of the level (.tmx)
         self.message = None  # message for debug purposes
         self.end_of_map = 0
         self.top_of_map = 0
         self.player_teleported = False
-        self.current_map = None
+        self.current_map = None  # the CompiledLevel currently being played
+        self.level_cache = LevelCache()  # compiled maps, so reloading a level skips parsing the .tmx
+        self.level_snapshot = None  # starting state of the current level, used to restart it in place
         self.spawn_id = 0
 
         # controls
@@ -91,8 +137,7 @@ class GameView(ar.View):
         self.r_pressed = False
 
         # viewport window handling
-        self.view_left = 0
-        self.view_bottom = 0
+        self.camera = Camera(headless=headless)
         self.height = 0
         self.width = 0
 
@@ -100,32 +145,53 @@ class GameView(ar.View):
         self.jump_sound = None
         self.bg_music = None
         self.playing_music = False
+        self.held_assets = []  # textures/sounds acquired from the asset manager
 
         # conditions
         self.game_over = False
         self.paused = False
         self.collided = False
         self.collision_timer = 0
+        self.collision_events = None  # what the player is touching, reported by the physics engine
 
-    def setup(self):
+        # fixed timestep handling
+        self.game_time = 0  # seconds of game logic that have been simulated
+        self.time_accumulator = 0  # real time that hasn't been simulated yet
+        self.interpolation_alpha = 0
+        self.interpolator = SpriteInterpolator()
+
+        # input recording and replay
+        self.input_recorder = None  # InputRecorder while F5 recording is on
+        self.input_replay = None  # InputReplay while a recording is being played back
+
+        self.profiler = FrameProfiler()  # times each phase of a frame, shown with J
+        self.hud = self.create_hud()  # HP readout and debug info text
+        self.hud_message_end = None  # time.perf_counter() the message on the HUD is hidden at
+
+    def setup(self, level=STARTING_LEVEL):
         """
         Get the game ready to play
+        :param level: the level number to start on
         """
 
         # Set the background color
-        ar.set_background_color(ar.color.BLACK)
+        if not self.headless:
+            ar.set_background_color(ar.color.BLACK)
 
         # uncomment to debug the screen wipe transition
         # self.screen_wipe_rect = Rectangle()
         # self.screen_wipe_rect.setup()
 
         self.player_list = ar.SpriteList()
-        self.level = STARTING_LEVEL
-        self.player = PlayerCharacter()
+        self.level = level
+        # let go of the assets of a previous game (ex: playing again after winning)
+        assets.release_all(self.held_assets)
+        if self.player:
+            self.player.release_assets()
+        self.player = PlayerCharacter(audio=not self.headless)
 
         # Set up the player
         self.load_level(self.level)
-        self.background = ar.load_texture("backgrounds/background1.jpg")
 
         self.player.health = 99
         self.player.color = DEFAULT_COLOR
@@ -140,10 +206,14 @@ class GameView(ar.View):
         self.collision_timer = 0.0
 
         # sound
-        self.orb_touched_sound = ar.load_sound("sounds/orb_get.ogg")
-        self.orb_off_sound = ar.load_sound("sounds/orb_off.ogg")
-        self.jump_sound = ar.load_sound("sounds/jump1.wav")
-        self.bg_music = ar.Sound("music/gamesong2.ogg", streaming=True)
+        if self.headless:
+            self.orb_touched_sound = self.orb_off_sound = self.jump_sound = NullSound()
+            self.bg_music = None
+        else:
+            self.orb_touched_sound = assets.sound(ORB_TOUCHED_SOUND, holder=self.held_assets)
+            self.orb_off_sound = assets.sound(ORB_OFF_SOUND, holder=self.held_assets)
+            self.jump_sound = assets.sound(JUMP_SOUND, holder=self.held_assets)
+            self.bg_music = assets.sound(BG_MUSIC, streaming=True)
 
     def play_music(self):
         """
@@ -176,15 +246,18 @@ class GameView(ar.View):
         :param level: the level number as a string
         :return: n/a
         """
-        # reinitialize all elements of a level
-        self.view_left = 0
-        self.view_bottom = 0
-        self.wall_list = None
-        self.enemies_list = None
-        self.scenery_list = None
-        self.keys_list = None
-        self.moving_platforms_list = None
-        self.cannons_list = None
+        for _ in self.level_load_steps(level):
+            pass
+
+    def level_load_steps(self, level):
+        """
+        load a level one piece at a time (see load_level). this is a generator that stops after each
+        piece of work, so the load can be spread over the frames of the screen wipe. the world is
+        only partly loaded until it is done, so the game must not be updated or drawn in between
+        :param level: the level number as a string
+        :return: generator
+        """
+        # reinitialize the elements of a level that aren't replaced by the new map
         if self.hidden_platform_list:
             self.hidden_platform_list = None
         self.water_list = None
@@ -199,16 +272,22 @@ class GameView(ar.View):
         self.physics_engine = ar.PymunkPhysicsEngine(damping=damping,
                                                      gravity=gravity)
 
-        self.current_map = ar.tilemap.read_tmx(f"maps/map{level}.tmx")
-        self.height = self.current_map.map_size.height
-        self.width = self.current_map.map_size.width
-        self.end_of_map = self.current_map.map_size.width * GRID_PIXEL_SIZE
-        self.top_of_map = self.current_map.map_size.height * GRID_PIXEL_SIZE
+        self.current_map = self.level_cache.get(level)
+        self.height = self.current_map.height
+        self.width = self.current_map.width
+        self.end_of_map = self.current_map.width * GRID_PIXEL_SIZE
+        self.top_of_map = self.current_map.height * GRID_PIXEL_SIZE
+        self.camera.set_bounds(self.end_of_map, self.top_of_map)
+        yield
+
+        # the background is picked by the map's properties (see background.py)
+        previous_background = self.background_assets
+        self.background_assets = []
+        self.background = load_background(self.current_map.properties, self.background_assets)
+        assets.release_all(previous_background)
+        yield
 
-        self.keys_list = ar.tilemap.process_layer(self.current_map,
-                                                  layer_name='Color Orbs',
-                                                  scaling=SPRITE_SCALING,
-                                                  use_spatial_hash=True)
+        self.keys_list = self.current_map.build_layer('Color Orbs')
 
         # change the color of hidden platforms as specified in the map properties
         for key in self.keys_list:
@@ -217,10 +296,7 @@ class GameView(ar.View):
             self.add_to_keys_dict(key, key_color)
 
         # find the player spawnpoint in the .tmx map
-        player_spawns = ar.tilemap.process_layer(self.current_map,
-                                                   layer_name='Player Spawn',
-                                                   scaling=SPRITE_SCALING,
-                                                   use_spatial_hash=True)
+        player_spawns = self.current_map.build_layer('Player Spawn')
         player_location = (0,0)
         for spawn in player_spawns:
             if self.spawn_id < 1:  # handle instance where player doesnt have a correct spawn id
@@ -240,75 +316,111 @@ class GameView(ar.View):
                                        collision_type="player",
                                        max_horizontal_velocity=PLAYER_MAX_HORIZONTAL_SPEED,
                                        max_vertical_velocity=PLAYER_MAX_VERTICAL_SPEED)
+        # the shapes for crouching and swimming are made once and swapped on the player's body
+        self.player.add_pose_handler(self.physics_engine)
+        self.player_physics = PlayerPhysicsState(self.physics_engine, self.player)
+        yield
         # walls list
-        self.wall_list = ar.tilemap.process_layer(self.current_map,
-                                                  layer_name='Foreground',
-                                                  scaling=TILE_SCALING,
-                                                  use_spatial_hash=False,
-                                                  hit_box_algorithm="Detailed")
+        self.wall_list = self.current_map.build_layer('Foreground')
+        yield
         # enemies list
-        self.enemies_list = ar.tilemap.process_layer(self.current_map,
-                                                     layer_name='Enemies',
-                                                     scaling=SPRITE_SCALING,
-                                                     use_spatial_hash=True)
+        self.enemies_list = self.current_map.build_layer('Enemies')
+        yield
         # foreground objects list
-        self.scenery_list = ar.tilemap.process_layer(self.current_map,
-                                                     layer_name='Foreground Objects',
-                                                     scaling=TILE_SCALING,
-                                                     use_spatial_hash=True)
+        self.scenery_list = self.current_map.build_layer('Foreground Objects')
+        yield
         # middleground objects list
-        self.midground_list = ar.tilemap.process_layer(self.current_map,
-                                                     layer_name='Middleground',
-                                                     scaling=TILE_SCALING,
-                                                     use_spatial_hash=True)
-
+        self.midground_list = self.current_map.build_layer('Middleground')
+        yield
         # moving platforms list
-        self.moving_platforms_list = ar.tilemap.process_layer(self.current_map,
-                                                              layer_name='Moving Platforms',
-                                                              scaling=TILE_SCALING,
-                                                              use_spatial_hash=True)
+        self.moving_platforms_list = self.current_map.build_layer('Moving Platforms')
+        yield
         # cannons list
-        self.cannons_list = ar.tilemap.process_layer(self.current_map,
-                                                     layer_name='Cannons',
-                                                     scaling=TILE_SCALING,
-                                                     use_spatial_hash=True)
+        self.cannons_list = self.current_map.build_layer('Cannons')
+        yield
         # heavy blocks list
-        self.heavy_blocks_list = ar.tilemap.process_layer(self.current_map,
-                                                          layer_name='Heavy Blocks',
-                                                          scaling=TILE_SCALING,
-                                                          use_spatial_hash=True)
+        self.heavy_blocks_list = self.current_map.build_layer('Heavy Blocks')
+        yield
         # water list
-        self.water_list = ar.tilemap.process_layer(self.current_map,
-                                                   layer_name='Water',
-                                                   scaling=TILE_SCALING,
-                                                   use_spatial_hash=True)
-
+        self.water_list = self.current_map.build_layer('Water')
+        yield
         # doors list
-        self.doors_list = ar.tilemap.process_layer(self.current_map,
-                                                   layer_name='Doors',
-                                                   scaling=TILE_SCALING,
-                                                   use_spatial_hash=True)
+        self.doors_list = self.current_map.build_layer('Doors')
+        # get the levels behind the doors ready while this one is played
+        self.level_cache.preload({door.properties["goto_level"] for door in self.doors_list
+                                  if "goto_level" in door.properties})
+        yield
+
+        # layers that never move are drawn in screen-sized chunks, skipping the chunks off screen
+        # (the Middleground, Foreground and Foreground Objects tiles never change, so they are baked)
+        self.layer_chunks = {"midground": ChunkedLayer(self.midground_list, bake=True),
+                             "walls": ChunkedLayer(self.wall_list, bake=True),
+                             "scenery": ChunkedLayer(self.scenery_list, bake=True),
+                             "orbs": ChunkedLayer(self.keys_list),
+                             "water": ChunkedLayer(self.water_list),
+                             "doors": ChunkedLayer(self.doors_list)}
+        yield
+        # bake now instead of on the first frame the level is drawn
+        if not self.headless:
+            for chunks in self.layer_chunks.values():
+                if chunks.bake_enabled:
+                    chunks.bake(self.camera)
+                    yield
 
         # physics engine additions below
-        self.physics_engine.add_sprite_list(self.wall_list,
-                                            friction=WALL_FRICTION,
-                                            collision_type="wall",
-                                            body_type=ar.PymunkPhysicsEngine.STATIC)
-
-        self.physics_engine.add_sprite_list(self.enemies_list,
-                                            mass=ENEMY_MASS,
-                                            body_type=ar.PymunkPhysicsEngine.KINEMATIC,
-                                            collision_type="enemy")
-
-        self.physics_engine.add_sprite_list(self.moving_platforms_list,
-                                            friction=WALL_FRICTION,
-                                            body_type=ar.PymunkPhysicsEngine.KINEMATIC,
-                                            collision_type="wall")
+        # walls are merged into a few large shapes instead of one shape per tile
+        # (the merge is done once per map and kept with the compiled level)
+        if self.current_map.wall_pieces is None:
+            self.current_map.wall_pieces = merged_wall_pieces(self.wall_list)
+        # water, doors and orbs only need to report when the player touches them, so they are
+        # added as sensors that don't physically block the player
+        layers = {'Enemies': self.enemies_list,
+                  'Moving Platforms': self.moving_platforms_list,
+                  'Cannons': self.cannons_list,
+                  'Water': self.water_list,
+                  'Doors': self.doors_list,
+                  'Color Orbs': self.keys_list}
+        self.wall_shapes = yield from level_physics_steps(self.physics_engine, self.current_map.wall_pieces, layers)
+        self.collision_events = CollisionEvents(self.physics_engine, self.player)
+        for layer_name, _ in SENSOR_LAYERS:
+            self.collision_events.add_sensors(layers[layer_name])
+        self.collision_events.on("orb", begin=self.touch_orb)
+        self.collision_events.on("door", begin=self.enter_door)
+
+        # enemies and moving platforms far from the player sleep until it comes near
+        self.activity = ActivityRegion(self.physics_engine, (self.enemies_list, self.moving_platforms_list))
+        self.patrols = PatrolSystem(self.activity, self.physics_engine)
+
+        # remember how the level started so that dying can rewind it without reloading the map
+        self.level_snapshot = LevelSnapshot(self)
+
+    def restart_or_load_level(self):
+        """
+        called every step while the screen wipe covers the screen, until it returns True. dying (same
+        level and spawnpoint) rewinds the level in place from its snapshot, keeping the static walls
+        in the physics engine, once the wipe starts to uncover the screen. going through a door starts
+        loading the new level from scratch as soon as the wipe covers the screen, so it's loaded a
+        piece at a time over the ~20 steps the screen stays covered (see advance_level_load)
+        :return: True if the level was restarted or started loading
+        """
+        if self.level_snapshot and self.level_snapshot.matches(self):
+            if self.screen_wipe_rect.center_x <= SCREEN_WIDTH:
+                return False
+            self.level_snapshot.restore(self)
+        else:
+            self.level_load = self.level_load_steps(self.level)
+        return True
 
-        self.physics_engine.add_sprite_list(self.cannons_list,
-                                            friction=WALL_FRICTION,
-                                            collision_type="wall",
-                                            body_type=ar.PymunkPhysicsEngine.DYNAMIC)
+    def advance_level_load(self, budget=None):
+        """
+        do more of the level being loaded
+        :param budget: seconds of work to do before stopping (None to finish the load)
+        :return: n/a
+        """
+        deadline = None if budget is None else time.perf_counter() + budget
+        for _ in self.level_load:
+            if deadline is not None and time.perf_counter() >= deadline:
+                return
 
     def screen_wipe(self):
         if self.screen_wipe_rect:
@@ -326,10 +438,7 @@ class GameView(ar.View):
         :param color: an RGBA color list
         :return: n/a
         """
-        self.hidden_platform_list = ar.tilemap.process_layer(self.current_map,
-                                                             layer_name=layer_name,
-                                                             scaling=TILE_SCALING,
-                                                             use_spatial_hash=True)
+        self.hidden_platform_list = self.current_map.build_layer(layer_name)
 
         # change the color of hidden platforms as specified in the map properties
         for platform in self.hidden_platform_list:
@@ -339,24 +448,52 @@ class GameView(ar.View):
                                             friction=WALL_FRICTION,
                                             collision_type="wall",
                                             body_type=ar.PymunkPhysicsEngine.STATIC)
+        # not baked: the platforms appear in a new color every time an orb is touched, and baking
+        # would read every chunk back from the GPU (and add new textures) each time
+        self.hidden_platform_chunks = ChunkedLayer(self.hidden_platform_list)
 
     def on_key_release(self, key: int, modifiers: int):
         """
         check for the last key to have been released, set the respective
-        instance variable to false.
+        instance variable to false. the keyboard is ignored while a replay is playing
         :param key: the last key on the keyboard that the user let go of
         :param modifiers: n/a
         :return: n/a
         """
+        if self.input_replay:
+            return
+        if self.input_recorder:
+            self.input_recorder.key_released(key)
+        self.release_key(key, modifiers)
+
+    def on_key_press(self, key: int, modifiers: int):
+        """
+        check for key presses, set the respective instance variable to true.
+        the keyboard is ignored while a replay is playing
+        :param key: the last key on the keyboard that the user pressed
+        :param modifiers: n/a
+        :return: n/a
+        """
+        if self.input_replay:
+            return
+        self.press_key(key, modifiers)
+
+    def release_key(self, key, modifiers):
+        """
+        handle a key release, from the keyboard or from a replay
+        :param key: the key that was let go of
+        :param modifiers: n/a
+        :return: n/a
+        """
         if self.player.in_water:
             # the controls in water should only register when the key is released, unlike regular controls
             Controls.handle_water_controls(self)
         Controls.handle_key_release(self, key, modifiers)
 
-    def on_key_press(self, key: int, modifiers: int):
+    def press_key(self, key, modifiers):
         """
-        check for key presses, set the respective instance variable to true.
-        :param key: the last key on the keyboard that the user pressed
+        handle a key press, from the keyboard or from a replay
+        :param key: the key that was pressed
         :param modifiers: n/a
         :return: n/a
         """
@@ -370,7 +507,7 @@ class GameView(ar.View):
         """
         if self.player.took_damage:
             # start cooldown until player can take damage again
-            current_time = int(round(time.time() * 1000))
+            current_time = self.game_time_ms()
             if (current_time - self.player.time_last_hit) > DAMAGE_BUFFER_TIME:
                 self.player.took_damage = False
                 self.player.color = self.player.default_color
@@ -378,21 +515,19 @@ class GameView(ar.View):
                 self.player.change_y = 0
 
         # kill enemy that is hit by the player dashing
-        if (not self.player.took_damage) and \
-                (ar.check_for_collision_with_list(self.player, self.enemies_list) and \
-                 self.player.ball_dashing):
-            current_enemy = ar.check_for_collision_with_list(self.player, self.enemies_list)[0]
+        current_enemy = self.collision_events.first("enemy")
+        if (not self.player.took_damage) and current_enemy and self.player.ball_dashing:
             current_enemy.remove_from_sprite_lists()
+            self.activity.remove(current_enemy)
         # if player hits enemy, deduce health and knock them back
-        elif (not self.player.took_damage) and \
-                (ar.check_for_collision_with_list(self.player, self.enemies_list)):
+        elif (not self.player.took_damage) and current_enemy:
             self.player.change_x = -5  # bounce player back
             self.player.change_y = 5  # player jumps up a bit
             self.player.health -= 20  # reduce health
             self.player.took_damage = True  # indicate that the player just got hit (so there is a
             # buffer until player can take damage again)
             self.player.color = RED_COLOR  # tint the player red
-            self.player.time_last_hit = int(round(time.time() * 1000))
+            self.player.time_last_hit = self.game_time_ms()
 
         # if player dies (runs out of health), respawn at the beginning of the level
         if self.player.health <= 0:
@@ -409,51 +544,13 @@ class GameView(ar.View):
             self.player.health = 0
 
     def track_moving_sprites(self, delta_time):
-        # For each moving sprite, see if we've reached a boundary and need to
-        # reverse course.
-        count = 0
-        for enemy_sprite in self.enemies_list:
-            count += 1
-            if enemy_sprite.boundary_right and enemy_sprite.change_x > 0 and enemy_sprite.right > (
-                    enemy_sprite.boundary_right * SPRITE_SCALING):
-                enemy_sprite.change_x *= -1
-            elif enemy_sprite.boundary_left and enemy_sprite.change_x < 0 and enemy_sprite.left < (
-                    enemy_sprite.boundary_left * SPRITE_SCALING):
-                enemy_sprite.change_x *= -1
-            if enemy_sprite.boundary_top and enemy_sprite.change_y > 0 and enemy_sprite.top > (
-                    enemy_sprite.boundary_top * SPRITE_SCALING):
-                enemy_sprite.change_y *= -1
-            elif enemy_sprite.boundary_bottom and enemy_sprite.change_y < 0 and enemy_sprite.bottom < (
-                    enemy_sprite.boundary_bottom * SPRITE_SCALING):
-                enemy_sprite.change_y *= -1
-
-            # Figure out and set our moving platform velocity.
-            # Pymunk uses velocity is in pixels per second. If we instead have
-            # pixels per frame, we need to convert.
-            velocity = (enemy_sprite.change_x * 1 / delta_time, enemy_sprite.change_y * 1 / delta_time)
-            self.physics_engine.set_velocity(enemy_sprite, velocity)
-
-        count = 0
-        for moving_platform in self.moving_platforms_list:
-            count += 1
-            if moving_platform.boundary_right and moving_platform.change_x > 0 and moving_platform.right > (
-                    moving_platform.boundary_right * SPRITE_SCALING):
-                moving_platform.change_x *= -1
-            elif moving_platform.boundary_left and moving_platform.change_x < 0 and moving_platform.left < (
-                    moving_platform.boundary_left * SPRITE_SCALING):
-                moving_platform.change_x *= -1
-            if moving_platform.boundary_top and moving_platform.change_y > 0 and moving_platform.top > (
-                    moving_platform.boundary_top * SPRITE_SCALING):
-                moving_platform.change_y *= -1
-            elif moving_platform.boundary_bottom and moving_platform.change_y < 0 and moving_platform.bottom < (
-                    moving_platform.boundary_bottom * SPRITE_SCALING):
-                moving_platform.change_y *= -1
-
-            velocity = (moving_platform.change_x * 1 / delta_time, moving_platform.change_y * 1 / delta_time)
-            self.physics_engine.set_velocity(moving_platform, velocity)
-
-            # force = (-PLAYER_MOVE_FORCE_ON_GROUND, 0)
-            # self.physics_engine.apply_force(enemy_sprite, force)
+        """
+        turn moving sprites near the player around when they reach a boundary, and set their
+        velocities (sprites far away are asleep, see activity.py; the checks are done in patrol.py)
+        :param delta_time: length of the logic step
+        :return: n/a
+        """
+        self.patrols.update(delta_time)
 
     def cannon_toggle(self):
         """
@@ -463,8 +560,8 @@ class GameView(ar.View):
         # cannon launching handling
         # only launch cannon if player has touched a "pressure plate" (half slab block, colored white)
         current_time = 0
-        if (ar.check_for_collision_with_list(self.player, self.cannons_list)):
-            current_cannon = ar.check_for_collision_with_list(self.player, self.cannons_list)[0]
+        current_cannon = self.collision_events.first("cannon")
+        if current_cannon:
             if current_cannon.properties["is_trigger"]:
                 current_cannon.color = ar.color.YELLOW
                 # timer for when player is activating cannon
@@ -489,13 +586,13 @@ class GameView(ar.View):
                     self.physics_engine.add_sprite(self.current_cannon,
                                                    friction=CANNON_FRICTION,
                                                    mass=CANNON_MASS,
-                                                   collision_type="wall",
+                                                   collision_type="cannon",
                                                    elasticity=0,
                                                    max_horizontal_velocity=CANNON_MAX_HORIZONTAL_SPEED,
                                                    max_vertical_velocity=CANNON_MAX_VERTICAL_SPEED,
                                                    body_type=ar.PymunkPhysicsEngine.DYNAMIC)
 
-        current_time = int(round(time.time() * 1000))
+        current_time = self.game_time_ms()
         # do the launching if corresponding pressure plate has been toggled
         if self.current_cannon and ar.check_for_collision(self.player, self.current_cannon) and self.player.crouching:
             self.current_cannon.color = ar.color.YELLOW
@@ -518,86 +615,251 @@ class GameView(ar.View):
         handle water physics here
         :return:
         """
-        if ar.check_for_collision_with_list(self.player, self.water_list):
+        if self.collision_events.touching["water"]:
             self.player.in_water = True
-            self.physics_engine.apply_force(self.player, (0, BUOYANCY_FORCE))
+            self.player_physics.apply_force(BUOYANCY)
         else:
             self.player.in_water = False
 
+    def touch_orb(self, current_key):
+        """
+        called when the player touches a color orb. white orbs hide the hidden platforms,
+        colored orbs reveal them in the orb's color.
+        :param current_key: the orb sprite
+        :return: n/a
+        """
+        if self.update_level:
+            return
+        if self.key_colors[current_key] == WHITE:
+            # this if statement is redundant so that we don't immediately enter the else statement below
+            if self.hidden_platform_list:
+                self.orb_off_sound.play(volume=0.2)
+                for platform in self.hidden_platform_list:
+                    self.physics_engine.remove_sprite(platform)
+                self.hidden_platform_list = None
+            self.player.color = WHITE
+        else:
+            if not self.hidden_platform_list:
+                self.orb_touched_sound.play(volume=0.2)
+                self.load_layer("Hidden Platforms", self.key_colors[current_key])
+                self.player.color = self.key_colors[current_key]
+
+    def enter_door(self, current_door):
+        """
+        called when the player touches a door block, go to the next level.
+        the level that the player goes to depends on the door's "goto_level" number.
+        thus, it's possible to go from map4 to map255. the "goto_level" numbers should have no
+        correlation to how far along the player is in the game as this is now an adventure game.
+        note: keep track of level spawn ids! they should not be repeated more than twice between levels.
+        :param current_door: the door sprite
+        :return: n/a
+        """
+        next_level = current_door.properties["goto_level"]  # get the next level number
+        self.spawn_id = current_door.properties["spawn_id"]  # get the spawn id that corresponds with the next/
+                                                             # previous level
+        self.update_level = True  # raise this flag to properly restart level
+        self.level = next_level  # switch to next level
+
+        self.screen_wipe_rect = Transition()  # cue the transition slide
+        self.screen_wipe_rect.setup()
+        self.player_teleported = True
+
+        # stop player movement
+        self.physics_engine.set_horizontal_velocity(self.player, 0)
+
+        self.physics_engine.set_position(self.player, self.player.spawnpoint)
+
+    def toggle_recording(self):
+        """
+        start or stop recording input. recording restarts the current level so the recording can be
+        replayed from the same starting state, so it can't start while a level is restarting or
+        loading. stopping saves it to the replays folder
+        :return: n/a
+        """
+        if self.input_recorder:
+            os.makedirs(REPLAY_DIRECTORY, exist_ok=True)
+            path = os.path.join(REPLAY_DIRECTORY,
+                                f"replay_{self.level}_{datetime.now().strftime('%Y%m%d-%H%M%S')}.csr")
+            self.input_recorder.save(path)
+            self.show_message(f"saved recording to {path}")
+            self.input_recorder = None
+        elif self.update_level or self.level_load is not None:
+            # setup() doesn't stop a screen wipe that is restarting or loading a level, which would
+            # then change the level after the recording started
+            self.show_message("can't start recording while a level is loading")
+        elif not self.input_replay:
+            self.game_time = 0
+            self.time_accumulator = 0
+            self.setup(self.level)
+            self.input_recorder = InputRecorder(self)
+            self.show_message("recording input (F5 to stop)")
+
+    def show_message(self, text):
+        """
+        show a line of text at the bottom of the HUD for HUD_MESSAGE_TIME seconds
+        :param text: the message
+        :return: n/a
+        """
+        self.hud.set("message", text)
+        self.hud_message_end = time.perf_counter() + HUD_MESSAGE_TIME
+
+    def create_hud(self):
+        """
+        make the HUD labels: the HP readout, the screen wipe position, messages and the debug info (K)
+        :return: a Hud
+        """
+        hud = Hud()
+        hud.add_label("hp", "HP: {:.2f}", 20, SCREEN_HEIGHT - 65)
+        hud.add_label("screen wipe", "screen wipe x: {:.2f}", 20, SCREEN_HEIGHT - 180)
+        hud.add_label("message", "{}", 20, 20, font_size=14)
+        for i, (name, text_format) in enumerate(DEBUG_LABELS.items()):
+            # the debug info skips the HP line, which is always shown
+            row = i if i < 2 else i + 1
+            hud.add_label(name, text_format, 20, SCREEN_HEIGHT - 25 - row * 20)
+        return hud
+
+    def save_profile(self):
+        """
+        save the profiler's recorded frames as a Chrome trace in the profiles folder
+        :return: n/a
+        """
+        if not self.profiler.enabled:
+            self.show_message("turn the profiler on (J) before saving a trace")
+            return
+        os.makedirs(PROFILE_DIRECTORY, exist_ok=True)
+        path = os.path.join(PROFILE_DIRECTORY,
+                            f"trace_{self.level}_{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+        self.profiler.save_trace(path)
+        self.show_message(f"saved trace to {path}")
+
+    def game_time_ms(self):
+        """
+        get the simulated game time. it only advances with logic steps, so timers based on it
+        behave the same no matter how fast the game is drawn
+        :return: game time in milliseconds
+        """
+        return int(round(self.game_time * 1000))
+
     def on_update(self, delta_time: float):
         """
         Update the positions and statuses of all game objects
         If paused, do nothing
+        the game logic and physics run in fixed steps of LOGIC_TIMESTEP. real frame time is added
+        up and as many fixed steps as fit are run, so a slow frame doesn't slow the game down.
         :param delta_time: Time since the last update
         """
-        if not self.game_over or not self.paused:
-            self.physics_engine.step()
-
         # handle background music
-        self.play_music()
+        with self.profiler.section("play_music"):
+            self.play_music()
+
+        self.time_accumulator += delta_time
+        steps = 0
+        while self.time_accumulator >= LOGIC_TIMESTEP and steps < MAX_LOGIC_STEPS_PER_FRAME:
+            self.interpolator.store(self.moving_sprite_lists())
+            if self.input_replay:
+                self.input_replay.play_step(self)
+            if self.input_recorder:
+                self.input_recorder.record_step(self)
+            self.fixed_update(LOGIC_TIMESTEP)
+            if self.input_recorder:
+                self.input_recorder.checkpoint(self)
+            if self.input_replay:
+                self.input_replay.verify(self)
+            self.time_accumulator -= LOGIC_TIMESTEP
+            steps += 1
+        if steps == MAX_LOGIC_STEPS_PER_FRAME:
+            # too far behind to catch up, drop the missed steps instead of spiraling into slower frames
+            self.time_accumulator %= LOGIC_TIMESTEP
+        # how far we are between the last logic step and the next one, used to smooth out drawing
+        self.interpolation_alpha = self.time_accumulator / LOGIC_TIMESTEP
+
+        with self.profiler.section("update_viewport"):
+            self.update_viewport(delta_time)
+
+    def moving_sprite_lists(self):
+        """
+        get the sprite lists whose sprites are moved by physics (these are interpolated when drawn).
+        sleeping enemies and moving platforms don't move, so only the active ones are included
+        :return: tuple of SpriteLists (and lists of sprites)
+        """
+        return self.player_list, self.activity.active, self.cannons_list
+
+    def fixed_update(self, delta_time):
+        """
+        advance the physics and game logic by one fixed step
+        :param delta_time: length of the step (always LOGIC_TIMESTEP)
+        :return: n/a
+        """
+        # the wipe moves with logic steps (not frames) so levels load at the same step in a replay
         if self.screen_wipe_rect:  # when the game is transitioning to a new level/restarting a level
             self.screen_wipe_rect.center_x += self.screen_wipe_rect.change_x
             self.screen_wipe_rect.center_y = self.view_bottom + (SCREEN_HEIGHT / 2)
-            # handle loading level here, after screen is covered in blue wipe
-            if (self.screen_wipe_rect.center_x > SCREEN_WIDTH) and (self.update_level):
-                self.load_level(self.level)
+            # handle loading level here, once the screen is covered in blue wipe
+            if (self.screen_wipe_rect.center_x >= 0) and self.update_level and self.restart_or_load_level():
                 self.update_level = False  # lower flag when level begins to load
             if self.screen_wipe_rect.center_x > SCREEN_WIDTH * 2:
                 self.screen_wipe_rect = None
 
-        # Update everything
-        self.player_list.update()
-        self.all_sprites.update()
-        self.enemies_list.update()
-        self.moving_platforms_list.update()
-        self.cannons_list.update()
-
-        Controls.handle_control_actions(self)
-        if self.player.in_water:
-            Controls.handle_water_physics(self)
-
-        self.process_damage()
-        self.track_moving_sprites(delta_time)
-        self.cannon_toggle()
-        self.in_water_physics()
-
-        if ar.check_for_collision_with_list(self.player, self.keys_list) and not self.update_level:
-            current_key = ar.check_for_collision_with_list(self.player, self.keys_list)[0]
-            if self.key_colors[current_key] == WHITE:
-                # this if statement is redundant so that we don't immediately enter the else statement below
-                if self.hidden_platform_list:
-                    self.orb_off_sound.play(volume=0.2)
-                    for platform in self.hidden_platform_list:
-                        self.physics_engine.remove_sprite(platform)
-                    self.hidden_platform_list = None
-                self.player.color = WHITE
-            else:
-                if not self.hidden_platform_list:
-                    self.orb_touched_sound.play(volume=0.2)
-                    self.load_layer("Hidden Platforms", self.key_colors[current_key])
-                    self.player.color = self.key_colors[current_key]
-
-        # if player touches a door block, go to the next level
-        # the level that the player goes to depends on the door's "goto_level" number.
-        # thus, it's possible to go from map4 to map255. the "goto_level" numbers should have no
-        # correlation to how far along the player is in the game as this is now an adventure game.
-        # note: keep track of level spawn ids! they should not be repeated more than twice between levels.
-        if ar.check_for_collision_with_list(self.player, self.doors_list):
-            current_door = ar.check_for_collision_with_list(self.player, self.doors_list)[0]
-            next_level = current_door.properties["goto_level"]  # get the next level number
-            self.spawn_id = current_door.properties["spawn_id"]  # get the spawn id that corresponds with the next/
-                                                                 # previous level
-            self.update_level = True  # raise this flag to properly restart level
-            self.level = next_level  # switch to next level
-
-            self.screen_wipe_rect = Transition()  # cue the transition slide
-            self.screen_wipe_rect.setup()
-            self.player_teleported = True
-
-            # stop player movement
-            self.physics_engine.set_horizontal_velocity(self.player, 0)
+        # a new level is loaded a little each step while the wipe covers the screen, and the game is
+        # paused until the wipe starts to uncover it. the load always ends at the same step no
+        # matter how fast it went, so replays stay in sync
+        if self.level_load is not None:
+            with self.profiler.section("level load"):
+                if self.screen_wipe_rect.center_x > SCREEN_WIDTH:
+                    self.advance_level_load()
+                    self.level_load = None
+                else:
+                    self.advance_level_load(LEVEL_LOAD_BUDGET)
+            return
+
+        profiler = self.profiler
+        with profiler.section("activity"):
+            self.activity.update(self.player.center_x, self.player.center_y, self.game_time)
+        if not self.game_over or not self.paused:
+            # physics may run several smaller steps per logic step. sprites only need to be
+            # synced with their physics bodies after the last one
+            with profiler.section("physics step"):
+                physics_timestep = delta_time / PHYSICS_STEPS_PER_LOGIC_STEP
+                # the controls, buoyancy and water forces are applied once per logic step, but Pymunk
+                # clears a body's force after every step, so put them back before each smaller step
+                player_body = self.player_physics.body
+                player_force = player_body.force
+                for _ in range(PHYSICS_STEPS_PER_LOGIC_STEP):
+                    player_body.force = player_force
+                    self.physics_engine.step(physics_timestep, resync_sprites=False)
+                # read the player's state before syncing, since the player's animation uses it
+                self.player_physics.refresh()
+                self.physics_engine.resync_sprites()
+        self.game_time += delta_time
 
-            self.physics_engine.set_position(self.player, self.player.spawnpoint)
+        # Update everything
+        with profiler.section("player_list.update"):
+            self.player_list.update()
+        with profiler.section("all_sprites.update"):
+            self.all_sprites.update()
+        with profiler.section("active sprites update"):
+            for moving_sprite in self.activity.active:
+                moving_sprite.update()
+        with profiler.section("cannons_list.update"):
+            self.cannons_list.update()
+
+        with profiler.section("handle_control_actions"):
+            Controls.handle_control_actions(self)
+            if self.player.in_water:
+                Controls.handle_water_physics(self)
+
+        with profiler.section("process_damage"):
+            self.process_damage()
+        with profiler.section("track_moving_sprites"):
+            self.track_moving_sprites(delta_time)
+        with profiler.section("cannon_toggle"):
+            self.cannon_toggle()
+        with profiler.section("in_water_physics"):
+            self.in_water_physics()
+
+        # touching orbs and doors is handled by touch_orb and enter_door
+        with profiler.section("collisions"):
+            self.collision_events.dispatch()
 
         # if the player hits the bottom of the level, player dies and respawns at the start of the level
         if self.player.bottom <= 0:
@@ -611,104 +873,104 @@ class GameView(ar.View):
             self.physics_engine.set_horizontal_velocity(self.player, 0)
             self.physics_engine.set_position(self.player, self.player.spawnpoint)
 
-        if self.physics_engine.is_on_ground(self.player) and self.player.jumping:
+        if self.player_physics.on_ground and self.player.jumping:
             self.player.jumping = False
 
-        # track if we need to change the view port
-        changed = False
-
-        # Scroll left
-        left_bndry = self.view_left + VIEWPORT_LEFT_MARGIN
-        if self.player.left < left_bndry and self.player.left > VIEWPORT_LEFT_MARGIN:
-            self.view_left -= left_bndry - self.player.left
-            changed = True
-
-        # Scroll right
-        right_bndry = self.view_left + SCREEN_WIDTH - VIEWPORT_RIGHT_MARGIN
-        if self.player.right > right_bndry and (self.player.right < (self.end_of_map - VIEWPORT_RIGHT_MARGIN)):
-            self.view_left += self.player.right - right_bndry
-            changed = True
-
-        # Scroll up
-        top_bndry = self.view_bottom + SCREEN_HEIGHT - VIEWPORT_MARGIN_TOP
-        if self.player.top > top_bndry and (self.player.top < (self.top_of_map - VIEWPORT_MARGIN_TOP)):
-            self.view_bottom += self.player.top - top_bndry
-            changed = True
-
-        # Scroll down
-        bottom_bndry = self.view_bottom + VIEWPORT_MARGIN_BOTTOM
-        if self.player.bottom < bottom_bndry and self.player.bottom > VIEWPORT_MARGIN_BOTTOM:
-            self.view_bottom -= bottom_bndry - self.player.bottom
-            changed = True
-
-        # If we need to scroll, go ahead and do it.
-        # also change viewport when player has teleported (when switching levels, respawning, etc)
-        if changed:
-            self.view_left = int(self.view_left)
-            self.view_bottom = int(self.view_bottom)
-            ar.set_viewport(self.view_left,
-                            SCREEN_WIDTH + self.view_left,
-                            self.view_bottom,
-                            SCREEN_HEIGHT + self.view_bottom)
-
-        # handle the viewport position when the player transitions to a new level
-        if self.player_teleported and self.screen_wipe_rect.center_x > SCREEN_WIDTH:
-            self.view_left = 0 + self.player.center_x - VIEWPORT_RIGHT_MARGIN
-            print(self.player.center_x)
-            if self.view_left + SCREEN_WIDTH > self.width * GRID_PIXEL_SIZE:
-                self.view_left = (self.width * GRID_PIXEL_SIZE) - SCREEN_WIDTH
-                print("lefted", self.width * GRID_PIXEL_SIZE)
-            elif self.view_left < 0:
-                self.view_left = 0
-
-            self.view_bottom = 0 + self.player.center_y - VIEWPORT_MARGIN_BOTTOM
-            if self.view_bottom + SCREEN_HEIGHT > self.height * GRID_PIXEL_SIZE:
-                self.view_bottom = (self.height * GRID_PIXEL_SIZE) - SCREEN_HEIGHT
-                print("bottomed", self.height * GRID_PIXEL_SIZE)
-            elif self.view_bottom < 0:
-                self.view_bottom = 0
-
-            print("left: %2d bottom: %2d " % (self.view_left, self.view_bottom))
-
-            ar.set_viewport(self.view_left,
-                            SCREEN_WIDTH + self.view_left,
-                            self.view_bottom,
-                            SCREEN_HEIGHT + self.view_bottom)
+    def on_show(self):
+        """
+        put the viewport back on the game (the pause screen moves it)
+        :return: n/a
+        """
+        self.camera.apply(force=True)
+
+    @property
+    def view_left(self):
+        """
+        left of the viewport, in map pixels (set by the camera)
+        """
+        return self.camera.view_left
+
+    @property
+    def view_bottom(self):
+        """
+        bottom of the viewport, in map pixels (set by the camera)
+        """
+        return self.camera.view_bottom
+
+    def update_viewport(self, delta_time):
+        """
+        scroll the viewport to follow the player, or jump to the player after a teleport
+        :param delta_time: time since the last frame
+        :return: n/a
+        """
+        # handle the viewport position when the player transitions to a new level (once the
+        # screen is covered by the wipe)
+        if self.player_teleported and self.screen_wipe_rect and self.screen_wipe_rect.center_x > SCREEN_WIDTH:
+            self.camera.snap_to(self.player.center_x, self.player.center_y)
             self.player_teleported = False
+        else:
+            self.camera.follow(self.player, delta_time)
+        self.camera.apply()
 
     def on_draw(self):
         """
         Draw the game objects
         :return:
         """
+        profiler = self.profiler
         ar.start_render()
-        # draw the background texture
-        ar.draw_lrwh_rectangle_textured(0, 0,
-                                        self.end_of_map, self.top_of_map,
-                                        self.background)
-        self.midground_list.draw()
-        self.all_sprites.draw()
-        self.player_list.draw()
-        self.wall_list.draw()
-        self.enemies_list.draw()
-        self.scenery_list.draw()
-        self.keys_list.draw()
-        self.moving_platforms_list.draw()
-        self.cannons_list.draw()
-        self.water_list.draw()
-        self.doors_list.draw()
+        # while a level is being loaded the wipe covers the whole screen, and the world is only
+        # partly built, so only the wipe is drawn
+        if self.level_load is not None:
+            self.screen_wipe()
+            if self.profiler.enabled:
+                self.profiler.draw(self.view_left, self.view_bottom)
+            self.profiler.end_frame()
+            return
+        # draw moving sprites part of the way between their last two logic steps
+        with profiler.section("interpolate"):
+            self.interpolator.apply(self.interpolation_alpha)
+        # draw the background, only over the part of the map on screen
+        with profiler.section("draw background"):
+            self.background.draw(self.camera)
+        with profiler.section("draw midground"):
+            self.layer_chunks["midground"].draw(self.camera)
+        with profiler.section("draw all_sprites"):
+            self.all_sprites.draw()
+        with profiler.section("draw player"):
+            self.player_list.draw()
+        with profiler.section("draw walls"):
+            self.layer_chunks["walls"].draw(self.camera)
+        with profiler.section("draw enemies"):
+            self.enemies_list.draw()
+        with profiler.section("draw scenery"):
+            self.layer_chunks["scenery"].draw(self.camera)
+        with profiler.section("draw orbs"):
+            self.layer_chunks["orbs"].draw(self.camera)
+        with profiler.section("draw moving platforms"):
+            self.moving_platforms_list.draw()
+        with profiler.section("draw cannons"):
+            self.cannons_list.draw()
+        with profiler.section("draw water"):
+            self.layer_chunks["water"].draw(self.camera)
+        with profiler.section("draw doors"):
+            self.layer_chunks["doors"].draw(self.camera)
 
         if self.hidden_platform_list:
-            self.hidden_platform_list.draw()
+            with profiler.section("draw hidden platforms"):
+                self.hidden_platform_chunks.draw(self.camera)
         # self.player.draw()
 
         # draw the transition wipe when restarting or loading a new level
         self.screen_wipe()
+        self.interpolator.restore()
 
         # draw hitboxes for walls
         if self.l_pressed:
             for wall in self.wall_list:
                 wall.draw_hit_box(RED_COLOR)
+            for shape in self.wall_shapes:
+                ar.draw_polygon_outline(shape.get_vertices(), BLUE_COLOR)
             if self.hidden_platform_list:
                 for platform in self.hidden_platform_list:
                     platform.draw_hit_box(RED_COLOR)
@@ -720,114 +982,48 @@ class GameView(ar.View):
                     cannon.draw_hit_box(RED_COLOR)
 
         # draw player hitboxes and debug info
+        hud = self.hud
         if self.k_pressed:
             self.player.draw_hit_box(RED_COLOR)
 
             # get player x/setup.py velocity from the physics engine ([x,setup.py])
             player_velocities = self.physics_engine.get_physics_object(self.player).body.velocity
-            velocity_x = player_velocities[0]
-            velocity_y = player_velocities[1]
-            is_on_ground = self.physics_engine.is_on_ground(self.player)
-
-            msg = self.end_of_map
-            msg2 = self.player.crouching
-            msg3 = self.player.health
-            msg4 = velocity_x
-            msg5 = velocity_y
-            msg6 = self.player.jumping
-            msg7 = self.player.center_x
-            msg8 = self.player.center_y
-            msg10 = is_on_ground
-            msg11 = self.player.height
-            msg12 = self.player.width
-
-            output = f"Map width: {msg:.2f}"
-            output2 = f"Is crouching: {msg2}"
-            output3 = f"HP: {msg3:.2f}"
-            output4 = f"Player X vel: {msg4:.2f}"
-            output5 = f"Player Y vel: {msg5:.2f}"
-            output6 = f"Player Jumping?: {msg6}"
-            output7 = f"Player X pos?: {msg7:.1f}"
-            output8 = f"Player Y pos?: {msg8:.1f}"
-            output10 = f"Player on ground?: {msg10}"
-            output11 = f"Player height: {msg11}"
-            output12 = f"Player width: {msg12}"
-
-            ar.draw_text(text=output,
-                         start_x=self.view_left + 20,
-                         start_y=self.view_bottom + (SCREEN_HEIGHT - 25),
-                         font_size=18,
-                         color=ar.color.WHITE)
-            ar.draw_text(text=output2,
-                         start_x=self.view_left + 20,
-                         start_y=self.view_bottom + (SCREEN_HEIGHT - 45),
-                         font_size=18,
-                         color=ar.color.WHITE)
-            ar.draw_text(text=output3,
-                         start_x=self.view_left + 20,
-                         start_y=self.view_bottom + (SCREEN_HEIGHT - 65),
-                         font_size=18,
-                         color=ar.color.WHITE)
-            ar.draw_text(text=output4,
-                         start_x=self.view_left + 20,
-                         start_y=self.view_bottom + (SCREEN_HEIGHT - 85),
-                         font_size=18,
-                         color=ar.color.WHITE)
-            ar.draw_text(text=output5,
-                         start_x=self.view_left + 20,
-                         start_y=self.view_bottom + (SCREEN_HEIGHT - 105),
-                         font_size=18,
-                         color=ar.color.WHITE)
-            ar.draw_text(text=output6,
-                         start_x=self.view_left + 20,
-                         start_y=self.view_bottom + (SCREEN_HEIGHT - 125),
-                         font_size=18,
-                         color=ar.color.WHITE)
-            ar.draw_text(text=output7,
-                         start_x=self.view_left + 20,
-                         start_y=self.view_bottom + (SCREEN_HEIGHT - 145),
-                         font_size=18,
-                         color=ar.color.WHITE)
-            ar.draw_text(text=output8,
-                         start_x=self.view_left + 20,
-                         start_y=self.view_bottom + (SCREEN_HEIGHT - 165),
-                         font_size=18,
-                         color=ar.color.WHITE)
-            ar.draw_text(text=output10,
-                         start_x=self.view_left + 20,
-                         start_y=self.view_bottom + (SCREEN_HEIGHT - 185),
-                         font_size=18,
-                         color=ar.color.WHITE)
-            ar.draw_text(text=output11,
-                         start_x=self.view_left + 20,
-                         start_y=self.view_bottom + (SCREEN_HEIGHT - 205),
-                         font_size=18,
-                         color=ar.color.WHITE)
-            ar.draw_text(text=output12,
-                         start_x=self.view_left + 20,
-                         start_y=self.view_bottom + (SCREEN_HEIGHT - 225),
-                         font_size=18,
-                         color=ar.color.WHITE)
-
-        msg3 = self.player.health
-        output3 = f"HP: {msg3:.2f}"
-        ar.draw_text(text=output3,
-                     start_x=self.view_left + 20,
-                     start_y=self.view_bottom + (SCREEN_HEIGHT - 65),
-                     font_size=18,
-                     color=ar.color.WHITE)
+
+            hud.set("map width", self.end_of_map)
+            hud.set("crouching", self.player.crouching)
+            hud.set("x velocity", player_velocities[0])
+            hud.set("y velocity", player_velocities[1])
+            hud.set("jumping", self.player.jumping)
+            hud.set("x position", self.player.center_x)
+            hud.set("y position", self.player.center_y)
+            hud.set("on ground", self.physics_engine.is_on_ground(self.player))
+            hud.set("height", self.player.height)
+            hud.set("width", self.player.width)
+        else:
+            for name in DEBUG_LABELS:
+                hud.hide(name)
+
+        hud.set("hp", self.player.health)
         if self.screen_wipe_rect:
-            msg9 = self.screen_wipe_rect.center_x
-            output9 = f"screen wipe x: {msg9:.2f}"
-            ar.draw_text(text=output9,
-                         start_x=self.view_left + 20,
-                         start_y=self.view_bottom + (SCREEN_HEIGHT - 180),
-                         font_size=18,
-                         color=ar.color.WHITE)
+            hud.set("screen wipe", self.screen_wipe_rect.center_x)
+        else:
+            hud.hide("screen wipe")
+        if self.hud_message_end is not None and time.perf_counter() >= self.hud_message_end:
+            hud.hide("message")
+            self.hud_message_end = None
+        with profiler.section("draw hud"):
+            hud.draw(self.view_left, self.view_bottom)
+
+        # draw the profiler overlay (J) in the top right corner
+        if self.profiler.enabled:
+            self.profiler.draw(self.view_left, self.view_bottom)
+        self.profiler.end_frame()
 
 
 def run_game():
     window = ar.Window(SCREEN_WIDTH, SCREEN_HEIGHT, SCREEN_TITLE, update_rate=FRAME_RATE)
+    assets.preload(textures=[TITLE_SCREEN_TEXTURE, GAME_BACKGROUND_TEXTURE],
+                   sounds=[ORB_TOUCHED_SOUND, ORB_OFF_SOUND, JUMP_SOUND, FOOTSTEP_SOUND, DASH_SOUND])
     start_view = views.MenuView()
     window.show_view(start_view)
     ar.run()
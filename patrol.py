@@ -0,0 +1,84 @@
+"""
+class that steers every awake enemy and moving platform in one pass: their boundaries and movement
+are kept in NumPy arrays, all the "turn around at a boundary" checks are done at once, and the new
+velocities are written straight to the Pymunk bodies.
+"""
+import numpy as np
+from activity import edge_offsets
+from constants import *
+
+
+class PatrolSystem:
+    """
+    patrol data of the active sprites of an ActivityRegion, one row per sprite and one column per
+    axis (x, y). the arrays are rebuilt whenever sprites fall asleep, wake up or are removed
+    """
+
+    def __init__(self, activity, physics_engine):
+        """
+        :param activity: the level's ActivityRegion (its active sprites are the ones steered)
+        :param physics_engine: the level's PymunkPhysicsEngine
+        """
+        self.activity = activity
+        self.physics_engine = physics_engine
+        self.activity_changes = None  # activity.changes when the arrays were built
+        self.sprites = []
+        self.bodies = []
+        self.low = np.empty((0, 2))  # lowest center the sprite can have before turning around (-inf if none)
+        self.high = np.empty((0, 2))  # highest center the sprite can have before turning around (inf if none)
+        self.change = np.empty((0, 2))  # movement per logic step (change_x, change_y)
+
+    @staticmethod
+    def limit(boundary, offset, default):
+        """
+        turn a boundary (in tiles) into the furthest the sprite's center can go
+        :param boundary: the sprite's boundary_* value. None or 0 if it has none
+        :param offset: distance from the sprite's center to the hit box edge that is checked (see edge_offsets)
+        :param default: value used when the sprite has no boundary
+        :return: position in pixels
+        """
+        return boundary * SPRITE_SCALING + offset if boundary else default
+
+    def build(self):
+        """
+        gather the patrol data of the active sprites into the arrays
+        :return: n/a
+        """
+        self.activity_changes = self.activity.changes
+        self.sprites = list(self.activity.active)
+        self.bodies = [self.physics_engine.sprites[sprite].body for sprite in self.sprites]
+        offsets = [edge_offsets(sprite) for sprite in self.sprites]
+        self.low = np.array([(self.limit(sprite.boundary_left, left, -np.inf),
+                              self.limit(sprite.boundary_bottom, bottom, -np.inf))
+                             for sprite, (left, _, bottom, _) in zip(self.sprites, offsets)],
+                            dtype=float).reshape(-1, 2)
+        self.high = np.array([(self.limit(sprite.boundary_right, -right, np.inf),
+                               self.limit(sprite.boundary_top, -top, np.inf))
+                              for sprite, (_, right, _, top) in zip(self.sprites, offsets)],
+                             dtype=float).reshape(-1, 2)
+        self.change = np.array([(sprite.change_x, sprite.change_y) for sprite in self.sprites],
+                               dtype=float).reshape(-1, 2)
+
+    def update(self, delta_time):
+        """
+        turn around the sprites that went past a boundary, and set every sprite's velocity
+        :param delta_time: length of the logic step
+        :return: n/a
+        """
+        if self.activity.changes != self.activity_changes:
+            self.build()
+        if not self.sprites:
+            return
+
+        position = np.array([sprite.position for sprite in self.sprites], dtype=float)
+        change = self.change
+        turn = ((change > 0) & (position > self.high)) | ((change < 0) & (position < self.low))
+        change[turn] *= -1
+
+        # the sprites' own change_x/y are used to move them between physics steps and to restore them
+        for i in np.flatnonzero(turn.any(axis=1)):
+            self.sprites[i].change_x, self.sprites[i].change_y = change[i].tolist()
+
+        # Pymunk uses velocity in pixels per second, change_x/y are in pixels per logic step
+        for body, (velocity_x, velocity_y) in zip(self.bodies, (change / delta_time).tolist()):
+            body.velocity = (velocity_x, velocity_y)
@@ -1,6 +1,8 @@
 import arcade as ar
 from constants import *
 from random import randint
+from assets import assets, NullSound
+from finite_state_machines import PlayerPoseHandler
 
 # coordinates to make a circular hitbox for when player is "crouching"
 CIRCLE2 = [(-30,0), (-28,10),(-20,22),(-10,28),
@@ -9,6 +11,16 @@ CIRCLE2 = [(-30,0), (-28,10),(-20,22),(-10,28),
           (0,-30),(-10,-28),(-20,-22),(-28,-10)]
 
 
+# every animation frame of the player
+PLAYER_SPRITE_PATH = "sprites/player_sprites/player"
+PLAYER_FRAME_PATHS = ([f"{PLAYER_SPRITE_PATH}_idle.png",
+                       f"{PLAYER_SPRITE_PATH}_ball.png",
+                       f"{PLAYER_SPRITE_PATH}_jumping.png"]
+                      + [f"{PLAYER_SPRITE_PATH}_swimming{i}.png" for i in range(1, 5)]
+                      + [f"{PLAYER_SPRITE_PATH}_dashing{i}.png" for i in range(1, 12)]
+                      + [f"{PLAYER_SPRITE_PATH}walking{i}.png" for i in range(1, 15)])
+
+
 # class CircleSprite(ar.Sprite):
 #     def __init__(self, filename, pymunk_shape):
 #         super().__init__(filename, center_x=pymunk_shape.body.position.x, center_y=pymunk_shape.body.position.setup.py)
@@ -21,7 +33,10 @@ class PlayerCharacter(ar.Sprite):
     the main player object. it is based on an Arcade Sprite object.
     """
 
-    def __init__(self):
+    def __init__(self, audio=True):
+        """
+        :param audio: load sounds. without audio (headless mode) the player's sounds are silent
+        """
         # set up parent class
         super().__init__()
 
@@ -37,7 +52,8 @@ class PlayerCharacter(ar.Sprite):
         self.time_last_launched = 0
         self.crouching = False  # is the player crouching?
         self.default_points = [[-40, -60], [40, -60], [40, 50], [-40, 50]]
-        self.adjusted_hitbox = False  # this is a "latch", used for handling crouching.
+        self.pose_handler = None  # PlayerPoseHandler, swaps the physics shape for crouching/swimming
+        self.physics_state = None  # PlayerPhysicsState, the velocity and ground contact read once per step
         self.current_y_velocity = 0
         self.is_touching_ground = True
 
@@ -66,42 +82,81 @@ class PlayerCharacter(ar.Sprite):
         # How far have we traveled vertically since changing the texture
         self.y_odometer = 0
 
-        main_path = "sprites/player_sprites/player"
+        self.held_assets = []  # textures/sounds acquired from the asset manager
+
+        # every animation frame comes from one atlas, cut out of a single image
+        frames = assets.atlas("player", PLAYER_FRAME_PATHS, holder=self.held_assets)
 
         # add idle texture
-        self.idle_texture_pair = ar.load_texture_pair(f"{main_path}_idle.png")
+        self.idle_texture_pair = frames[f"{PLAYER_SPRITE_PATH}_idle.png"]
 
         # add crouching texture
-        self.crouching_texture_pair = ar.load_texture_pair(f"{main_path}_ball.png")
+        self.crouching_texture_pair = frames[f"{PLAYER_SPRITE_PATH}_ball.png"]
 
         # add jumping texture
-        self.jumping_texture_pair = ar.load_texture_pair(f"{main_path}_jumping.png")
+        self.jumping_texture_pair = frames[f"{PLAYER_SPRITE_PATH}_jumping.png"]
 
         # add swimming texture
-        self.swimming_textures = []
-        for i in range(1, 5):
-            texture = ar.load_texture_pair(f"{main_path}_swimming{i}.png")
-            self.swimming_textures.append(texture)
+        self.swimming_textures = [frames[f"{PLAYER_SPRITE_PATH}_swimming{i}.png"] for i in range(1, 5)]
 
         # add dashing sprites to list
-        self.dashing_textures = []
-        for i in range(1, 12):
-            texture = ar.load_texture_pair(f"{main_path}_dashing{i}.png")
-            self.dashing_textures.append(texture)
+        self.dashing_textures = [frames[f"{PLAYER_SPRITE_PATH}_dashing{i}.png"] for i in range(1, 12)]
 
         # add walking sprites to list
-        self.walking_textures = []
-        for i in range(1, 15):
-            texture = ar.load_texture_pair(f"{main_path}walking{i}.png")
-            self.walking_textures.append(texture)
+        self.walking_textures = [frames[f"{PLAYER_SPRITE_PATH}walking{i}.png"] for i in range(1, 15)]
 
         self.texture = self.idle_texture_pair[0]
-        self.set_hit_box(self.texture.hit_box_points)
+        self.hit_box_pose = None  # pose the current hit box belongs to
+        self.set_pose_hit_box(("idle", RIGHT_FACING), self.texture.hit_box_points)
 
         # load sounds
-        self.footstep_sound = ar.load_sound("sounds/footstep.wav")
-        self.jump_sound = ar.load_sound("sounds/jump1.wav")
-        self.dash_sound = ar.load_sound(("sounds/dash_whoosh.ogg"))
+        if audio:
+            self.footstep_sound = assets.sound(FOOTSTEP_SOUND, holder=self.held_assets)
+            self.jump_sound = assets.sound(JUMP_SOUND, holder=self.held_assets)
+            self.dash_sound = assets.sound(DASH_SOUND, holder=self.held_assets)
+        else:
+            self.footstep_sound = self.jump_sound = self.dash_sound = NullSound()
+
+    def release_assets(self):
+        """
+        let go of the player's textures and sounds once the player is no longer used
+        :return: n/a
+        """
+        assets.release_all(self.held_assets)
+
+    def add_pose_handler(self, physics_engine):
+        """
+        set up the physics shapes of every pose, once the player has been added to a physics engine
+        :param physics_engine: Pymunk physics engine
+        :return: n/a
+        """
+        self.pose_handler = PlayerPoseHandler(self, physics_engine,
+                                              standing_points=self.idle_texture_pair[0].hit_box_points,
+                                              ball_points=CIRCLE_LARGE,
+                                              swimming_points=self.swimming_textures[0][0].hit_box_points)
+
+    def change_pose(self, pose):
+        """
+        switch the player's physics shape to that of a pose ("standing", "ball" or "swimming")
+        :param pose: the pose
+        :return: n/a
+        """
+        if self.pose_handler and self.pose_handler.state != pose:
+            self.pose_handler.change_state(pose)
+
+    def set_pose_hit_box(self, pose, points):
+        """
+        give the player the hit box of a pose. the hit box is only replaced when the pose changes,
+        since setting a hit box makes Arcade work out the sprite's adjusted hit box again
+        :param pose: name of the pose (ex: "ball", ("idle", RIGHT_FACING) for poses that face a direction,
+                     or ("swimming", texture) for animated poses)
+        :param points: hit box points of the pose
+        :return: n/a
+        """
+        if pose == self.hit_box_pose:
+            return
+        self.hit_box_pose = pose
+        self.set_hit_box(points)
 
     def is_on_floor(self, physics_engine, dy):
         """
@@ -113,7 +168,7 @@ class PlayerCharacter(ar.Sprite):
         :param dy: current y velocity
         :return:
         """
-        is_on_ground = physics_engine.is_on_ground(self)
+        is_on_ground = self.physics_state.on_ground
         if is_on_ground and dy == 0:
             self.is_touching_ground = True
         else:
@@ -136,55 +191,38 @@ class PlayerCharacter(ar.Sprite):
         if dx > 0 and self.character_face_direction == LEFT_FACING:
             self.character_face_direction = RIGHT_FACING
 
-        # Are we on the ground?
-        is_on_ground = physics_engine.is_on_ground(self)
+        # Are we on the ground? (read once per step, see player_physics.py)
+        is_on_ground = self.physics_state.on_ground
 
         # Add to the odometer how far we've moved
         self.x_odometer += dx
         self.y_odometer += dy
 
-        vel = physics_engine.get_physics_object(self).body.velocity
+        # the physics shape follows the pose. the pose handler swaps shapes on the same body,
+        # so the player keeps moving exactly as before (ex: walking then crouching keeps momentum)
+        if self.crouching and not self.in_water:
+            self.change_pose("ball")
+        elif self.in_water and not is_on_ground:
+            self.change_pose("swimming")
+        else:
+            self.change_pose("standing")
 
         # change to crouching sprite if holding DOWN or S
         if self.crouching and not self.in_water:
             self.texture = self.crouching_texture_pair[self.character_face_direction]
-            self.set_hit_box(CIRCLE_LARGE)
-            # in order to make the player smaller when crouching for the physics engine,
-            # remove the player from the physics engine and add it back right away.
-            # this makes the process of recreating the physics body and shape automatic.
-            # however, the texture height and width must be set manually to prevent
-            # graphical glitches.
-            if not self.adjusted_hitbox:
-                # continue walking momentum when walking then crouching (left/right + down)
-                physics_engine.remove_sprite(sprite=self)
-                physics_engine.add_sprite(self,
-                                          max_vertical_velocity=PLAYER_MAX_VERTICAL_SPEED,
-                                          max_horizontal_velocity=PLAYER_MAX_HORIZONTAL_SPEED_ROLLING,
-                                          friction=0)
-                physics_engine.apply_impulse(self, vel)
-                self.texture = self.crouching_texture_pair[self.character_face_direction]
-                self.set_hit_box(CIRCLE_LARGE)
-
-                # remove these hardcoded numbers later (still debugging crouching)
-                self.center_y -= 16
-                self.height = PLAYER_BALL_RADIUS
-                self.width = PLAYER_BALL_RADIUS
-            self.adjusted_hitbox = True
+            self.set_pose_hit_box("ball", CIRCLE_LARGE)
+            # the texture height and width must be set manually to prevent graphical glitches
+            self.height = PLAYER_BALL_RADIUS
+            self.width = PLAYER_BALL_RADIUS
             return
 
         # handle swimming textures
         if self.in_water and not is_on_ground:
             self.angle = 0
-            self.set_hit_box(self.texture.hit_box_points)
+            # every frame of the swimming animation has its own hit box
+            self.set_pose_hit_box(("swimming", self.texture), self.texture.hit_box_points)
             self.height = PLAYER_SWIM_HEIGHT
             self.width = PLAYER_SWIM_WIDTH
-            if self.adjusted_hitbox:
-                physics_engine.remove_sprite(sprite=self)
-                physics_engine.add_sprite(self,
-                                          moment=ar.PymunkPhysicsEngine.MOMENT_INF)
-                self.width = PLAYER_SWIM_WIDTH
-                self.height = PLAYER_SWIM_HEIGHT
-            self.adjusted_hitbox = False
 
             # handle swimming animation below
             self.cur_texture += 1 # speed of animation
@@ -201,13 +239,13 @@ class PlayerCharacter(ar.Sprite):
             if not self.ball_dash_reset:
                 self.cur_texture = 0
                 self.ball_dash_reset = True
-                ar.play_sound(self.dash_sound, volume=0.4)
+                self.dash_sound.play(volume=0.4)
             self.angle = 0
             self.x_odometer = 0
             # do the walking animation
             self.cur_texture += 11
             self.color = (randint(50,255),randint(50,255),randint(50,255))
-            if self.cur_texture >= (11 * UPDATES_PER_FRAME) or (abs(vel[0]) < (50)):
+            if self.cur_texture >= (11 * UPDATES_PER_FRAME) or (abs(self.physics_state.velocity_x) < (50)):
                 self.cur_texture = 0
                 self.ball_dashing = False
                 self.ball_dash_released = False
@@ -223,19 +261,9 @@ class PlayerCharacter(ar.Sprite):
         if abs(dx) <= DEAD_ZONE and not self.jumping and not self.crouching and not self.in_water:
             self.angle = 0
             self.texture = self.idle_texture_pair[self.character_face_direction]
-            self.set_hit_box(self.texture.hit_box_points)
-            if self.adjusted_hitbox:
-                physics_engine.remove_sprite(sprite=self)
-                physics_engine.add_sprite(self,
-                                          friction=PLAYER_FRICTION,
-                                          mass=PLAYER_MASS,
-                                          moment=ar.PymunkPhysicsEngine.MOMENT_INF,
-                                          collision_type="player",
-                                          max_horizontal_velocity=PLAYER_MAX_HORIZONTAL_SPEED,
-                                          max_vertical_velocity=PLAYER_MAX_VERTICAL_SPEED)
-                self.height = PLAYER_IDLE_HEIGHT
-                self.width = PLAYER_IDLE_WIDTH
-            self.adjusted_hitbox = False
+            self.set_pose_hit_box(("idle", self.character_face_direction), self.texture.hit_box_points)
+            self.height = PLAYER_IDLE_HEIGHT
+            self.width = PLAYER_IDLE_WIDTH
             return
 
         # jumping texture
@@ -244,7 +272,7 @@ class PlayerCharacter(ar.Sprite):
             self.texture = self.jumping_texture_pair[self.character_face_direction]
             self.height = PLAYER_IDLE_HEIGHT
             self.width = PLAYER_IDLE_WIDTH
-            self.set_hit_box(self.texture.hit_box_points)
+            self.set_pose_hit_box(("jumping", self.character_face_direction), self.texture.hit_box_points)
             return
 
         # walking animation
@@ -257,30 +285,12 @@ class PlayerCharacter(ar.Sprite):
                 self.cur_texture = 0
             # play a sound effect when the character's foot is touching the ground (5th frame)
             if self.cur_texture // UPDATES_PER_FRAME == 5 and is_on_ground:
-                ar.play_sound(self.footstep_sound, volume=0.1)
+                self.footstep_sound.play(volume=0.1)
             self.texture = self.walking_textures[self.cur_texture // UPDATES_PER_FRAME][self.character_face_direction]
             self.height = PLAYER_IDLE_HEIGHT
             self.width = PLAYER_IDLE_WIDTH
             return
 
-        # if player isn't crouching, set physics shape back to default size
-        if self.adjusted_hitbox and not self.crouching and not self.in_water and not self.jumping:
-            print("resetting")
-            self.angle = 0
-            self.center_y += 16
-            self.texture = self.idle_texture_pair[self.character_face_direction]
-
-            physics_engine.remove_sprite(sprite=self)
-            physics_engine.add_sprite(self,
-                                      friction=PLAYER_FRICTION,
-                                      mass=PLAYER_MASS,
-                                      moment=ar.PymunkPhysicsEngine.MOMENT_INF,
-                                      collision_type="player",
-                                      max_horizontal_velocity=PLAYER_MAX_HORIZONTAL_SPEED,
-                                      max_vertical_velocity=PLAYER_MAX_VERTICAL_SPEED)
-            self.height = PLAYER_IDLE_HEIGHT
-            self.width = PLAYER_IDLE_WIDTH
-
 # class Enemy():
 #     """
 #     This class was supposed to be similar to Player, but is now defunct. Will probably
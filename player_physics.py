@@ -0,0 +1,94 @@
+"""
+class that reads the player's physics state (velocity, on the ground) once per logic step,
+for the controls and the player's animation to share, and pushes the player's body around directly.
+asking the physics engine for these looks the player's body up by sprite every time, and checking
+for the ground goes through every contact the body has, which used to happen several times a step.
+"""
+from constants import *
+
+# forces and impulses used by the controls every step, made once instead of building a new tuple each time
+DASH_RIGHT_IMPULSE = (BALL_DASH_IMPULSE, 0)
+DASH_LEFT_IMPULSE = (-BALL_DASH_IMPULSE, 0)
+JUMP_IMPULSE = (0, PLAYER_JUMP_IMPULSE)
+JUMP_IMPULSE_IN_AIR = (0, PLAYER_JUMP_IMPULSE_IN_AIR)
+MOVE_RIGHT_FORCE_ON_GROUND = (PLAYER_MOVE_FORCE_ON_GROUND, 0)
+MOVE_LEFT_FORCE_ON_GROUND = (-PLAYER_MOVE_FORCE_ON_GROUND, 0)
+MOVE_RIGHT_FORCE_IN_AIR = (PLAYER_MOVE_FORCE_IN_AIR, 0)
+MOVE_LEFT_FORCE_IN_AIR = (-PLAYER_MOVE_FORCE_IN_AIR, 0)
+SWIM_UP_IMPULSE = (0, PLAYER_MOVE_FORCE_IN_WATER)
+SWIM_DOWN_IMPULSE = (0, -PLAYER_MOVE_FORCE_IN_WATER)
+SWIM_RIGHT_IMPULSE = (PLAYER_MOVE_FORCE_IN_WATER, 0)
+SWIM_LEFT_IMPULSE = (-PLAYER_MOVE_FORCE_IN_WATER, 0)
+HEAVY_WATER_DAMPENING_UP = (0, PLAYER_HEAVY_WATER_DAMPENING)
+HEAVY_WATER_DAMPENING_RIGHT = (PLAYER_HEAVY_WATER_DAMPENING, 0)
+HEAVY_WATER_DAMPENING_LEFT = (-PLAYER_HEAVY_WATER_DAMPENING, 0)
+WATER_COUNTERFORCE_UP = (0, WATER_DAMPENING_FORCE)
+WATER_COUNTERFORCE_DOWN = (0, -WATER_DAMPENING_FORCE)
+WATER_COUNTERFORCE_RIGHT = (WATER_DAMPENING_FORCE, 0)
+WATER_COUNTERFORCE_LEFT = (-WATER_DAMPENING_FORCE, 0)
+BUOYANCY = (0, BUOYANCY_FORCE)
+BODY_CENTER = (0, 0)
+
+
+class PlayerPhysicsState:
+    """
+    the player's physics state for the current logic step. impulses and velocity changes made
+    through it are kept up to date in it straight away
+    """
+
+    def __init__(self, physics_engine, player):
+        """
+        :param physics_engine: the level's PymunkPhysicsEngine (the player must already be added to it)
+        :param player: the PlayerCharacter
+        """
+        self.physics_engine = physics_engine
+        self.player = player
+        # the body stays the same for the whole level, the shape changes with the player's pose
+        self.physics_object = physics_engine.get_physics_object(player)
+        self.body = self.physics_object.body
+        self.velocity_x = 0.0
+        self.velocity_y = 0.0
+        self.on_ground = False
+        player.physics_state = self
+
+    def refresh(self):
+        """
+        read the state after the physics step. call once per logic step, before the sprites are
+        synced with their bodies (the player's animation reads the state)
+        :return: n/a
+        """
+        self.velocity_x, self.velocity_y = self.body.velocity
+        self.on_ground = self.physics_engine.is_on_ground(self.player)
+
+    def apply_impulse(self, impulse):
+        """
+        :param impulse: (x, y) impulse, applied to the center of the body
+        :return: n/a
+        """
+        self.body.apply_impulse_at_local_point(impulse, BODY_CENTER)
+        # an impulse changes the velocity straight away
+        self.velocity_x, self.velocity_y = self.body.velocity
+
+    def apply_force(self, force):
+        """
+        :param force: (x, y) force, applied to the center of the body during the next physics step
+        :return: n/a
+        """
+        self.body.apply_force_at_local_point(force, BODY_CENTER)
+
+    def set_velocity(self, velocity_x, velocity_y):
+        """
+        :param velocity_x: x velocity in pixels per second
+        :param velocity_y: y velocity in pixels per second
+        :return: n/a
+        """
+        self.body.velocity = (velocity_x, velocity_y)
+        self.velocity_x = velocity_x
+        self.velocity_y = velocity_y
+
+    def set_friction(self, friction):
+        """
+        :param friction: friction of the player's current shape
+        :return: n/a
+        """
+        self.physics_object.shape.friction = friction
@@ -0,0 +1,202 @@
+"""
+class that times each phase of a frame (physics, sprite updates, game logic, drawing each layer).
+keeps rolling min/avg/p99 times for an overlay (toggle with J) and can save a Chrome trace
+(open it in chrome://tracing or https://ui.perfetto.dev) with F12.
+in debug builds (see PROFILER_COUNT_ALLOCATIONS) it also counts the memory blocks each section leaves
+allocated, to check that code which should not allocate (ex: the player controls) doesn't.
+"""
+import json
+import sys
+from collections import deque
+from contextlib import nullcontext
+from time import perf_counter
+import arcade as ar
+from constants import *
+from hud import Hud
+
+
+# what FrameProfiler.section returns while the profiler is off
+NULL_SECTION = nullcontext()
+
+
+class ProfiledSection:
+    """
+    a with block being timed by a FrameProfiler
+    """
+    __slots__ = ("profiler", "name", "start", "blocks")
+
+    def __init__(self, profiler, name):
+        """
+        :param profiler: the FrameProfiler the time is added to
+        :param name: name of the section
+        """
+        self.profiler = profiler
+        self.name = name
+        self.start = None
+        self.blocks = None
+
+    def __enter__(self):
+        if self.profiler.count_allocations:
+            self.blocks = sys.getallocatedblocks()
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        duration = perf_counter() - self.start
+        blocks = None
+        if self.blocks is not None:
+            blocks = sys.getallocatedblocks() - self.blocks
+        self.profiler.add_section(self.name, self.start, duration, blocks)
+        return False
+
+
+class FrameProfiler:
+    """
+    times named sections of code. times of a section that runs several times in one frame
+    (ex: the physics step when catching up) are added together
+    """
+
+    def __init__(self, window=PROFILER_WINDOW, max_trace_events=PROFILER_MAX_TRACE_EVENTS):
+        """
+        :param window: number of frames the rolling stats are taken over
+        :param max_trace_events: number of most recent sections kept for the trace
+        """
+        self.enabled = False
+        self.window = window
+        self.frame_times = {}  # section name: deque of the section's total time in recent frames (ms)
+        self.current = {}  # section name: total time so far this frame (seconds)
+        self.allocations = {}  # section name: deque of the blocks the section left allocated in recent frames
+        self.current_allocations = {}  # section name: blocks left allocated so far this frame
+        self.count_allocations = PROFILER_COUNT_ALLOCATIONS
+        self.trace = deque(maxlen=max_trace_events)  # (name, start, duration) in seconds
+        self.report = []  # (name, min, avg, p99) in ms, refreshed every PROFILER_REPORT_INTERVAL frames
+        self.frames = 0
+        self.frame_start = None
+        self.start = perf_counter()
+        self.hud = Hud()  # overlay lines, re-rendered only when the report is refreshed
+
+    def section(self, name):
+        """
+        time the code in a with block:
+            with profiler.section("physics"):
+                physics_engine.step()
+        when the profiler is off this returns a shared do-nothing context manager, so an untimed
+        section costs a flag check and allocates nothing
+        :param name: name of the section
+        :return: a context manager
+        """
+        if not self.enabled:
+            return NULL_SECTION
+        return ProfiledSection(self, name)
+
+    def add_section(self, name, start, duration, blocks=None):
+        """
+        record a finished section
+        :param name: name of the section
+        :param start: perf_counter() time the section started at
+        :param duration: seconds the section took
+        :param blocks: memory blocks the section left allocated, or None if not counted
+        :return: n/a
+        """
+        self.current[name] = self.current.get(name, 0) + duration
+        self.trace.append((name, start, duration))
+        if blocks is not None:
+            self.current_allocations[name] = self.current_allocations.get(name, 0) + blocks
+
+    def end_frame(self):
+        """
+        call once at the end of each frame (after drawing) to close off the frame's times
+        :return: n/a
+        """
+        if not self.enabled:
+            self.frame_start = None
+            return
+        now = perf_counter()
+        if self.frame_start is not None:
+            self.current["frame"] = now - self.frame_start
+            self.trace.append(("frame", self.frame_start, now - self.frame_start))
+        self.frame_start = now
+
+        for name, total in self.current.items():
+            times = self.frame_times.get(name)
+            if times is None:
+                times = self.frame_times[name] = deque(maxlen=self.window)
+            times.append(total * 1000)
+        self.current = {}
+        for name, blocks in self.current_allocations.items():
+            counts = self.allocations.get(name)
+            if counts is None:
+                counts = self.allocations[name] = deque(maxlen=self.window)
+            counts.append(blocks)
+        self.current_allocations = {}
+
+        self.frames += 1
+        if self.frames % PROFILER_REPORT_INTERVAL == 0:
+            self.report = self.stats()
+
+    def stats(self):
+        """
+        get the rolling stats of every section
+        :return: list of (name, min ms, average ms, 99th percentile ms, average blocks left allocated or
+                 None if not counted), slowest (by average) first
+        """
+        stats = []
+        for name, times in self.frame_times.items():
+            ordered = sorted(times)
+            p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+            counts = self.allocations.get(name)
+            blocks = sum(counts) / len(counts) if counts else None
+            stats.append((name, ordered[0], sum(ordered) / len(ordered), p99, blocks))
+        stats.sort(key=lambda stat: stat[2], reverse=True)
+        return stats
+
+    def toggle(self):
+        """
+        turn profiling (and its overlay) on or off. the stats start over when turned on
+        :return: n/a
+        """
+        self.enabled = not self.enabled
+        self.frame_times = {}
+        self.current = {}
+        self.allocations = {}
+        self.current_allocations = {}
+        self.report = []
+        self.frame_start = None
+
+    def save_trace(self, path):
+        """
+        save the recorded sections as a Chrome trace (JSON trace event format)
+        :param path: file to write
+        :return: n/a
+        """
+        events = [{"name": name, "ph": "X", "pid": 0, "tid": 0,
+                   "ts": (start - self.start) * 1e6, "dur": duration * 1e6}
+                  for name, start, duration in self.trace]
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+    def draw(self, view_left, view_bottom):
+        """
+        draw the rolling stats in the top right corner of the screen
+        :param view_left: left of the viewport
+        :param view_bottom: bottom of the viewport
+        :return: n/a
+        """
+        lines = [f"{'section':<24}{'min':>7}{'avg':>7}{'p99':>7}{'net blocks':>12}  (ms)"]
+        lines += [f"{name:<24}{low:>7.2f}{average:>7.2f}{p99:>7.2f}" + (f"{blocks:>12.1f}" if blocks is not None else "")
+                  for name, low, average, p99, blocks in self.report]
+        left = SCREEN_WIDTH - PROFILER_OVERLAY_WIDTH
+        top = SCREEN_HEIGHT - 20
+        for i, line in enumerate(lines):
+            name = f"line {i}"
+            if name not in self.hud.labels:
+                self.hud.add_label(name, "{}", left, top - (i + 1) * 16, font_size=11,
+                                   font_names=MONOSPACE_FONTS)
+            self.hud.set(name, line)
+        for i in range(len(lines), len(self.hud.labels)):
+            self.hud.hide(f"line {i}")
+
+        ar.draw_lrtb_rectangle_filled(view_left + left - 10, view_left + SCREEN_WIDTH,
+                                      view_bottom + top + 10, view_bottom + top - len(lines) * 16 - 10,
+                                      (0, 0, 0, 180))
+        self.hud.draw(view_left, view_bottom)
@@ -0,0 +1,221 @@
+"""
+deterministic input recording and replay. a recording stores which movement keys were held at every
+logic step (2 bytes per step) plus a checksum of the player's physics state every few steps, so a
+replay can tell exactly when (and if) it stopped matching the original run.
+
+replay a recording without a window and check it for desyncs:
+    python replay.py replays/replay_10_20211017-120000.csr
+"""
+import argparse
+import struct
+import time
+import zlib
+from arcade import key
+from constants import *
+
+# magic, version, level, spawn id, checksum interval, number of steps
+HEADER = struct.Struct("<4sBhhHI")
+MAGIC = b"CSRP"
+VERSION = 1
+
+# the flags on GameView that are recorded, and the key that is pressed to replay each one.
+# the index of each entry is its bit in the recorded state byte
+RECORDED_FLAGS = (
+    ("left_pressed", key.LEFT),
+    ("right_pressed", key.RIGHT),
+    ("up_pressed", key.UP),
+    ("down_pressed", key.DOWN),
+    ("space_bar_pressed", key.SPACE),
+    ("r_pressed", key.R),
+)
+
+# every key that sets one of the recorded flags, and the flag's bit
+KEY_BITS = {
+    key.LEFT: 1 << 0, key.A: 1 << 0,
+    key.RIGHT: 1 << 1, key.D: 1 << 1,
+    key.UP: 1 << 2, key.W: 1 << 2,
+    key.DOWN: 1 << 3, key.S: 1 << 3,
+    key.SPACE: 1 << 4,
+    key.R: 1 << 5,
+}
+
+
+def state_checksum(game):
+    """
+    checksum of everything that shows whether two runs are still in sync (player position, velocity,
+    health and the level being played)
+    :param game: the GameView
+    :return: 32 bit checksum
+    """
+    body = game.physics_engine.get_physics_object(game.player).body
+    data = struct.pack("<4dih", body.position.x, body.position.y, body.velocity.x, body.velocity.y,
+                       int(game.player.health), int(game.level))
+    return zlib.crc32(data)
+
+
+class InputRecorder:
+    """
+    records the recorded flags of a GameView at the start of every logic step
+    """
+
+    def __init__(self, game, checksum_interval=REPLAY_CHECKSUM_INTERVAL):
+        """
+        start a recording. the game should have just been set up, so that a replay can start from
+        the same state
+        :param game: the GameView being recorded
+        :param checksum_interval: number of steps between state checksums
+        """
+        self.level = game.level
+        self.spawn_id = game.spawn_id
+        self.checksum_interval = checksum_interval
+        self.steps = bytearray()  # (held flags, tapped flags) for every step
+        self.checksums = []
+        self.taps = 0  # flags pressed and released again since the last step
+
+    def key_released(self, key_pressed):
+        """
+        remember keys that were released before the next step. if the key isn't held at the next
+        step either, it was tapped in between steps and the replay needs to tap it too
+        :param key_pressed: key the player released
+        :return: n/a
+        """
+        self.taps |= KEY_BITS.get(key_pressed, 0)
+
+    def record_step(self, game):
+        """
+        record the flags at the start of a logic step
+        :param game: the GameView
+        :return: n/a
+        """
+        state = 0
+        for bit, (flag, _) in enumerate(RECORDED_FLAGS):
+            if getattr(game, flag):
+                state |= 1 << bit
+        previous = self.steps[-2] if self.steps else 0
+        # a tap only matters if the flag was up before and is still up now
+        taps = self.taps & ~state & ~previous
+        self.steps += bytes((state, taps))
+        self.taps = 0
+
+    def checkpoint(self, game):
+        """
+        store a checksum of the game state after every checksum_interval steps
+        :param game: the GameView
+        :return: n/a
+        """
+        if (len(self.steps) // 2) % self.checksum_interval == 0:
+            self.checksums.append(state_checksum(game))
+
+    def save(self, path):
+        """
+        write the recording to a file
+        :param path: file to write
+        :return: n/a
+        """
+        with open(path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.level, self.spawn_id,
+                                   self.checksum_interval, len(self.steps) // 2))
+            file.write(self.steps)
+            file.write(struct.pack(f"<I{len(self.checksums)}I", len(self.checksums), *self.checksums))
+
+
+class InputReplay:
+    """
+    plays a recording back by pressing and releasing keys on a GameView at the recorded steps, and
+    compares the game state against the recorded checksums
+    """
+
+    def __init__(self, path):
+        """
+        :param path: recording file to play
+        """
+        with open(path, "rb") as file:
+            data = file.read()
+        magic, version, self.level, self.spawn_id, self.checksum_interval, step_count = \
+            HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a Color Seeker recording")
+        offset = HEADER.size
+        self.steps = data[offset:offset + step_count * 2]
+        offset += step_count * 2
+        checksum_count = struct.unpack_from("<I", data, offset)[0]
+        self.checksums = struct.unpack_from(f"<{checksum_count}I", data, offset + 4)
+
+        self.step = 0
+        self.state = 0
+        self.desyncs = []  # steps where the game state did not match the recording
+        self.finished = False
+
+    def play_step(self, game):
+        """
+        press/release keys so the game's flags match the recording for the next logic step
+        :param game: the GameView
+        :return: n/a
+        """
+        if self.step * 2 >= len(self.steps):
+            self.finish(game)
+            return
+        state = self.steps[self.step * 2]
+        taps = self.steps[self.step * 2 + 1]
+        for bit, (_, key_pressed) in enumerate(RECORDED_FLAGS):
+            mask = 1 << bit
+            if self.state & mask and not state & mask:
+                game.release_key(key_pressed, 0)
+            elif state & mask and not self.state & mask:
+                game.press_key(key_pressed, 0)
+            elif taps & mask:
+                game.press_key(key_pressed, 0)
+                game.release_key(key_pressed, 0)
+        self.state = state
+        self.step += 1
+
+    def verify(self, game):
+        """
+        check the game state against the recorded checksum after a logic step
+        :param game: the GameView
+        :return: n/a
+        """
+        if self.finished or self.step % self.checksum_interval:
+            return
+        index = self.step // self.checksum_interval - 1
+        if index < len(self.checksums) and self.checksums[index] != state_checksum(game):
+            self.desyncs.append(self.step)
+
+    def finish(self, game):
+        """
+        let go of every key the replay is holding
+        :param game: the GameView
+        :return: n/a
+        """
+        for bit, (_, key_pressed) in enumerate(RECORDED_FLAGS):
+            if self.state & (1 << bit):
+                game.release_key(key_pressed, 0)
+        self.state = 0
+        self.finished = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="replay a Color Seeker recording without a window")
+    parser.add_argument("path", help="recording file (.csr)")
+    args = parser.parse_args()
+
+    from headless import HeadlessGame
+
+    replay = InputReplay(args.path)
+    headless_game = HeadlessGame(replay.level, replay.spawn_id)
+    headless_game.game.input_replay = replay
+
+    start = time.perf_counter()
+    while not replay.finished:
+        headless_game.advance()
+    elapsed = time.perf_counter() - start
+
+    print(f"replayed {replay.step} steps of level {replay.level} in {elapsed:.2f}s")
+    if replay.desyncs:
+        print(f"DESYNC: state did not match the recording at steps {replay.desyncs}")
+    else:
+        print(f"in sync ({len(replay.checksums)} checksums matched)")
+
+
+if __name__ == '__main__':
+    main()
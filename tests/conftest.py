@@ -0,0 +1,26 @@
+"""
+the game loads its maps, sprites and caches from paths relative to the repository, so the tests run
+from there. games are created with HeadlessGame, so no window or audio device is needed
+"""
+import os
+import sys
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_DIR)
+
+# sets up pyglet so that importing arcade doesn't open a hidden window
+import headless  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def repo_dir(monkeypatch):
+    monkeypatch.chdir(REPO_DIR)
+
+
+@pytest.fixture
+def headless_game():
+    """
+    factory for HeadlessGames: headless_game(level, spawn_id=0)
+    """
+    return headless.HeadlessGame
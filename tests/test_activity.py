@@ -0,0 +1,18 @@
+def sleeping_sprites(activity):
+    return [sprite for entries in activity.sleeping.values() for sprite, _, _ in entries]
+
+
+def test_sleeping_sprites_are_not_resynced(headless_game):
+    headless_game = headless_game(7)
+    headless_game.advance(2)
+    game = headless_game.game
+    sleeping = sleeping_sprites(game.activity)
+    assert sleeping
+    non_static = game.physics_engine.non_static_sprite_list
+    assert not any(sprite in non_static for sprite in sleeping)
+    assert all(sprite in non_static for sprite in game.activity.active)
+
+    game.level_snapshot.restore(game)
+    assert not game.activity.sleeping
+    assert all(sprite in non_static for sprite in sleeping)
+    assert len(non_static) == len(set(non_static))
@@ -0,0 +1,17 @@
+from arcade import key
+
+
+def test_holding_right_moves_the_player(headless_game):
+    headless_game = headless_game(4)
+    start_x = headless_game.game.player.center_x
+    headless_game.run_script([(0, key.RIGHT, True)], 60)
+    assert headless_game.frame == 60
+    assert headless_game.game.player.center_x > start_x
+
+
+def test_standing_still_stays_on_the_ground(headless_game):
+    headless_game = headless_game(4)
+    headless_game.advance(60)
+    player = headless_game.game.player
+    assert headless_game.game.player_physics.on_ground
+    assert player.health == 99
@@ -0,0 +1,27 @@
+from hud import Hud
+
+
+def test_only_the_changed_label_gets_a_new_sprite_list():
+    hud = Hud()
+    hud.add_label("hp", "HP: {:.2f}", 20, 20)
+    hud.add_label("x position", "x position: {:.2f}", 20, 40)
+    hud.set("hp", 99)
+    hud.set("x position", 10)
+    hp_list = hud.labels["hp"].sprite_list
+    position_list = hud.labels["x position"].sprite_list
+
+    hud.set("hp", 99)  # same text, nothing to render
+    hud.set("x position", 11)
+    assert hud.labels["hp"].sprite_list is hp_list
+    assert hud.labels["x position"].sprite_list is not position_list
+    assert list(hud.labels["x position"].sprite_list) == [hud.labels["x position"]]
+
+
+def test_hidden_labels_are_not_drawn():
+    hud = Hud()
+    hud.add_label("message", "{}", 20, 20)
+    hud.set("message", "saved")
+    assert "message" in hud.shown
+    hud.hide("message")
+    hud.hide("message")
+    assert not hud.shown
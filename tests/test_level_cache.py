@@ -0,0 +1,35 @@
+import arcade as ar
+from hit_boxes import HitBoxCache
+from level_cache import LEVEL_LAYERS, LevelCache, level_path
+
+
+def test_compiled_tiles_rebuild_the_processed_sprites():
+    compiled = LevelCache(hit_box_cache_path=None, preload_workers=0).get(7)
+    tile_map = ar.tilemap.read_tmx(level_path(7))
+    for layer_name in ('Foreground', 'Enemies', 'Moving Platforms', 'Color Orbs'):
+        scaling, use_spatial_hash, hit_box_algorithm = LEVEL_LAYERS[layer_name]
+        processed = ar.tilemap.process_layer(tile_map, layer_name=layer_name, scaling=scaling,
+                                             use_spatial_hash=use_spatial_hash,
+                                             hit_box_algorithm=hit_box_algorithm)
+        built = compiled.build_layer(layer_name)
+        assert len(built) == len(processed)
+        for built_sprite, sprite in zip(built, processed):
+            assert built_sprite.position == sprite.position
+            assert built_sprite.texture.image.tobytes() == sprite.texture.image.tobytes()
+            assert built_sprite.properties == sprite.properties
+            assert (built_sprite.boundary_left, built_sprite.boundary_right) == \
+                (sprite.boundary_left, sprite.boundary_right)
+            assert built_sprite.get_adjusted_hit_box() == sprite.get_adjusted_hit_box()
+
+
+def test_hit_box_cache_round_trip(tmp_path):
+    path = tmp_path / "hit_boxes.json"
+    cache = HitBoxCache(path)
+    texture = ar.load_texture("sprites/player_sprites/player_ball.png")
+    points = cache.points(texture, "Detailed")
+    cache.save()
+    assert not cache.changed
+
+    reloaded = HitBoxCache(path)
+    assert reloaded.points(texture, "Detailed") == points
+    assert not reloaded.changed
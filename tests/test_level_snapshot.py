@@ -0,0 +1,36 @@
+import pytest
+from arcade import key
+
+
+def dynamic_state(game):
+    """
+    positions of everything a LevelSnapshot puts back, in a form that can be compared between games
+    """
+    def position(sprite):
+        # the physics bodies, since sprites only follow them after the next step
+        x, y = game.physics_engine.get_physics_object(sprite).body.position
+        return round(x, 3), round(y, 3)
+
+    def positions(sprite_list):
+        return [(position(sprite), round(sprite.angle, 3)) for sprite in sprite_list]
+
+    return {
+        "player": (position(game.player), tuple(game.player.color)),
+        "enemies": positions(game.enemies_list),
+        "moving platforms": positions(game.moving_platforms_list),
+        "cannons": positions(game.cannons_list),
+        "hidden platforms": game.hidden_platform_list,
+    }
+
+
+@pytest.mark.parametrize("level", [7, 8])
+def test_restore_matches_a_fresh_load(headless_game, level):
+    played = headless_game(level)
+    played.run_script([(0, key.RIGHT, True), (30, key.SPACE, True), (40, key.SPACE, False)], 180)
+    game = played.game
+    game.level_snapshot.restore(game)
+
+    fresh = headless_game(level).game
+    assert dynamic_state(game) == dynamic_state(fresh)
+    assert list(game.key_colors.values()) == list(fresh.key_colors.values())
+    assert game.player.pose_handler.state == fresh.player.pose_handler.state
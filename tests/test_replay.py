@@ -0,0 +1,27 @@
+from arcade import key
+from replay import InputRecorder, InputReplay, state_checksum
+
+
+def test_replay_stays_in_sync(headless_game, tmp_path):
+    recorded = headless_game(7)
+    recorder = InputRecorder(recorded.game)
+    recorded.game.input_recorder = recorder
+    recorded.run_script([(0, key.RIGHT, True), (20, key.SPACE, True), (35, key.SPACE, False),
+                         (90, key.RIGHT, False), (95, key.LEFT, True), (150, key.LEFT, False)], 240)
+    path = tmp_path / "test.csr"
+    recorder.save(path)
+
+    replay = InputReplay(path)
+    assert (replay.level, replay.spawn_id) == (7, 0)
+    assert replay.checksums
+
+    replayed = headless_game(replay.level, replay.spawn_id)
+    replayed.game.input_replay = replay
+    while not replay.finished:
+        replayed.advance()
+
+    assert replay.desyncs == []
+    assert replay.step == 240
+    # the replay lets go of its keys on the step after the last recorded one
+    recorded.advance()
+    assert state_checksum(replayed.game) == state_checksum(recorded.game)
@@ -0,0 +1,34 @@
+from constants import PLAYER_MAX_HORIZONTAL_SPEED
+
+
+def test_pose_stays_steady_in_water(headless_game):
+    """
+    swapping the player's shape used to end its water contact, flipping between swimming and
+    standing every few steps
+    """
+    headless_game = headless_game(11)
+    game = headless_game.game
+    # the water tile with the most water above it, so the player is well under the surface
+    water = max(game.water_list, key=lambda tile: sum(1 for other in game.water_list
+                                                       if abs(other.center_x - tile.center_x) < 1
+                                                       and other.center_y > tile.center_y))
+    poses = []
+    for _ in range(60):
+        game.physics_engine.set_position(game.player, water.position)
+        game.physics_engine.set_velocity(game.player, (0, 0))
+        headless_game.advance()
+        poses.append((game.player.pose_handler.state, game.player.in_water))
+    assert set(poses[5:]) == {("swimming", True)}
+
+
+def test_swimming_speed_is_capped(headless_game):
+    headless_game = headless_game(11)
+    game = headless_game.game
+    water = game.water_list[0]
+    game.physics_engine.set_position(game.player, water.position)
+    headless_game.advance(5)
+    game.physics_engine.set_velocity(game.player, (5000, -5000))
+    headless_game.advance()
+    velocity_x, velocity_y = game.physics_engine.get_physics_object(game.player).body.velocity
+    assert abs(velocity_x) <= PLAYER_MAX_HORIZONTAL_SPEED
+    assert abs(velocity_y) <= PLAYER_MAX_HORIZONTAL_SPEED
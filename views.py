@@ -1,6 +1,7 @@
 from constants import SCREEN_WIDTH
 from constants import SCREEN_HEIGHT
-from main import GameView
+from constants import TITLE_SCREEN_TEXTURE
+from assets import assets
 import arcade as ar
 
 # import arcade.gui
@@ -11,17 +12,21 @@ class MenuView(ar.View):
     View to show game menu
     Displays an Arcade View window to show a menu view
     """
+    def __init__(self):
+        super().__init__()
+        self.held_assets = []
+        # load title screen
+        self.background = assets.texture(TITLE_SCREEN_TEXTURE, holder=self.held_assets)
+
     def on_show(self):
         pass
 
     def on_draw(self):
         ar.start_render()
-        # load title screen
-        background = ar.load_texture("backgrounds/color_seeker_titlescreen.png")
         # ar.set_background_color(ar.color.GRAY)
         ar.draw_lrwh_rectangle_textured(0, 0,
                                         SCREEN_WIDTH, SCREEN_HEIGHT,
-                                        background)
+                                        self.background)
 
         ar.draw_text("Left and Right arrow keys to move\nDown key to roll \nUp key to jump \n"
                      "Space bar + Left/Right to dash and destroy enemies!", 50, 140,
@@ -33,6 +38,8 @@ class MenuView(ar.View):
         ar.draw_text("Click to play!", SCREEN_WIDTH/2, 40, (200,255,255), font_size=60, anchor_x="center")
 
     def on_mouse_press(self, _x, _y, _button, _modifiers):
+        from main import GameView  # imported here, main.py imports this module
+        assets.release_all(self.held_assets)
         game = GameView()
         game.setup()
         self.window.show_view(game)
@@ -54,6 +61,7 @@ class WinView(ar.View):
                          ar.color.GRAY, font_size=20, anchor_x="center")
 
     def on_mouse_press(self, _x, _y, _button, _modifiers):
+        from main import GameView
         game = GameView()
         game.setup()
         self.window.show_view(game)
@@ -83,6 +91,7 @@ class InstructionView(ar.View):
 
     def on_mouse_press(self, _x, _y, _button, _modifiers):
         """ If the user presses the mouse button, start the game. """
+        from main import GameView
         game_view = GameView()
         game_view.setup()
         self.window.show_view(game_view)
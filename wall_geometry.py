@@ -0,0 +1,108 @@
+"""
+merges the static Foreground tiles of a level into a few large collision shapes.
+adding one physics shape per wall tile fills Pymunk with hundreds of tiny polygons, and the player
+snags on the seams between them when rolling across tile boundaries.
+"""
+import pymunk
+from pymunk.autogeometry import convex_decomposition
+from shapely.geometry import LineString, Polygon
+from shapely.geometry.polygon import orient
+from shapely.ops import unary_union
+from constants import *
+from collisions import collision_type_id
+
+
+def tile_polygons(sprite_list):
+    """
+    get the hit box of every sprite in a list as a Shapely polygon in world coordinates. some
+    "Detailed" hit boxes are only a line (2 points), which Pymunk accepted as a thin shape; those are
+    grown into a thin polygon so they still become walls.
+    :param sprite_list: an Arcade SpriteList
+    :return: list of Shapely Polygons
+    """
+    polygons = []
+    for sprite in sprite_list:
+        hit_box = sprite.get_adjusted_hit_box()
+        if len(hit_box) < 2:
+            continue
+        if len(hit_box) < 3:
+            polygon = LineString(hit_box).buffer(WALL_MERGE_SNAP, cap_style=2, join_style=2)
+        else:
+            polygon = Polygon(hit_box)
+        if not polygon.is_valid:
+            polygon = polygon.buffer(0)
+        if not polygon.is_empty:
+            polygons.append(polygon)
+    return polygons
+
+
+def merge_polygons(polygons):
+    """
+    union touching polygons into merged outlines. each polygon is grown by a pixel before the union
+    and the result shrunk back afterwards, which closes the hairline gaps left between "Detailed"
+    hit boxes of neighbouring tiles.
+    :param polygons: list of Shapely Polygons
+    :return: list of merged Shapely Polygons
+    """
+    grown = [polygon.buffer(WALL_MERGE_SNAP, join_style=2) for polygon in polygons]
+    merged = unary_union(grown).buffer(-WALL_MERGE_SNAP, join_style=2)
+    if merged.is_empty:
+        return []
+    if merged.geom_type == "Polygon":
+        return [merged]
+    return [geometry for geometry in merged.geoms if geometry.geom_type == "Polygon"]
+
+
+def convex_pieces(polygon, tiles):
+    """
+    split a merged outline into the convex pieces Pymunk needs. outlines with holes in them can't be
+    decomposed, so the original tile polygons that make them up are used instead.
+    :param polygon: a merged Shapely Polygon
+    :param tiles: the tile polygons the outline was merged from
+    :return: list of vertex lists
+    """
+    if polygon.interiors:
+        return [list(tile.exterior.coords)[:-1] for tile in tiles if tile.intersects(polygon)]
+
+    simplified = polygon.simplify(WALL_MERGE_TOLERANCE)
+    if simplified.is_empty or not simplified.is_valid or simplified.geom_type != "Polygon":
+        simplified = polygon
+    # Pymunk wants a closed, counter-clockwise loop
+    outline = [tuple(point) for point in orient(simplified, sign=1.0).exterior.coords]
+    return [[tuple(point) for point in hull] for hull in convex_decomposition(outline, WALL_MERGE_TOLERANCE)]
+
+
+def merged_wall_pieces(sprite_list):
+    """
+    merge a list of static tiles into convex collision pieces
+    :param sprite_list: SpriteList of static tiles (ex: the Foreground layer)
+    :return: list of vertex lists, in world coordinates
+    """
+    pieces = []
+    tiles = tile_polygons(sprite_list)
+    for polygon in merge_polygons(tiles):
+        pieces.extend(vertices for vertices in convex_pieces(polygon, tiles) if len(vertices) >= 3)
+    return pieces
+
+
+def add_wall_pieces(physics_engine, pieces, friction, collision_type):
+    """
+    add merged wall pieces to the physics engine, all on one static body. the tiles themselves are
+    not added, they are still only used for drawing.
+    :param physics_engine: Arcade's PymunkPhysicsEngine
+    :param pieces: list of vertex lists from merged_wall_pieces
+    :param friction: friction of the walls
+    :param collision_type: name of the collision type (ex: "wall")
+    :return: list of the Pymunk shapes that were added
+    """
+    wall_type = collision_type_id(physics_engine, collision_type)
+    body = pymunk.Body(body_type=pymunk.Body.STATIC)
+    shapes = []
+    for vertices in pieces:
+        shape = pymunk.Poly(body, vertices)
+        shape.friction = friction
+        shape.collision_type = wall_type
+        shapes.append(shape)
+
+    physics_engine.space.add(body, *shapes)
+    return shapes